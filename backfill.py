@@ -0,0 +1,124 @@
+# Queue bulk re-benchmarks from the command line, the running bot works through them
+# in the background. Mirrors the /rebench and /rebench_progress admin commands.
+
+import argparse
+import datetime
+import logging
+from typing import Optional
+
+from ferris_elf.database import (
+    AdventDay,
+    AdventPart,
+    CampaignId,
+    ContainerTag,
+    Database,
+    SubmissionFilter,
+    Year,
+)
+from ferris_elf.rebench import BACKFILL_PRIORITY, queue_backfill
+
+logger = logging.getLogger(__name__)
+
+
+def parse_date(value: str) -> datetime.datetime:
+    return datetime.datetime.combine(
+        datetime.date.fromisoformat(value), datetime.time(), tzinfo=datetime.timezone.utc
+    )
+
+
+def day(value: str) -> AdventDay:
+    d = int(value)
+    if not 1 <= d <= 25:
+        raise argparse.ArgumentTypeError("day not within valid range (1..=25)")
+    # SAFETY: just checked above that d is in valid range
+    return d  # type: ignore[return-value]
+
+
+def part(value: str) -> AdventPart:
+    p = int(value)
+    if p not in (1, 2):
+        raise argparse.ArgumentTypeError("part must be 1 or 2")
+    return p  # type: ignore[return-value]
+
+
+def show_progress(campaign: CampaignId) -> None:
+    with Database() as db:
+        progress = db.campaign_progress(campaign)
+
+    if progress is None:
+        print(f"Re-benchmark campaign {campaign} does not exist")
+        return
+
+    print(
+        f"Campaign {campaign} '{progress.description}': {progress.done}/{progress.total} done, "
+        + f"{progress.failed} failed, {progress.remaining} left"
+    )
+
+
+def main(parsed: argparse.Namespace) -> None:
+    if parsed.progress is not None:
+        show_progress(CampaignId(parsed.progress))
+        return
+
+    with Database() as db:
+        bencher_version = (
+            db.get_container_version(ContainerTag(parsed.submitted_with))
+            if parsed.submitted_with is not None
+            else None
+        )
+
+    f = SubmissionFilter(
+        year=Year(parsed.year) if parsed.year is not None else None,
+        day=parsed.day,
+        part=parsed.part,
+        user_id=parsed.user,
+        bencher_version=bencher_version,
+        submitted_after=parsed.since,
+        submitted_before=parsed.until,
+        include_invalid=parsed.include_invalid,
+    )
+
+    if parsed.dry_run:
+        with Database() as db:
+            matched = db.select_submissions(f)
+        print(f"{len(matched)} submissions match ({f.describe()})")
+        return
+
+    container_tag: Optional[ContainerTag] = (
+        ContainerTag(parsed.container_version) if parsed.container_version else None
+    )
+    campaign, queued = queue_backfill(f, container_tag=container_tag, priority=parsed.priority)
+    print(f"Queued {queued} submissions ({f.describe()}) as re-benchmark campaign {campaign}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(encoding="utf-8", level=logging.INFO)
+
+    parser = argparse.ArgumentParser("ferris-elf-backfill")
+    parser.add_argument("--year", "-y", type=int)
+    parser.add_argument("--day", "-d", type=day)
+    parser.add_argument("--part", "-p", type=part)
+    parser.add_argument("--user", "-u", type=int, help="discord user id")
+    parser.add_argument(
+        "--submitted-with", help="only submissions last measured on this container version"
+    )
+    parser.add_argument("--since", type=parse_date, help="only submissions from this date on")
+    parser.add_argument("--until", type=parse_date, help="only submissions from before this date")
+    parser.add_argument("--include-invalid", action="store_true")
+    parser.add_argument(
+        "--container-version", help="container version to measure on, defaults to the newest one"
+    )
+    parser.add_argument(
+        "--priority",
+        type=int,
+        default=BACKFILL_PRIORITY,
+        help="lower runs first, automatic leaderboard campaigns use 100",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only count the matching submissions"
+    )
+    parser.add_argument(
+        "--progress", type=int, metavar="CAMPAIGN", help="show the progress of a campaign instead"
+    )
+
+    main(parser.parse_args())
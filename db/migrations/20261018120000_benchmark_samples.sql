@@ -0,0 +1,55 @@
+-- migrate:up
+
+/*
+  benchmark_runs had no key of its own, and sqlite is free to renumber an implicit rowid
+  on VACUUM, so rebuild it with an explicit run_id that other tables can reference
+*/
+CREATE TABLE benchmark_runs_new (
+  run_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  /* the session_label of the input that this was run on */
+  session_label TEXT NOT NULL,
+  average_time INTEGER NOT NULL,
+  answer TEXT NOT NULL,
+  completed_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+
+INSERT INTO benchmark_runs_new (submission, session_label, average_time, answer, completed_at)
+  SELECT submission, session_label, average_time, answer, completed_at FROM benchmark_runs;
+
+DROP TABLE benchmark_runs;
+ALTER TABLE benchmark_runs_new RENAME TO benchmark_runs;
+
+CREATE INDEX benchmark_runs_index ON benchmark_runs (submission, session_label, answer);
+
+/* the raw per-iteration sample times criterion measured for a single benchmark run */
+CREATE TABLE benchmark_samples (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  sample_count INTEGER NOT NULL,
+  /*
+    gzipped u64 little endian picosecond values, byte shuffled before compression,
+    see ferris_elf/samples.py for the exact format
+  */
+  samples BLOB NOT NULL
+) STRICT;
+
+-- migrate:down
+
+DROP TABLE benchmark_samples;
+
+CREATE TABLE benchmark_runs_old (
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  /* the session_label of the input that this was run on */
+  session_label TEXT NOT NULL,
+  average_time INTEGER NOT NULL,
+  answer TEXT NOT NULL,
+  completed_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+
+INSERT INTO benchmark_runs_old (submission, session_label, average_time, answer, completed_at)
+  SELECT submission, session_label, average_time, answer, completed_at FROM benchmark_runs;
+
+DROP TABLE benchmark_runs;
+ALTER TABLE benchmark_runs_old RENAME TO benchmark_runs;
+
+CREATE INDEX benchmark_runs_index ON benchmark_runs (submission, session_label, answer);
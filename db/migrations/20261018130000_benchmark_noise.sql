@@ -0,0 +1,11 @@
+-- migrate:up
+
+/* how many times this input was measured before the run was accepted, see ferris_elf/noise.py */
+ALTER TABLE benchmark_runs ADD COLUMN attempts INTEGER NOT NULL DEFAULT ( 1 );
+/* variance of the per-iteration samples of the accepted run, in ps^2, NULL if unknown */
+ALTER TABLE benchmark_runs ADD COLUMN sample_variance REAL DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE benchmark_runs DROP COLUMN sample_variance;
+ALTER TABLE benchmark_runs DROP COLUMN attempts;
@@ -0,0 +1,22 @@
+-- migrate:up
+
+/* bounds of criterion's confidence interval for the typical time, in ps, NULL if unknown */
+ALTER TABLE benchmark_runs ADD COLUMN low_bound INTEGER DEFAULT NULL;
+ALTER TABLE benchmark_runs ADD COLUMN high_bound INTEGER DEFAULT NULL;
+
+/* aggregates of benchmark_runs.low_bound and benchmark_runs.high_bound, like average_time */
+ALTER TABLE submissions ADD COLUMN low_bound INTEGER DEFAULT NULL;
+ALTER TABLE submissions ADD COLUMN high_bound INTEGER DEFAULT NULL;
+
+/* the bounds of the submission in run_id, used for confidence aware ranking */
+ALTER TABLE best_runs ADD COLUMN best_low INTEGER DEFAULT NULL;
+ALTER TABLE best_runs ADD COLUMN best_high INTEGER DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE best_runs DROP COLUMN best_high;
+ALTER TABLE best_runs DROP COLUMN best_low;
+ALTER TABLE submissions DROP COLUMN high_bound;
+ALTER TABLE submissions DROP COLUMN low_bound;
+ALTER TABLE benchmark_runs DROP COLUMN high_bound;
+ALTER TABLE benchmark_runs DROP COLUMN low_bound;
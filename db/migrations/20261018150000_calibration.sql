@@ -0,0 +1,30 @@
+-- migrate:up
+
+/*
+  results of benchmarking the fixed reference workloads in runner/calibration,
+  used to compare timings across hosts, kernels and toolchains
+*/
+CREATE TABLE calibration_runs (
+  id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* file name of the workload in runner/calibration, without the .rs */
+  workload TEXT NOT NULL,
+  /* all times in ps resolution */
+  median INTEGER NOT NULL,
+  low_bound INTEGER NOT NULL,
+  high_bound INTEGER NOT NULL,
+  measured_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+
+CREATE INDEX calibration_runs_index ON calibration_runs (container_version, workload);
+
+/*
+  average_time scaled by how fast the container version's calibration ran compared to the
+  reference calibration, NULL if the version had not been calibrated yet
+*/
+ALTER TABLE submissions ADD COLUMN normalized_time INTEGER DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE submissions DROP COLUMN normalized_time;
+DROP TABLE calibration_runs;
@@ -0,0 +1,43 @@
+-- migrate:up
+
+/* the container version a benchmark run was measured on, filled from the submission for old runs */
+ALTER TABLE benchmark_runs ADD COLUMN bencher_version INTEGER DEFAULT NULL REFERENCES container_versions (id);
+
+UPDATE benchmark_runs SET bencher_version = (
+  SELECT bencher_version FROM submissions WHERE submission_id = benchmark_runs.submission
+);
+
+/* a batch of submissions that get re-measured on a container version in the background */
+CREATE TABLE rebench_campaigns (
+  campaign_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* human readable reason for the campaign, shown in progress reports */
+  description TEXT NOT NULL,
+  /* campaigns created by the bot when a new container version shows up, treated as bool */
+  automatic INTEGER NOT NULL DEFAULT ( 0 ),
+  created_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+
+CREATE TABLE rebench_jobs (
+  job_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  campaign INTEGER NOT NULL REFERENCES rebench_campaigns (campaign_id),
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* one of queued, running, done, failed, skipped */
+  status TEXT NOT NULL DEFAULT ( 'queued' ),
+  /* lower runs first */
+  priority INTEGER NOT NULL DEFAULT ( 100 ),
+  finished_at INTEGER DEFAULT NULL,
+
+  /* a submission only ever needs measuring once per container version */
+  CONSTRAINT rebench_jobs_once UNIQUE (submission, container_version)
+) STRICT;
+
+CREATE INDEX rebench_jobs_queue ON rebench_jobs (status, priority, job_id);
+CREATE INDEX rebench_jobs_campaign ON rebench_jobs (campaign, status);
+
+-- migrate:down
+
+DROP TABLE rebench_jobs;
+DROP TABLE rebench_campaigns;
+ALTER TABLE benchmark_runs DROP COLUMN bencher_version;
@@ -0,0 +1,59 @@
+-- migrate:up
+
+/*
+  the same submission may be re-measured on the same container version again (e.g. after a
+  harness fix), so only pending jobs have to be unique now
+*/
+CREATE TABLE rebench_jobs_new (
+  job_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  campaign INTEGER NOT NULL REFERENCES rebench_campaigns (campaign_id),
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* one of queued, running, done, failed, skipped */
+  status TEXT NOT NULL DEFAULT ( 'queued' ),
+  /* lower runs first */
+  priority INTEGER NOT NULL DEFAULT ( 100 ),
+  finished_at INTEGER DEFAULT NULL
+) STRICT;
+
+INSERT INTO rebench_jobs_new SELECT * FROM rebench_jobs;
+DROP TABLE rebench_jobs;
+ALTER TABLE rebench_jobs_new RENAME TO rebench_jobs;
+
+CREATE INDEX rebench_jobs_queue ON rebench_jobs (status, priority, job_id);
+CREATE INDEX rebench_jobs_campaign ON rebench_jobs (campaign, status);
+CREATE UNIQUE INDEX rebench_jobs_pending ON rebench_jobs (submission, container_version)
+  WHERE status IN ('queued', 'running');
+
+/* set on runs replaced by a later re-benchmark on the same container version, treated as bool */
+ALTER TABLE benchmark_runs ADD COLUMN superseded INTEGER NOT NULL DEFAULT ( 0 );
+
+/* used to select submissions for bulk re-benchmarks */
+CREATE INDEX submissions_version_index ON submissions (bencher_version, submitted_at);
+CREATE INDEX submissions_time_index ON submissions (submitted_at);
+
+-- migrate:down
+
+DROP INDEX submissions_time_index;
+DROP INDEX submissions_version_index;
+ALTER TABLE benchmark_runs DROP COLUMN superseded;
+
+DROP INDEX rebench_jobs_pending;
+CREATE TABLE rebench_jobs_old (
+  job_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  campaign INTEGER NOT NULL REFERENCES rebench_campaigns (campaign_id),
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  status TEXT NOT NULL DEFAULT ( 'queued' ),
+  priority INTEGER NOT NULL DEFAULT ( 100 ),
+  finished_at INTEGER DEFAULT NULL,
+
+  CONSTRAINT rebench_jobs_once UNIQUE (submission, container_version)
+) STRICT;
+
+INSERT OR IGNORE INTO rebench_jobs_old SELECT * FROM rebench_jobs ORDER BY job_id DESC;
+DROP TABLE rebench_jobs;
+ALTER TABLE rebench_jobs_old RENAME TO rebench_jobs;
+
+CREATE INDEX rebench_jobs_queue ON rebench_jobs (status, priority, job_id);
+CREATE INDEX rebench_jobs_campaign ON rebench_jobs (campaign, status);
@@ -0,0 +1,12 @@
+-- migrate:up
+
+/* written by a separate profiling run after the timed measurement of the same input */
+CREATE TABLE benchmark_profiles (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  /* gzipped flamegraph svg produced by pprof */
+  flamegraph BLOB NOT NULL
+) STRICT;
+
+-- migrate:down
+
+DROP TABLE benchmark_profiles;
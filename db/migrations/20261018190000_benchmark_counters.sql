@@ -0,0 +1,19 @@
+-- migrate:up
+
+/*
+  hardware performance counter totals over `iterations` calls of the submission, only written
+  when counters are enabled. Counters the host could not open are NULL
+*/
+CREATE TABLE benchmark_counters (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  iterations INTEGER NOT NULL,
+  instructions INTEGER DEFAULT NULL,
+  cycles INTEGER DEFAULT NULL,
+  branch_misses INTEGER DEFAULT NULL,
+  l1d_misses INTEGER DEFAULT NULL,
+  llc_misses INTEGER DEFAULT NULL
+) STRICT;
+
+-- migrate:down
+
+DROP TABLE benchmark_counters;
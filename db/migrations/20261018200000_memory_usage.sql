@@ -0,0 +1,19 @@
+-- migrate:up
+
+/* heap usage of one call of the submission on this input, see runner/benches/bench.rs */
+ALTER TABLE benchmark_runs ADD COLUMN peak_memory INTEGER DEFAULT NULL;
+ALTER TABLE benchmark_runs ADD COLUMN total_allocated INTEGER DEFAULT NULL;
+ALTER TABLE benchmark_runs ADD COLUMN allocation_count INTEGER DEFAULT NULL;
+
+/* highest peak_memory over the submission's benchmark_runs, used by the memory leaderboard */
+ALTER TABLE submissions ADD COLUMN peak_memory INTEGER DEFAULT NULL;
+
+CREATE INDEX submissions_memory_index ON submissions (year, day_part, valid, peak_memory);
+
+-- migrate:down
+
+DROP INDEX submissions_memory_index;
+ALTER TABLE submissions DROP COLUMN peak_memory;
+ALTER TABLE benchmark_runs DROP COLUMN allocation_count;
+ALTER TABLE benchmark_runs DROP COLUMN total_allocated;
+ALTER TABLE benchmark_runs DROP COLUMN peak_memory;
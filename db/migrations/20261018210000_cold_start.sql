@@ -0,0 +1,19 @@
+-- migrate:up
+
+/*
+  time of the first call of the submission in a fresh process, ps resolution. This is the
+  median over cold_runs fresh processes, or the answer-producing call when cold_runs is 0
+*/
+ALTER TABLE benchmark_runs ADD COLUMN cold_time INTEGER DEFAULT NULL;
+ALTER TABLE benchmark_runs ADD COLUMN cold_runs INTEGER NOT NULL DEFAULT ( 0 );
+
+/* aggregate of benchmark_runs.cold_time, like average_time */
+ALTER TABLE submissions ADD COLUMN cold_time INTEGER DEFAULT NULL;
+ALTER TABLE best_runs ADD COLUMN best_cold INTEGER DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE best_runs DROP COLUMN best_cold;
+ALTER TABLE submissions DROP COLUMN cold_time;
+ALTER TABLE benchmark_runs DROP COLUMN cold_runs;
+ALTER TABLE benchmark_runs DROP COLUMN cold_time;
@@ -0,0 +1,20 @@
+-- migrate:up
+
+/*
+  the bench format of a container version, taken from its `<format>.<timestamp>` tag,
+  the bot only picks versions with a format it supports
+*/
+ALTER TABLE container_versions ADD COLUMN benchmark_format INTEGER NOT NULL DEFAULT ( 1 );
+
+/*
+  bench format 2, median time of the submission's separate parse and solve functions,
+  ps resolution, NULL for submissions that only have run
+*/
+ALTER TABLE benchmark_runs ADD COLUMN parse_time INTEGER DEFAULT NULL;
+ALTER TABLE benchmark_runs ADD COLUMN solve_time INTEGER DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE benchmark_runs DROP COLUMN solve_time;
+ALTER TABLE benchmark_runs DROP COLUMN parse_time;
+ALTER TABLE container_versions DROP COLUMN benchmark_format;
@@ -0,0 +1,11 @@
+-- migrate:up
+
+/*
+  the submission of the other part, for submissions that covered both parts with one file.
+  Both were built once and measured in the same session, so they link to each other
+*/
+ALTER TABLE submissions ADD COLUMN paired_submission INTEGER DEFAULT NULL REFERENCES submissions (submission_id);
+
+-- migrate:down
+
+ALTER TABLE submissions DROP COLUMN paired_submission;
@@ -0,0 +1,16 @@
+-- migrate:up
+
+/*
+  whether the image of this version is on the host. The image manager pulls new versions in
+  the background before they can be picked for submissions, and removes old ones. Versions
+  from before it existed were pulled on first use, so they count as pulled
+*/
+ALTER TABLE container_versions ADD COLUMN pulled INTEGER NOT NULL DEFAULT ( 1 );
+
+/* how long the last background pull of this version took */
+ALTER TABLE container_versions ADD COLUMN pull_seconds REAL DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE container_versions DROP COLUMN pull_seconds;
+ALTER TABLE container_versions DROP COLUMN pulled;
@@ -0,0 +1,12 @@
+-- migrate:up
+
+/* how the submission was compiled, see ferris_elf/profiles.py */
+ALTER TABLE submissions ADD COLUMN build_profile TEXT NOT NULL DEFAULT ( 'release' );
+
+/* best_runs keeps each user's best submission per build profile, so leaderboards can filter on it */
+ALTER TABLE best_runs ADD COLUMN build_profile TEXT NOT NULL DEFAULT ( 'release' );
+
+-- migrate:down
+
+ALTER TABLE best_runs DROP COLUMN build_profile;
+ALTER TABLE submissions DROP COLUMN build_profile;
@@ -0,0 +1,11 @@
+-- migrate:up
+
+/*
+  JSON of the measure lane the run was timed in: its cpus, the SMT siblings kept idle, the
+  cpu period and quota, pids limit and whether swap was off. NULL when lanes were disabled
+*/
+ALTER TABLE benchmark_runs ADD COLUMN lane TEXT DEFAULT NULL;
+
+-- migrate:down
+
+ALTER TABLE benchmark_runs DROP COLUMN lane;
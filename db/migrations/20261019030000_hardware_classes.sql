@@ -0,0 +1,25 @@
+-- migrate:up
+
+/*
+  the hardware class of the host that measured the submission, see ferris_elf/hardware.py.
+  NULL for submissions measured before hosts were told apart
+*/
+ALTER TABLE submissions ADD COLUMN hardware_class TEXT DEFAULT NULL;
+/* each user's best per build profile and hardware class, leaderboards rank within one class */
+ALTER TABLE best_runs ADD COLUMN hardware_class TEXT DEFAULT NULL;
+/* normalized times only use calibrations measured on the submission's hardware class */
+ALTER TABLE calibration_runs ADD COLUMN hardware_class TEXT DEFAULT NULL;
+
+CREATE TABLE hardware_classes (
+  hardware_class TEXT NOT NULL PRIMARY KEY,
+  /* cpu model, cpu count, memory and architecture */
+  description TEXT NOT NULL,
+  first_seen INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+
+-- migrate:down
+
+DROP TABLE hardware_classes;
+ALTER TABLE calibration_runs DROP COLUMN hardware_class;
+ALTER TABLE best_runs DROP COLUMN hardware_class;
+ALTER TABLE submissions DROP COLUMN hardware_class;
@@ -0,0 +1,8 @@
+-- migrate:up
+
+/* backfills that asked for invalid submissions too measure them, others skip them, treated as bool */
+ALTER TABLE rebench_campaigns ADD COLUMN include_invalid INTEGER NOT NULL DEFAULT ( 0 );
+
+-- migrate:down
+
+ALTER TABLE rebench_campaigns DROP COLUMN include_invalid;
@@ -0,0 +1,11 @@
+-- migrate:up
+
+/*
+  which functions of the code the benchmark calls, see ferris_elf/entrypoints.py. Chosen when
+  submitting, every older submission was benchmarked through `run` only
+*/
+ALTER TABLE submissions ADD COLUMN entrypoints TEXT NOT NULL DEFAULT ( 'run' );
+
+-- migrate:down
+
+ALTER TABLE submissions DROP COLUMN entrypoints;
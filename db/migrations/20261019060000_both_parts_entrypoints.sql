@@ -0,0 +1,8 @@
+-- migrate:up
+
+-- paired submissions were made by submit_both, which always built them through part1 and part2
+UPDATE submissions SET entrypoints = 'both_parts' WHERE paired_submission IS NOT NULL;
+
+-- migrate:down
+
+UPDATE submissions SET entrypoints = 'run' WHERE entrypoints = 'both_parts';
@@ -0,0 +1,46 @@
+-- migrate:up
+
+/*
+  best_runs holds one row per build profile and hardware class for each user, so the same time
+  in two of them has to be allowed
+*/
+CREATE TABLE best_runs_new (
+  user TEXT NOT NULL,
+  year INTEGER NOT NULL,
+  /* packing day and part into one int, this also happens to be efficient to unpack */
+  day_part INTEGER NOT NULL,
+  best_time INTEGER NOT NULL,
+  run_id INTEGER NOT NULL REFERENCES submissions (submission_id),
+  best_low INTEGER DEFAULT NULL,
+  best_high INTEGER DEFAULT NULL,
+  best_cold INTEGER DEFAULT NULL,
+  build_profile TEXT NOT NULL DEFAULT ( 'release' ),
+  hardware_class TEXT DEFAULT NULL,
+
+  CONSTRAINT best_runs_index UNIQUE (year, day_part, build_profile, hardware_class, best_time, user)
+) STRICT;
+
+INSERT INTO best_runs_new SELECT * FROM best_runs;
+DROP TABLE best_runs;
+ALTER TABLE best_runs_new RENAME TO best_runs;
+
+-- migrate:down
+
+CREATE TABLE best_runs_old (
+  user TEXT NOT NULL,
+  year INTEGER NOT NULL,
+  day_part INTEGER NOT NULL,
+  best_time INTEGER NOT NULL,
+  run_id INTEGER NOT NULL REFERENCES submissions (submission_id),
+  best_low INTEGER DEFAULT NULL,
+  best_high INTEGER DEFAULT NULL,
+  best_cold INTEGER DEFAULT NULL,
+  build_profile TEXT NOT NULL DEFAULT ( 'release' ),
+  hardware_class TEXT DEFAULT NULL,
+
+  CONSTRAINT best_runs_index UNIQUE (year, day_part, best_time, user)
+) STRICT;
+
+INSERT OR IGNORE INTO best_runs_old SELECT * FROM best_runs;
+DROP TABLE best_runs;
+ALTER TABLE best_runs_old RENAME TO best_runs;
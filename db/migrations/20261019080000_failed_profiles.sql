@@ -0,0 +1,23 @@
+-- migrate:up
+
+/* runs whose profiling failed keep a row without a flamegraph, so /profile doesn't retry them */
+CREATE TABLE benchmark_profiles_new (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  /* gzipped flamegraph svg produced by pprof, NULL if profiling the run failed */
+  flamegraph BLOB DEFAULT NULL
+) STRICT;
+
+INSERT INTO benchmark_profiles_new SELECT * FROM benchmark_profiles;
+DROP TABLE benchmark_profiles;
+ALTER TABLE benchmark_profiles_new RENAME TO benchmark_profiles;
+
+-- migrate:down
+
+CREATE TABLE benchmark_profiles_old (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  flamegraph BLOB NOT NULL
+) STRICT;
+
+INSERT INTO benchmark_profiles_old SELECT * FROM benchmark_profiles WHERE flamegraph IS NOT NULL;
+DROP TABLE benchmark_profiles;
+ALTER TABLE benchmark_profiles_old RENAME TO benchmark_profiles;
@@ -1,14 +1,4 @@
 CREATE TABLE IF NOT EXISTS "schema_migrations" (version varchar(128) primary key);
-CREATE TABLE best_runs (
-  user TEXT NOT NULL,
-  year INTEGER NOT NULL,
-  /* packing day and part into one int, this also happens to be efficient to unpack */
-  day_part INTEGER NOT NULL,
-  best_time INTEGER NOT NULL,
-  run_id INTEGER NOT NULL REFERENCES submissions (submission_id),
-
-  CONSTRAINT best_runs_index UNIQUE (year, day_part, best_time, user)
-) STRICT;
 CREATE TABLE submissions (
   submission_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
   user TEXT NOT NULL,
@@ -27,17 +17,8 @@ CREATE TABLE submissions (
   submitted_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() ),
 
   bencher_version INTEGER NOT NULL REFERENCES container_versions (id)
-, benchmark_format INTEGER NOT NULL DEFAULT ( 0 )) STRICT;
+, benchmark_format INTEGER NOT NULL DEFAULT ( 0 ), low_bound INTEGER DEFAULT NULL, high_bound INTEGER DEFAULT NULL, normalized_time INTEGER DEFAULT NULL, peak_memory INTEGER DEFAULT NULL, cold_time INTEGER DEFAULT NULL, paired_submission INTEGER DEFAULT NULL REFERENCES submissions (submission_id), build_profile TEXT NOT NULL DEFAULT ( 'release' ), hardware_class TEXT DEFAULT NULL, entrypoints TEXT NOT NULL DEFAULT ( 'run' )) STRICT;
 CREATE INDEX submissions_index ON submissions (year, day_part, valid, user, average_time);
-CREATE TABLE benchmark_runs (
-  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
-  /* the session_label of the input that this was run on */
-  session_label TEXT NOT NULL,
-  average_time INTEGER NOT NULL,
-  answer TEXT NOT NULL,
-  completed_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
-) STRICT;
-CREATE INDEX benchmark_runs_index ON benchmark_runs (submission, session_label, answer);
 CREATE TABLE inputs (
   year INTEGER NOT NULL,
   /* dont use day-part here since inputs are the same for one day */
@@ -83,8 +64,122 @@ CREATE TABLE container_versions (
   /* NOTE: this is the new field */
   creation_time INTEGER NOT NULL
 
+, benchmark_format INTEGER NOT NULL DEFAULT ( 1 ), pulled INTEGER NOT NULL DEFAULT ( 1 ), pull_seconds REAL DEFAULT NULL) STRICT;
+CREATE TABLE "benchmark_runs" (
+  run_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  /* the session_label of the input that this was run on */
+  session_label TEXT NOT NULL,
+  average_time INTEGER NOT NULL,
+  answer TEXT NOT NULL,
+  completed_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+, attempts INTEGER NOT NULL DEFAULT ( 1 ), sample_variance REAL DEFAULT NULL, low_bound INTEGER DEFAULT NULL, high_bound INTEGER DEFAULT NULL, bencher_version INTEGER DEFAULT NULL REFERENCES container_versions (id), superseded INTEGER NOT NULL DEFAULT ( 0 ), peak_memory INTEGER DEFAULT NULL, total_allocated INTEGER DEFAULT NULL, allocation_count INTEGER DEFAULT NULL, cold_time INTEGER DEFAULT NULL, cold_runs INTEGER NOT NULL DEFAULT ( 0 ), parse_time INTEGER DEFAULT NULL, solve_time INTEGER DEFAULT NULL, lane TEXT DEFAULT NULL) STRICT;
+CREATE INDEX benchmark_runs_index ON benchmark_runs (submission, session_label, answer);
+CREATE TABLE benchmark_samples (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  sample_count INTEGER NOT NULL,
+  /*
+    gzipped u64 little endian picosecond values, byte shuffled before compression,
+    see ferris_elf/samples.py for the exact format
+  */
+  samples BLOB NOT NULL
+) STRICT;
+CREATE TABLE calibration_runs (
+  id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* file name of the workload in runner/calibration, without the .rs */
+  workload TEXT NOT NULL,
+  /* all times in ps resolution */
+  median INTEGER NOT NULL,
+  low_bound INTEGER NOT NULL,
+  high_bound INTEGER NOT NULL,
+  measured_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+, hardware_class TEXT DEFAULT NULL) STRICT;
+CREATE INDEX calibration_runs_index ON calibration_runs (container_version, workload);
+CREATE TABLE rebench_campaigns (
+  campaign_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* human readable reason for the campaign, shown in progress reports */
+  description TEXT NOT NULL,
+  /* campaigns created by the bot when a new container version shows up, treated as bool */
+  automatic INTEGER NOT NULL DEFAULT ( 0 ),
+  created_at INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+, include_invalid INTEGER NOT NULL DEFAULT ( 0 )) STRICT;
+CREATE TABLE "rebench_jobs" (
+  job_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+  campaign INTEGER NOT NULL REFERENCES rebench_campaigns (campaign_id),
+  submission INTEGER NOT NULL REFERENCES submissions (submission_id),
+  container_version INTEGER NOT NULL REFERENCES container_versions (id),
+  /* one of queued, running, done, failed, skipped */
+  status TEXT NOT NULL DEFAULT ( 'queued' ),
+  /* lower runs first */
+  priority INTEGER NOT NULL DEFAULT ( 100 ),
+  finished_at INTEGER DEFAULT NULL
+) STRICT;
+CREATE INDEX rebench_jobs_queue ON rebench_jobs (status, priority, job_id);
+CREATE INDEX rebench_jobs_campaign ON rebench_jobs (campaign, status);
+CREATE UNIQUE INDEX rebench_jobs_pending ON rebench_jobs (submission, container_version)
+  WHERE status IN ('queued', 'running');
+CREATE INDEX submissions_version_index ON submissions (bencher_version, submitted_at);
+CREATE INDEX submissions_time_index ON submissions (submitted_at);
+CREATE TABLE benchmark_counters (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  iterations INTEGER NOT NULL,
+  instructions INTEGER DEFAULT NULL,
+  cycles INTEGER DEFAULT NULL,
+  branch_misses INTEGER DEFAULT NULL,
+  l1d_misses INTEGER DEFAULT NULL,
+  llc_misses INTEGER DEFAULT NULL
+) STRICT;
+CREATE INDEX submissions_memory_index ON submissions (year, day_part, valid, peak_memory);
+CREATE TABLE hardware_classes (
+  hardware_class TEXT NOT NULL PRIMARY KEY,
+  /* cpu model, cpu count, memory and architecture */
+  description TEXT NOT NULL,
+  first_seen INTEGER NOT NULL DEFAULT ( UNIXEPOCH() )
+) STRICT;
+CREATE TABLE "best_runs" (
+  user TEXT NOT NULL,
+  year INTEGER NOT NULL,
+  /* packing day and part into one int, this also happens to be efficient to unpack */
+  day_part INTEGER NOT NULL,
+  best_time INTEGER NOT NULL,
+  run_id INTEGER NOT NULL REFERENCES submissions (submission_id),
+  best_low INTEGER DEFAULT NULL,
+  best_high INTEGER DEFAULT NULL,
+  best_cold INTEGER DEFAULT NULL,
+  build_profile TEXT NOT NULL DEFAULT ( 'release' ),
+  hardware_class TEXT DEFAULT NULL,
+
+  CONSTRAINT best_runs_index UNIQUE (year, day_part, build_profile, hardware_class, best_time, user)
+) STRICT;
+CREATE TABLE "benchmark_profiles" (
+  run INTEGER NOT NULL PRIMARY KEY REFERENCES benchmark_runs (run_id),
+  /* gzipped flamegraph svg produced by pprof, NULL if profiling the run failed */
+  flamegraph BLOB DEFAULT NULL
 ) STRICT;
 -- Dbmate schema migrations
 INSERT INTO "schema_migrations" (version) VALUES
   ('20240108100950'),
-  ('20240118045802');
+  ('20240118045802'),
+  ('20261018120000'),
+  ('20261018130000'),
+  ('20261018140000'),
+  ('20261018150000'),
+  ('20261018160000'),
+  ('20261018170000'),
+  ('20261018180000'),
+  ('20261018190000'),
+  ('20261018200000'),
+  ('20261018210000'),
+  ('20261018220000'),
+  ('20261018230000'),
+  ('20261019000000'),
+  ('20261019010000'),
+  ('20261019020000'),
+  ('20261019030000'),
+  ('20261019040000'),
+  ('20261019050000'),
+  ('20261019060000'),
+  ('20261019070000'),
+  ('20261019080000');
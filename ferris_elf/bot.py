@@ -1,8 +1,21 @@
 import asyncio
+import datetime
 from io import BytesIO, StringIO
+import itertools
 import logging
+import os
 import sys
-from typing import Annotated, Any, Callable, Optional, Literal, ParamSpec, TypeVar
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    NewType,
+    Optional,
+    Literal,
+    ParamSpec,
+    TypeAlias,
+    TypeVar,
+)
 
 import discord
 from discord.ext import commands
@@ -10,24 +23,100 @@ from discord import app_commands
 from dynaconf import ValidationError
 
 from . import constants
+from .memory import format_bytes
 from .picoseconds import Picoseconds
+from .ranking import RankedTime
 from . import lib
 from .config import settings
-from .database import AdventDay, AdventPart, Database, SubmissionId, Year
+from .database import (
+    AdventDay,
+    AdventPart,
+    CampaignId,
+    ContainerTag,
+    ContainerVersionError,
+    Database,
+    Submission,
+    SubmissionFilter,
+    SubmissionId,
+    Year,
+)
+from .entrypoints import Entrypoints, both_parts, has_phases
 from .error_handler import ErrorHandlerCog
-from .containers import bg_update
+from .hardware import HardwareClass, local_hardware
+from .profiles import BuildProfile
+from .containers import bg_update, lanes
+from .dispatch import Dispatcher, serve
+from .images import describe_images, manage_images
+from .lanes import LaneKind
+from .rebench import queue_backfill, rebench_worker
+from .release import release_worker
 
 logger = logging.getLogger(__name__)
 
+# the values of BuildProfile, as a type command arguments can be converted to
+ProfileName: TypeAlias = Literal["release", "lto", "pgo"]
+
+# a queued submission, numbered from 1 again whenever the bot starts
+JobId = NewType("JobId", int)
+
+Job: TypeAlias = tuple[
+    commands.Context[Any],
+    Year,
+    AdventDay,
+    tuple[AdventPart, ...],
+    bytes,
+    BuildProfile,
+    Entrypoints,
+    # the submission to profile for /profile, None to benchmark the code
+    Optional[Submission],
+]
+
 
 class MyBot(commands.Bot):
-    __slots__ = "queue"
+    __slots__ = ("queue", "job_ids", "queued", "running", "parked", "dispatcher")
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.queue = asyncio.Queue[
-            tuple[commands.Context[Any], Year, AdventDay, AdventPart, bytes]
-        ]()
+        self.queue = asyncio.Queue[tuple[JobId, Job]]()
+        self.job_ids = itertools.count(1)
+        # the jobs in the queue that weren't cancelled
+        self.queued: set[JobId] = set()
+        # the submissions from the queue being benchmarked right now, and the tasks doing it
+        self.running: dict[JobId, asyncio.Task[None]] = {}
+        # jobs that came up before their day's inputs were stored, and the tasks waiting for them
+        self.parked: dict[JobId, asyncio.Task[None]] = {}
+        # hands submissions to workers when they are enabled, they run here otherwise
+        self.dispatcher: Optional[Dispatcher] = None
+
+    def has_live_work(self) -> bool:
+        """Whether live submissions are waiting or running, background work should back off."""
+        if self.dispatcher is not None:
+            # they run on the workers, this host is free
+            return False
+        return len(self.running) > 0 or len(self.queued) > 0
+
+    def enqueue(self, job: Job, /) -> JobId:
+        job_id = JobId(next(self.job_ids))
+        self.queued.add(job_id)
+        self.queue.put_nowait((job_id, job))
+        return job_id
+
+    def cancel(self, job_id: JobId, /) -> bool:
+        """
+        Cancel a queued or running job. A running job's container is killed right away, and
+        the queue moves on. Returns whether the job was queued or running.
+        """
+        if job_id in self.running:
+            self.running[job_id].cancel()
+            return True
+        if job_id in self.parked:
+            self.parked[job_id].cancel()
+            return True
+        if job_id in self.queued:
+            # skipped once it comes up
+            self.queued.remove(job_id)
+            return True
+        return False
 
     async def setup_hook(self) -> None:
         await asyncio.gather(
@@ -40,13 +129,96 @@ class MyBot(commands.Bot):
         logger.info("Logged in as %s", self.user)
         while True:
             try:
-                submit_msg = await self.queue.get()
-                logger.info("Going to process submission from queue: %s", submit_msg)
-                await lib.benchmark(*submit_msg)
-                self.queue.task_done()
+                job_id, submit_msg = await self.queue.get()
+                if job_id not in self.queued:
+                    logger.info("Skipping cancelled job %s", job_id)
+                    self.queue.task_done()
+                    await submit_msg[0].reply("Your submission was cancelled.")
+                    continue
+
+                if not lib.has_inputs(submit_msg[1], submit_msg[2]):
+                    # waiting here would hold up every job behind it
+                    logger.info("Parking job %s until its inputs are stored", job_id)
+                    self.queued.remove(job_id)
+                    self.parked[job_id] = asyncio.create_task(self.park(job_id, submit_msg))
+                    self.queue.task_done()
+                    continue
+
+                self.queued.remove(job_id)
+                task = asyncio.create_task(self.run_job(job_id, submit_msg))
+                self.running[job_id] = task
+                if self.dispatcher is None:
+                    # measured on this host, one at a time
+                    await asyncio.wait([task])
             except Exception:
                 logger.exception("Error while processing submission.")
 
+    async def park(self, job_id: JobId, submit_msg: Job) -> None:
+        """Queue a parked job again once its inputs are stored, if they are within the hold."""
+        ctx, year, day = submit_msg[:3]
+        try:
+            if await lib.wait_for_inputs(ctx, year, day):
+                self.queued.add(job_id)
+                self.queue.put_nowait((job_id, submit_msg))
+            else:
+                await ctx.reply(
+                    f"There are no inputs for day {day} yet, please submit again later."
+                )
+        except asyncio.CancelledError:
+            logger.info("Cancelled parked job %s", job_id)
+            await ctx.reply("Your submission was cancelled.")
+            raise
+        finally:
+            del self.parked[job_id]
+
+    async def run_job(self, job_id: JobId, submit_msg: Job) -> None:
+        logger.info("Going to process job %s from queue: %s", job_id, submit_msg)
+        ctx, year, day, parts, code, profile, entrypoints, to_profile = submit_msg
+        try:
+            if to_profile is None:
+                await lib.benchmark(
+                    ctx, year, day, parts, code, profile, entrypoints, dispatcher=self.dispatcher
+                )
+            else:
+                try:
+                    await lib.profile_submission(to_profile, self.dispatcher)
+                except Exception:
+                    logger.exception("Profiling submission %s failed", to_profile.id)
+                # with whatever it has, the counters are still there if profiling failed
+                await reply_with_profile(ctx, to_profile.id)
+        except asyncio.CancelledError:
+            logger.info("Cancelled job %s", job_id)
+            await submit_msg[0].reply("Your submission was cancelled.")
+            raise
+        except Exception:
+            logger.exception("Error while processing submission.")
+        finally:
+            del self.running[job_id]
+            self.queue.task_done()
+
+
+async def reply_with_profile(ctx: commands.Context[Any], submission_id: SubmissionId) -> None:
+    """Reply with the hardware counters and flamegraphs of a submission, as far as it has them."""
+    with Database() as db:
+        flamegraphs = db.get_submission_flamegraphs(submission_id)
+        counters = db.get_submission_counters(submission_id)
+
+    if not flamegraphs and counters is None:
+        await ctx.reply(f"Submission {submission_id} was not profiled.")
+        return
+
+    content = f"Profile of submission {submission_id}"
+    if counters is not None:
+        content += f", over {counters.iterations} runs:\n{counters.describe()}"
+    if flamegraphs:
+        content += "\nFlamegraphs are attached, one per input."
+
+    files = [
+        discord.File(BytesIO(svg), filename=f"flamegraph_{submission_id}_{label}.svg")
+        for label, svg in flamegraphs.items()
+    ]
+    await ctx.reply(content, files=files)
+
 
 # if i don't use a cog, the functions would need to be in __name__ == __main__
 class Commands(commands.Cog):
@@ -72,6 +244,8 @@ class Commands(commands.Cog):
         ctx: commands.Context[Any],
         day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
         part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
+        profile: Optional[ProfileName] = None,
+        hardware: Optional[str] = None,
     ) -> None:
         if day is None:
             day = lib.today()
@@ -79,18 +253,27 @@ class Commands(commands.Cog):
             if day > lib.today():
                 raise commands.BadArgument(f"Day {day} is in the future!")
 
-        async def format_times(times: list[tuple[int, str]]) -> str:
+        async def format_times(times: list[RankedTime]) -> str:
             formatted = StringIO()
-            for user_id, time in times:
-                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            for entry in times:
+                user = self.bot.get_user(entry.user_id) or await self.bot.fetch_user(entry.user_id)
                 if user:
-                    formatted.write(f"\t{user.name}:  **{time}**\n")
+                    formatted.write(
+                        f"\t{entry.rank}. {user.name}:  {lib.format_ranked_time(entry)}\n"
+                    )
             return formatted.getvalue()
 
-        (times1, times2) = lib.get_best_times(lib.year(), day)
+        build_profile = BuildProfile(profile) if profile is not None else None
+        hardware_class = HardwareClass(hardware) if hardware is not None else None
+        (times1, times2) = lib.get_best_times(lib.year(), day, build_profile, hardware_class)
         times1_str = await format_times(times1)
         times2_str = await format_times(times2)
-        embed = discord.Embed(title=f"Top 10 fastest toboggans for day {day}", color=0xE84611)
+        title = f"Top 10 fastest toboggans for day {day}"
+        if build_profile is not None:
+            title += f" ({build_profile} builds)"
+        if hardware_class is not None:
+            title += f" on {hardware_class}"
+        embed = discord.Embed(title=title, color=0xE84611)
         if times1_str and (part is None or part == 1):
             embed.add_field(name="Part 1", value=times1_str, inline=True)
         if times2_str and (part is None or part == 2):
@@ -105,8 +288,10 @@ class Commands(commands.Cog):
         ctx: commands.Context[Any],
         day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
         part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
+        profile: Optional[ProfileName] = None,
+        hardware: Optional[str] = None,
     ) -> None:
-        await self.leaderboard(ctx, day, part)  # type: ignore[arg-type]
+        await self.leaderboard(ctx, day, part, profile, hardware)  # type: ignore[arg-type]
 
     @commands.hybrid_command()  # type: ignore[arg-type]
     async def best(
@@ -114,8 +299,10 @@ class Commands(commands.Cog):
         ctx: commands.Context[Any],
         day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
         part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
+        profile: Optional[ProfileName] = None,
+        hardware: Optional[str] = None,
     ) -> None:
-        await self.leaderboard(ctx, day, part)  # type: ignore[arg-type]
+        await self.leaderboard(ctx, day, part, profile, hardware)  # type: ignore[arg-type]
 
     @commands.hybrid_command()  # type: ignore[arg-type]
     async def aoc(
@@ -123,8 +310,68 @@ class Commands(commands.Cog):
         ctx: commands.Context[Any],
         day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
         part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
+        profile: Optional[ProfileName] = None,
+        hardware: Optional[str] = None,
+    ) -> None:
+        await self.leaderboard(ctx, day, part, profile, hardware)  # type: ignore[arg-type]
+
+    @commands.hybrid_command()  # type: ignore[arg-type]
+    async def hardware(self, ctx: commands.Context[Any]) -> None:
+        with Database() as db:
+            classes = db.hardware_classes()
+
+        if not classes:
+            await ctx.reply("Nothing has been measured yet.")
+            return
+        lines = [f"`{hardware_class}`: {description}" for hardware_class, description in classes]
+        await ctx.reply(
+            "Times are only ranked against times measured on the same hardware. "
+            + "Pass a class to the leaderboard to see its times:\n"
+            + "\n".join(lines)
+        )
+
+    # type-ignore for mypy not understanding how to work with hybrid_command decorator
+    @commands.hybrid_command()  # type: ignore[arg-type]
+    async def memory_leaderboard(
+        self,
+        ctx: commands.Context[Any],
+        day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
+        part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
+    ) -> None:
+        if day is None:
+            day = lib.today()
+        else:
+            if day > lib.today():
+                raise commands.BadArgument(f"Day {day} is in the future!")
+
+        async def format_peaks(peaks: list[tuple[int, int]]) -> str:
+            formatted = StringIO()
+            for rank, (user_id, peak) in enumerate(peaks, start=1):
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                if user:
+                    formatted.write(f"\t{rank}. {user.name}:  **{format_bytes(peak)}**\n")
+            return formatted.getvalue()
+
+        (peaks1, peaks2) = lib.get_best_memory(lib.year(), day)
+        peaks1_str = await format_peaks(peaks1)
+        peaks2_str = await format_peaks(peaks2)
+        embed = discord.Embed(title=f"Top 10 lightest toboggans for day {day}", color=0xE84611)
+        if peaks1_str and (part is None or part == 1):
+            embed.add_field(name="Part 1", value=peaks1_str, inline=True)
+        if peaks2_str and (part is None or part == 2):
+            embed.add_field(name="Part 2", value=peaks2_str, inline=True)
+        embed.set_footer(text=constants.LEADERBOARD_FOOTER)
+        await ctx.reply(embed=embed)
+
+    # `aliases` argument doesn't work for the slash-cmd part, so do it manually.
+    @commands.hybrid_command()  # type: ignore[arg-type]
+    async def mlb(
+        self,
+        ctx: commands.Context[Any],
+        day: Annotated[Optional[AdventDay], commands.Range[int, 1, 25]] = None,
+        part: Annotated[Optional[Literal[1, 2]], Literal[1, 2]] = None,
     ) -> None:
-        await self.leaderboard(ctx, day, part)  # type: ignore[arg-type]
+        await self.memory_leaderboard(ctx, day, part)  # type: ignore[arg-type]
 
     # i intentionally did not have the default behavior of automatically choosing part 1 because that's confusing
     # type-ignore for mypy not understanding how to work with hybrid_command decorator
@@ -136,9 +383,18 @@ class Commands(commands.Cog):
         day: Annotated[AdventDay, commands.Range[int, 1, 25]],
         part: Literal[1, 2],
         code: discord.Attachment,
+        profile: ProfileName = "release",
+        phases: bool = False,
     ) -> None:
         if day > lib.today():
             raise commands.BadArgument(f"Day {day} is in the future!")
+
+        solution_code = await code.read()
+        if phases and not has_phases(solution_code):
+            raise commands.BadArgument(
+                "Code benchmarked in phases must export `parse` and `solve` besides `run`"
+            )
+
         await ctx.reply("Submitting...")
         logger.info(
             "Queueing submission for %s, message = [%s], queue length = %s",
@@ -148,14 +404,114 @@ class Commands(commands.Cog):
         )
 
         # using a tuple is probably the most readable but shut
-        self.bot.queue.put_nowait((ctx, lib.year(), day, part, await code.read()))
+        job_id = self.bot.enqueue(
+            (
+                ctx,
+                lib.year(),
+                day,
+                (part,),
+                solution_code,
+                BuildProfile(profile),
+                Entrypoints.PHASES if phases else Entrypoints.RUN,
+                None,
+            )
+        )
+        logger.info("Queued job %s for %s", job_id, ctx.author)
+
+        if ctx.interaction is not None:
+            await ctx.interaction.edit_original_response(
+                content=f"Your submission for day {day} part {part} has been queued "
+                + f"as job {job_id}. "
+                + f"There are {len(self.bot.queued)} submissions in the queue."
+            )
+
+    # type-ignore for mypy not understanding how to work with hybrid_command decorator
+    @commands.hybrid_command()  # type: ignore[arg-type]
+    @commands.dm_only()
+    async def submit_both(
+        self,
+        ctx: commands.Context[Any],
+        day: Annotated[AdventDay, commands.Range[int, 1, 25]],
+        code: discord.Attachment,
+        profile: ProfileName = "release",
+    ) -> None:
+        if day > lib.today():
+            raise commands.BadArgument(f"Day {day} is in the future!")
+
+        solution_code = await code.read()
+        if both_parts(solution_code) is None:
+            raise commands.BadArgument(
+                "Code for both parts must export `part1` and `part2` (or `run_p1` and `run_p2`)"
+            )
+
+        await ctx.reply("Submitting...")
+        logger.info(
+            "Queueing submission for both parts for %s, message = [%s], queue length = %s",
+            ctx.author,
+            ctx.args,
+            self.bot.queue.qsize(),
+        )
+
+        job_id = self.bot.enqueue(
+            (
+                ctx,
+                lib.year(),
+                day,
+                (1, 2),
+                solution_code,
+                BuildProfile(profile),
+                Entrypoints.BOTH_PARTS,
+                None,
+            )
+        )
+        logger.info("Queued job %s for %s", job_id, ctx.author)
 
         if ctx.interaction is not None:
             await ctx.interaction.edit_original_response(
-                content=f"Your submission for day {day} part {part} has been queued. "
-                + f"There are {self.bot.queue.qsize()} submissions in the queue."
+                content=f"Your submission for day {day} part 1 and 2 has been queued "
+                + f"as job {job_id}. "
+                + f"There are {len(self.bot.queued)} submissions in the queue."
             )
 
+    # type-ignore for mypy not understanding how to work with hybrid_command decorator
+    @commands.hybrid_command()  # type: ignore[arg-type]
+    async def profile(
+        self,
+        ctx: commands.Context[Any],
+        submission_id: Annotated[SubmissionId, int],
+    ) -> None:
+        with Database() as db:
+            submission = db.get_submission_by_id(submission_id)
+            unprofiled = db.unprofiled_runs(submission_id)
+
+        # flamegraphs show the names of everything in the code, so they are as private as the code
+        if submission is None or submission.user_id != ctx.author.id:
+            raise commands.BadArgument(f"You have no submission with id {submission_id}.")
+
+        if unprofiled and settings.profiling.enabled:
+            # made on demand, the first /profile of a submission builds and profiles it again,
+            # queued like a submission
+            job_id = self.bot.enqueue(
+                (
+                    ctx,
+                    submission.year,
+                    submission.day,
+                    (submission.part,),
+                    submission.code.encode("utf8"),
+                    submission.build_profile,
+                    submission.entrypoints,
+                    submission,
+                )
+            )
+            logger.info("Queued job %s to profile submission %s", job_id, submission_id)
+            await ctx.reply(
+                f"Profiling submission {submission_id} has been queued as job {job_id}. "
+                + f"There are {len(self.bot.queued)} submissions in the queue."
+            )
+            return
+
+        await reply_with_profile(ctx, submission_id)
+
     # type-ignore for mypy not understanding how to work with hybrid_command decorator
     @commands.hybrid_command()  # type: ignore[arg-type]
     async def help(self, ctx: commands.Context[Any]) -> None:
@@ -186,6 +542,26 @@ def only_from_guilds(*servers: int) -> Callable[[Callable[P, T]], Callable[P, T]
     return app_commands.check(check_guild)
 
 
+def only_owner() -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Add a check to make sure the command can only be run by the bot owner."""
+
+    owner_id = int(settings.discord.owner_id)
+
+    def check_owner(itr: discord.Interaction) -> bool:  # type: ignore[type-arg]
+        return itr.user.id == owner_id
+
+    return app_commands.check(check_owner)
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Parse a YYYY-MM-DD date given to a command as midnight UTC."""
+    if value is None:
+        return None
+    return datetime.datetime.combine(
+        datetime.date.fromisoformat(value), datetime.time(), tzinfo=datetime.timezone.utc
+    )
+
+
 class ModCommands(commands.Cog):
     __slots__ = ("bot",)
 
@@ -307,6 +683,129 @@ class ModCommands(commands.Cog):
 
         await interaction.response.send_message(content=msg)
 
+    @app_commands.command()
+    @app_commands.default_permissions(manage_messages=True)
+    @only_from_guilds(*settings.discord.management_servers)
+    @only_owner()
+    @app_commands.describe(
+        container_version="Container version to measure on, defaults to the newest one",
+        submitted_with="Only submissions last measured on this container version",
+        since="Only submissions from this date on (YYYY-MM-DD)",
+        until="Only submissions from before this date (YYYY-MM-DD)",
+    )
+    async def rebench(
+        self,
+        interaction: discord.Interaction,  # type: ignore[type-arg]
+        year: Optional[app_commands.Range[int, 2015]] = None,
+        day: Optional[Annotated[AdventDay, app_commands.Range[int, 1, 25]]] = None,
+        part: Optional[Annotated[AdventPart, Literal[1, 2]]] = None,
+        user: Optional[discord.User] = None,
+        container_version: Optional[str] = None,
+        submitted_with: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> None:
+        logger.info(
+            "User %s requested a bulk re-benchmark, message = [%s]",
+            interaction.user,
+            interaction.namespace,
+        )
+
+        try:
+            with Database() as db:
+                bencher_version = (
+                    db.get_container_version(ContainerTag(submitted_with))
+                    if submitted_with is not None
+                    else None
+                )
+
+            f = SubmissionFilter(
+                year=Year(year) if year is not None else None,
+                day=day,
+                part=part,
+                user_id=user.id if user is not None else None,
+                bencher_version=bencher_version,
+                submitted_after=parse_date(since),
+                submitted_before=parse_date(until),
+            )
+
+            campaign, queued = queue_backfill(
+                f,
+                container_tag=ContainerTag(container_version) if container_version else None,
+            )
+        except (ContainerVersionError, ValueError) as e:
+            await interaction.response.send_message(content=f"Could not queue re-benchmark: {e}")
+            return
+
+        await interaction.response.send_message(
+            content=f"Queued {queued} submissions ({f.describe()}) as re-benchmark campaign "
+            + f"{campaign}, use `/rebench_progress {campaign}` to follow along."
+        )
+
+    @app_commands.command()
+    @app_commands.default_permissions(manage_messages=True)
+    @only_from_guilds(*settings.discord.management_servers)
+    @only_owner()
+    async def rebench_progress(
+        self,
+        interaction: discord.Interaction,  # type: ignore[type-arg]
+        campaign: Annotated[CampaignId, int],
+    ) -> None:
+        with Database() as db:
+            progress = db.campaign_progress(campaign)
+
+        if progress is None:
+            await interaction.response.send_message(
+                content=f"Re-benchmark campaign {campaign} does not exist."
+            )
+            return
+
+        await interaction.response.send_message(
+            content=f"Re-benchmark campaign {campaign} '{progress.description}': "
+            + f"{progress.done}/{progress.total} done, {progress.failed} failed, "
+            + f"{progress.remaining} left."
+        )
+
+    @app_commands.command()
+    @app_commands.default_permissions(manage_messages=True)
+    @only_from_guilds(*settings.discord.management_servers)
+    @only_owner()
+    async def images(
+        self,
+        interaction: discord.Interaction,  # type: ignore[type-arg]
+    ) -> None:
+        await interaction.response.defer()
+        await interaction.followup.send(content=await describe_images())
+
+    @app_commands.command()
+    @app_commands.default_permissions(manage_messages=True)
+    @only_from_guilds(*settings.discord.management_servers)
+    @only_owner()
+    async def workers(
+        self,
+        interaction: discord.Interaction,  # type: ignore[type-arg]
+    ) -> None:
+        if self.bot.dispatcher is None:
+            content = "Workers are disabled, submissions are measured on the bot's host."
+        else:
+            content = self.bot.dispatcher.describe()
+        await interaction.response.send_message(content=content)
+
+    @app_commands.command()
+    @app_commands.default_permissions(manage_messages=True)
+    @only_from_guilds(*settings.discord.management_servers)
+    @only_owner()
+    async def cancel(
+        self,
+        interaction: discord.Interaction,  # type: ignore[type-arg]
+        job: int,
+    ) -> None:
+        if self.bot.cancel(JobId(job)):
+            content = f"Cancelled job {job}."
+        else:
+            content = f"Job {job} is not queued or running."
+        await interaction.response.send_message(content=content)
+
 
 async def prefix(dbot: commands.Bot, message: discord.Message) -> list[str]:
     # TODO(ultrabear): Bot.user is a Nullable field,
@@ -329,6 +828,8 @@ async def periodic_check_caller() -> None:
         try:
             logger.info("calling periodic check function")
             await bg_update()
+            if settings.images.enabled:
+                await manage_images()
         except Exception:
             logger.exception("Unknown issue in periodic checking function.")
 
@@ -336,6 +837,41 @@ async def periodic_check_caller() -> None:
         await asyncio.sleep(60 * 30)
 
 
+async def notify_owner(dbot: commands.Bot, message: str) -> None:
+    owner_id = int(settings.discord.owner_id)
+    owner = dbot.get_user(owner_id) or await dbot.fetch_user(owner_id)
+    await owner.send(message)
+
+
+async def periodic_calibration_caller(dbot: commands.Bot) -> None:
+    """
+    Calibrate the host on the newest container version whenever that version has not been
+    calibrated yet, or its last calibration is older than calibration.interval_hours.
+    """
+    await dbot.wait_until_ready()
+    interval = datetime.timedelta(hours=float(settings.calibration.interval_hours))
+
+    while True:
+        try:
+            with Database() as db:
+                version_id, container_tag = db.newest_container_version(
+                    constants.SUPPORTED_BENCH_FORMAT
+                )
+                last = db.last_calibration_time(version_id)
+
+            now = datetime.datetime.now(tz=datetime.timezone.utc)
+            if last is None or now - last > interval:
+                report = await lib.calibrate(version_id, container_tag)
+                if report.exceeds(float(settings.calibration.drift_threshold)):
+                    logger.warning("Host drift detected: %s", report.describe())
+                    await notify_owner(dbot, f"⚠️ {report.describe()}")
+        except Exception:
+            logger.exception("Unknown issue in periodic calibration function.")
+
+        # check every hour, new container versions get picked up by the next check
+        await asyncio.sleep(60 * 60)
+
+
 def main() -> None:
     logformat = "%(asctime)s:%(levelname)s:%(name)s:%(message)s"
     logging.basicConfig(
@@ -358,6 +894,27 @@ def main() -> None:
         )
         sys.exit(1)
 
+    try:
+        host_lanes = lanes()
+    except ValueError:
+        logger.exception("Invalid lanes config.")
+        sys.exit(1)
+    if host_lanes is not None:
+        # threads started from here on inherit this, the executor's included
+        os.sched_setaffinity(0, host_lanes[LaneKind.BUILD].cpus)
+        logger.info("Measure lane: %s", host_lanes[LaneKind.MEASURE].record())
+
+    hardware = local_hardware()
+    with Database() as db:
+        if classified := db.classify_unknown_hardware(
+            hardware.hardware_class(), hardware.describe()
+        ):
+            logger.info(
+                "Classified %s submissions from before hardware classes as %s",
+                classified,
+                hardware.hardware_class(),
+            )
+
     bot = MyBot(
         intents=intents,
         command_prefix=prefix,
@@ -372,8 +929,15 @@ def main() -> None:
         ),
     )
 
-    async def init(bot: discord.Client, token: str) -> None:
+    async def init(bot: MyBot, token: str) -> None:
+        if settings.workers.enabled:
+            bot.dispatcher = Dispatcher(float(settings.workers.lease_seconds))
+            await serve(bot.dispatcher, settings.workers.listen, settings.workers.token)
         asyncio.create_task(periodic_check_caller())
+        asyncio.create_task(periodic_calibration_caller(bot))
+        asyncio.create_task(rebench_worker(bot.has_live_work))
+        if settings.release.enabled:
+            asyncio.create_task(release_worker())
 
         async with bot:
             await bot.start(token)
@@ -0,0 +1,97 @@
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class BuildCacheKey:
+    """
+    Which cached `target/` a build may reuse. Artifacts are never shared between users, and
+    artifacts from another container version would be rebuilt by cargo anyways. Each build
+    profile keeps its own, switching profiles would rebuild every crate otherwise.
+    """
+
+    user_id: int
+    year: int
+    day: int
+    container_tag: str
+    build_profile: str = "release"
+
+    def dirname(self) -> str:
+        tag = re.sub(r"[^\w.-]", "_", self.container_tag)
+        name = f"{self.user_id}-{self.year}-{self.day:02}-{tag}"
+        # release builds keep the names they were cached under before there were profiles
+        return name if self.build_profile == "release" else f"{name}-{self.build_profile}"
+
+
+def _disk_usage(path: str) -> int:
+    """Bytes on disk used by everything under path."""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_blocks * 512
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def checkout(cache_dir: str, key: BuildCacheKey, target_dir: str, /) -> bool:
+    """
+    Move the cached `target/` for key to target_dir, replacing what is there. The entry leaves
+    the cache while it is in use, so two builds can never write to the same one.
+    Returns whether there was an entry.
+    """
+    entry = os.path.join(cache_dir, key.dirname())
+    if not os.path.isdir(entry):
+        return False
+
+    shutil.rmtree(target_dir, ignore_errors=True)
+    shutil.move(entry, target_dir)
+    logger.info("Reusing cached build %s", key.dirname())
+    return True
+
+
+def checkin(cache_dir: str, key: BuildCacheKey, target_dir: str, /) -> None:
+    """
+    Move target_dir back into the cache as the entry for key, marking it as the most recently
+    used one. A newer entry checked in by another build in the meantime is replaced.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, key.dirname())
+    shutil.rmtree(entry, ignore_errors=True)
+    shutil.move(target_dir, entry)
+    # the mtime of the entry itself is what evict orders by
+    os.utime(entry)
+
+
+def evict(cache_dir: str, max_bytes: int, /) -> list[str]:
+    """
+    Remove the least recently used entries until the cache fits in max_bytes.
+    Returns the names of the removed entries.
+    """
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return []
+
+    sized = sorted(
+        ((e.stat(follow_symlinks=False).st_mtime, e.name, _disk_usage(e.path)) for e in entries),
+        reverse=True,
+    )
+    total = sum(size for _, _, size in sized)
+
+    evicted = []
+    while total > max_bytes and sized:
+        _, name, size = sized.pop()
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        evicted.append(name)
+
+    if evicted:
+        logger.info("Evicted %s cached builds, %s bytes left", len(evicted), total)
+    return evicted
@@ -0,0 +1,106 @@
+import math
+import os.path
+import random
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional
+
+from .picoseconds import Picoseconds
+
+CALIBRATION_DIR = os.path.join(os.path.dirname(__file__), "../runner/calibration")
+
+
+def _gen_sort(rng: random.Random) -> str:
+    return "\n".join(str(rng.randrange(10**12)) for _ in range(100_000)) + "\n"
+
+
+def _gen_words(rng: random.Random) -> str:
+    vocab = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9))) for _ in range(5000)
+    ]
+    # skew the distribution so the hashmap has both hot and cold keys
+    return " ".join(rng.choices(vocab, weights=range(len(vocab), 0, -1), k=200_000)) + "\n"
+
+
+def _gen_grid(rng: random.Random) -> str:
+    size = 400
+    rows = []
+    for y in range(size):
+        rows.append(
+            "".join("." if (x, y) == (0, 0) or rng.random() > 0.3 else "#" for x in range(size))
+        )
+    return "\n".join(rows) + "\n"
+
+
+@dataclass(slots=True, frozen=True)
+class Workload:
+    """A fixed reference solution, benchmarked to measure the host rather than a submission."""
+
+    name: str
+    generate_input: Callable[[random.Random], str]
+    # seeded so every host and every run gets byte-identical inputs
+    seed: int
+
+    @property
+    def source_path(self) -> str:
+        return os.path.join(CALIBRATION_DIR, f"{self.name}.rs")
+
+    def code(self) -> bytes:
+        with open(self.source_path, "rb") as fp:
+            return fp.read()
+
+    def input(self) -> str:
+        return self.generate_input(random.Random(self.seed))
+
+
+WORKLOADS: tuple[Workload, ...] = (
+    Workload("sort", _gen_sort, 2015),
+    Workload("words", _gen_words, 2016),
+    Workload("grid", _gen_grid, 2017),
+)
+
+
+def relative_speed(
+    reference: Mapping[str, Picoseconds], measured: Mapping[str, Picoseconds]
+) -> Optional[float]:
+    """
+    Geometric mean of measured/reference over the workloads both sides have, so >1 means the
+    measured calibration is slower than the reference. Returns None if nothing can be compared.
+    """
+    ratios = [
+        measured[name].as_picos() / reference[name].as_picos()
+        for name in reference.keys() & measured.keys()
+        if reference[name].as_picos() > 0 and measured[name].as_picos() > 0
+    ]
+
+    if not ratios:
+        return None
+
+    return math.exp(sum(math.log(r) for r in ratios) / len(ratios))
+
+
+def normalize(raw: Picoseconds, speed: Optional[float]) -> Optional[Picoseconds]:
+    """Scale a raw time measured on a host with the given relative speed back to the reference host."""
+    if speed is None:
+        return None
+    return Picoseconds.from_picos(raw.as_picos() / speed)
+
+
+@dataclass(slots=True, frozen=True)
+class DriftReport:
+    """How far the host has moved since a container version was first calibrated."""
+
+    version_tag: str
+    # relative speed of the latest calibration against the first one on the same version
+    drift: Optional[float]
+
+    def exceeds(self, threshold: float) -> bool:
+        return self.drift is not None and abs(self.drift - 1.0) > threshold
+
+    def describe(self) -> str:
+        if self.drift is None:
+            return f"No calibration history for container version {self.version_tag} yet."
+        direction = "slower" if self.drift > 1.0 else "faster"
+        return (
+            f"Host calibration for container version {self.version_tag} is "
+            f"{abs(self.drift - 1.0):.1%} {direction} than when the version was first calibrated."
+        )
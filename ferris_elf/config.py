@@ -24,6 +24,64 @@ settings = Dynaconf(
         Validator("aoc.inputs_dir", must_exist=True),
         Validator("docker.container_ref", must_exist=True),
         Validator("aoc_auth.tokens", must_exist=True, len_min=1),
+        Validator("noise.max_ci_width", default=0.05, cast=float),
+        Validator("noise.max_outlier_ratio", default=0.1, cast=float),
+        Validator("noise.max_attempts", default=3, cast=int, gte=1),
+        Validator(
+            "leaderboard.ranking",
+            default="median",
+            is_in=["median", "ties", "upper_bound"],
+        ),
+        Validator("calibration.interval_hours", default=24, cast=float, gt=0),
+        Validator("calibration.drift_threshold", default=0.05, cast=float),
+        Validator("rebench.throttle_seconds", default=30, cast=float, gte=0),
+        Validator("rebench.idle_seconds", default=60, cast=float, gt=0),
+        Validator("rebench.batch_size", default=4, cast=int, gte=1),
+        Validator("profiling.enabled", default=False, cast=bool),
+        Validator("profiling.seconds", default=5, cast=int, gt=0),
+        Validator("counters.enabled", default=False, cast=bool),
+        Validator("counters.iterations", default=10, cast=int, gt=0),
+        Validator("cold.fresh_runs", default=0, cast=int, gte=0),
+        Validator("leaderboard.show_cold", default=False, cast=bool),
+        Validator("build_cache.enabled", default=False, cast=bool),
+        Validator("build_cache.dir", default="build_cache/"),
+        Validator("build_cache.max_megabytes", default=10240, cast=int, gte=0),
+        Validator("workspace.dir", default="workspace/"),
+        Validator("input_cache.dir", default="input_cache/"),
+        Validator("aoc.base_url", default="https://adventofcode.com"),
+        Validator("fetch.min_interval_seconds", default=0.5, cast=float, gte=0),
+        Validator("fetch.max_attempts", default=5, cast=int, gte=1),
+        Validator("fetch.timeout_seconds", default=10, cast=float, gt=0),
+        Validator("release.enabled", default=False, cast=bool),
+        Validator("release.prewarm_minutes", default=5, cast=float, gte=0),
+        Validator("release.fetch_attempts", default=30, cast=int, gte=1),
+        Validator("release.hold_minutes", default=15, cast=float, gte=0),
+        Validator("deadlines.check", default=30, cast=float, gt=0),
+        Validator("deadlines.build", default=90, cast=float, gt=0),
+        Validator("deadlines.pgo", default=300, cast=float, gt=0),
+        Validator("deadlines.run", default=120, cast=float, gt=0),
+        Validator("deadlines.cold", default=120, cast=float, gt=0),
+        Validator("deadlines.profile", default=120, cast=float, gt=0),
+        Validator("deadlines.default", default=60, cast=float, gt=0),
+        Validator("images.enabled", default=False, cast=bool),
+        Validator("images.keep", default=3, cast=int, gte=1),
+        Validator("build.prune_dependencies", default=False, cast=bool),
+        Validator("build.check_first", default=False, cast=bool),
+        Validator("lanes.enabled", default=False, cast=bool),
+        Validator("lanes.measure_cpus", default=""),
+        Validator("lanes.cpu_period", default=100000, cast=int, gte=1000, lte=1000000),
+        Validator("lanes.cpu_quota", default=0, cast=int, gte=0),
+        Validator("lanes.pids_limit", default=512, cast=int, gt=0),
+        Validator("lanes.blkio_devices", default=[]),
+        Validator("lanes.build_read_bps", default=0, cast=int, gte=0),
+        Validator("lanes.build_write_bps", default=0, cast=int, gte=0),
+        Validator("lanes.no_swap", default=True, cast=bool),
+        Validator("workers.enabled", default=False, cast=bool),
+        Validator("workers.listen", default="127.0.0.1:8787"),
+        Validator("workers.server", default="http://127.0.0.1:8787"),
+        Validator("workers.lease_seconds", default=1800, cast=float, gt=0),
+        Validator("workers.poll_seconds", default=30, cast=float, gt=0, lte=60),
+        Validator("workers.token", must_exist=True, when=Validator("workers.enabled", eq=True)),
     ],
 )
 
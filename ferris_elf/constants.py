@@ -2,7 +2,11 @@ from typing import Literal
 import discord
 from .config import settings
 
-SUPPORTED_BENCH_FORMAT: int = 1
+# the newest bench format the harness in runner/ speaks, container versions up to this are used
+# 1: a single `run` function
+# 2: optional `parse` and `solve` functions, benchmarked separately as well
+# 3: optional `part1` and `part2` functions, one build benchmarked once per part
+SUPPORTED_BENCH_FORMAT: int = 3
 
 HELP_REPLY = discord.Embed(
     title="Ferris Elf help page",
@@ -10,8 +14,11 @@ HELP_REPLY = discord.Embed(
     description=f"""
 **help** - Send this message
 **info** - Some useful information about benchmarking
-**best _[day]_ _[part]_** - Best times so far for a day
-**submit _[day]_ _[part]_ <attachment>** - Benchmark attached code
+**best _[day]_ _[part]_ _[profile]_** - Best times so far for a day, of one build profile if given
+**mlb _[day]_ _[part]_** - Lowest peak memory so far for a day
+**submit _[day]_ _[part]_ <attachment> _[profile]_** - Benchmark attached code
+**submit_both _[day]_ <attachment> _[profile]_** - Benchmark attached code for both parts at once
+**profile _[submission]_** - Flamegraphs and hardware counters of one of your submissions
 
 If [_day_] and/or [_part_] is ommited, they are assumed to be today and part 1
 
@@ -33,6 +40,16 @@ pub fn run(input: &str) -> i64 {{
 Input can be either a &str or a &[u8], which ever you prefer. The return should \
 be the solution to the day and part.
 
+To see how long parsing takes on its own, also export `pub fn parse(input: &str) -> T` \
+and `pub fn solve(parsed: T) -> impl Display`, for any type T, and submit with `phases` \
+set. They are benchmarked separately in addition to `run`.
+
+To submit both parts at once with `submit_both`, export `pub fn part1(input: &str)` and \
+`pub fn part2(input: &str)` (or `run_p1` and `run_p2`) instead of `run`. The code is built \
+once, and each part is verified and benchmarked on its own.
+
+Code is built with cargo's release profile, unless you submit with another build profile: `lto` adds fat link time optimization with one codegen unit, `pgo` also optimizes with a profile of your code running once on each of the day's inputs. Leaderboards show the best of any profile, pass a profile to see only its builds.
+
 Rust version is {{settings.discord.rust_version_info}}.
 
 **Available dependencies**
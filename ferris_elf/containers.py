@@ -1,43 +1,141 @@
 import asyncio
 import logging
 import functools
-from typing import Any, Optional, TypeAlias, NamedTuple
+from typing import Any, Callable, Optional, TypeAlias, TypeVar, NamedTuple
 import urllib.parse
 
 import docker
+import docker.models.containers
+import requests
 import aiohttp as ah
+from . import registry
+from .lanes import Lane, LaneKind, online_cpus, parse_cpuset, plan_lanes, smt_siblings
 from .database import Database, ContainerTag
 
 from .config import settings
 
-doc = docker.from_env()
-
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 VolumeDetails: TypeAlias = dict[str, str]
 VolumesInfo: TypeAlias = dict[str, VolumeDetails]
 
+MEM_LIMIT = "8g"
+
+
+@functools.cache
+def docker_client() -> docker.DockerClient:
+    """The docker daemon's client, connected on first use rather than on import."""
+    return docker.from_env()
+
+
+@functools.cache
+def lanes() -> Optional[dict[LaneKind, Lane]]:
+    """The lanes containers run in, None when lanes are disabled."""
+    if not settings.lanes.enabled:
+        return None
+
+    def throttles(bps: int) -> tuple[tuple[str, int], ...]:
+        return tuple((device, bps) for device in settings.lanes.blkio_devices) if bps else ()
+
+    return plan_lanes(
+        parse_cpuset(settings.lanes.measure_cpus),
+        online_cpus(),
+        smt_siblings,
+        cpu_period=int(settings.lanes.cpu_period),
+        cpu_quota=int(settings.lanes.cpu_quota),
+        pids_limit=int(settings.lanes.pids_limit),
+        build_read_bps=throttles(int(settings.lanes.build_read_bps)),
+        build_write_bps=throttles(int(settings.lanes.build_write_bps)),
+        no_swap=bool(settings.lanes.no_swap),
+    )
+
+
+class DeadlineExceeded(docker.errors.ContainerError):  # type: ignore[misc]
+    """A container killed by run_cmd for running past its deadline."""
+
+
+def _discard(container: docker.models.containers.Container) -> None:
+    try:
+        # kills it first if it still runs
+        container.remove(force=True)
+    except docker.errors.NotFound:
+        pass
+    except docker.errors.APIError:
+        logger.exception("Could not remove container %s", container.short_id)
 
-async def run_cmd(image: str, cmd: str, env: dict[str, str], vols: VolumesInfo) -> str:
+
+async def run_cmd(
+    image: str,
+    cmd: str | list[str],
+    env: dict[str, str],
+    vols: VolumesInfo,
+    cap_add: Optional[list[str]] = None,
+    deadline: Optional[float] = None,
+    lane: LaneKind = LaneKind.BUILD,
+) -> str:
     """
     Thin wrapper to simplify the Docker interface & provide secure defaults.
+    cap_add grants extra capabilities, only pass what the command strictly needs.
+    Only timed runs belong in the measure lane, when lanes are enabled.
+
+    The container is killed once it has run for deadline seconds, deadlines.default if None,
+    and DeadlineExceeded is raised. Cancelling the awaiting task kills it right away as well.
     """
-    loop = asyncio.get_event_loop()
-    raw_out = await loop.run_in_executor(
-        None,
-        functools.partial(
-            doc.containers.run,
-            image,
-            cmd,
-            environment=env,
-            remove=True,
-            stdout=True,
-            stderr=True,
-            mem_limit="8g",
-            network_mode="none",
-            volumes=vols,
-        ),
+    if deadline is None:
+        deadline = float(settings.deadlines.default)
+    loop = asyncio.get_running_loop()
+    host_lanes = lanes()
+    lane_options = host_lanes[lane].container_options(MEM_LIMIT) if host_lanes else {}
+
+    def call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> asyncio.Future[T]:
+        return loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    starting = call(
+        docker_client().containers.run,
+        image,
+        cmd,
+        detach=True,
+        environment=env,
+        mem_limit=MEM_LIMIT,
+        network_mode="none",
+        volumes=vols,
+        cap_add=cap_add,
+        **lane_options,
     )
+    try:
+        container = await asyncio.shield(starting)
+    except asyncio.CancelledError:
+        # the container still comes up, remove it once it has
+        starting.add_done_callback(
+            lambda f: f.cancelled() or f.exception() or call(_discard, f.result())
+        )
+        raise
+
+    started = loop.time()
+    try:
+        try:
+            # a timeout on the request itself, so a hung daemon doesn't keep the thread forever
+            status = await call(container.wait, timeout=deadline)
+        except requests.exceptions.RequestException:
+            if loop.time() - started < deadline:
+                raise
+            logger.warning("Killing container %s after %.0fs", container.short_id, deadline)
+            # 124 like timeout(1), which used to enforce the deadlines inside the containers
+            raise DeadlineExceeded(
+                container, 124, cmd, image, f"killed after {deadline:.0f}s".encode()
+            )
+
+        exit_status: int = status["StatusCode"]
+        if exit_status != 0:
+            stderr = await call(container.logs, stdout=False, stderr=True)
+            raise docker.errors.ContainerError(container, exit_status, cmd, image, stderr)
+        raw_out: bytes = await call(container.logs, stdout=True, stderr=True)
+    finally:
+        # also when the task was cancelled, killing the container ends the wait above
+        await asyncio.shield(call(_discard, container))
+
     out: str = raw_out.decode("utf-8")
     return out
 
@@ -49,31 +147,48 @@ async def bg_update() -> None:
     """
     logger.info("Starting background update.")
     image = settings.docker.container_ref
+    user_url = _parse_image_ref(image)
+    api_base = _get_api_base(image)
+    repo = user_url.path.strip("/")
 
     async with ah.ClientSession() as session:
-        # TODO: get_remote_tags is supposed to be paginated...
-        tags = set(await get_remote_tags(session, image))
-        new_versions: set[str] = set()
+        # one token for every request below, rather than each of them asking at once
+        auth_token = await auth(session, api_base, repo)
+        tags = set(await get_remote_tags(session, image, auth_token))
+        tags.discard("latest")
         with Database() as db:
             new_versions = db.pick_new_container_versions(tags)
-        for ver in new_versions:
-            logger.info("Loading container version: %s", ver)
-            rust_ver = await get_rust_version(image, ver)
-
-            # Version processing
-            bench_format = "1"
-            _stamp = None
-            if "latest" == ver:
-                continue
-            if "." in ver:
-                bench_format, _stamp = ver.split(".")
-            else:
-                _stamp = ver
-
-            # Save to DB
-            with Database() as db:
-                # TODO: Figure out something to do with the bench_dir
-                db.insert_container_version(rust_ver.ver, ContainerTag(ver), bytes())
+        if not new_versions:
+            logger.info("Background check finished.")
+            return
+
+        labels = await registry.labels_for_tags(
+            session, f"{api_base}/{repo}", new_versions, {"Authorization": auth_token}
+        )
+
+    for ver, ver_labels in labels.items():
+        logger.info("Loading container version: %s", ver)
+        if isinstance(ver_labels, BaseException):
+            logger.warning("Could not read the labels of %s: %r", ver, ver_labels)
+            ver_labels = {}
+
+        bench_format = registry.bench_format_of(ver, ver_labels)
+        rustc_ver = registry.rustc_version_of(ver_labels)
+        if rustc_ver is None:
+            # images built before the label existed, ask the toolchain itself
+            rustc_ver = (await get_rust_version(image, ver)).ver
+
+        # Save to DB
+        with Database() as db:
+            # TODO: Figure out something to do with the bench_dir
+            db.insert_container_version(
+                rustc_ver,
+                ContainerTag(ver),
+                bytes(),
+                bench_format=bench_format,
+                # the image manager makes it usable once its image is pulled
+                pulled=not settings.images.enabled,
+            )
 
     logger.info("Background check finished.")
 
@@ -89,7 +204,7 @@ class RustVersion(NamedTuple):
 
 async def get_rust_version(image: str, tag: str) -> RustVersion:
     cmd = "rustc --version"
-    out = await run_cmd(image, cmd, {}, {})
+    out = await run_cmd(f"{image}:{tag}", cmd, {}, {})
     _, ver, git_hash, dstamp = out.split(" ")
     git_hash = git_hash.strip("()")
     dstamp = dstamp.strip("()")
@@ -132,7 +247,7 @@ async def default_auth_handler(_session: ah.ClientSession, _api_base: str, _repo
 
 
 async def auth(session: ah.ClientSession, api_base: str, repo: str) -> str:
-    if api_base in API_URLs:
+    if api_base in AUTH_TOKENS:
         # Callers are expected to delete items from AUTH_TOKENS when they get a 403.
         return AUTH_TOKENS[api_base]
 
@@ -172,27 +287,16 @@ def _get_api_base(image_ref: str) -> str:
 async def get_remote_tags(
     session: ah.ClientSession, image_ref: str, auth_token: Optional[str] = None
 ) -> list[str]:
-    """Use the OCI Distribution API to get a list of tags for an image."""
+    """Use the OCI Distribution API to get a list of all tags for an image."""
 
     user_url = _parse_image_ref(image_ref)
     api_base = _get_api_base(image_ref)
     repo = user_url.path.strip("/")
 
-    target_url = "/".join([api_base, user_url.path, "tags/list"])
-
     auth_token = auth_token or await auth(session, api_base, repo)
-    headers = {
-        "Authorization": auth_token,
-        "Accept": "application/vnd.docker.distribution.manifest.v2+json",
-    }
 
-    async with session.get(target_url, headers=headers, raise_for_status=True) as response:
-        # FIXME: We should be expecting at least 404 & 403 here.
-        # TODO: This is actually a paginated API. Need `async yield` + multiple requests.
-        # Yeah, the typechecker has no way of confirming what's up.
-        # The remote API could change at any time. Such is life.
-        rv: list[str] = (await response.json())["tags"]
-        return rv
+    # FIXME: We should be expecting at least 404 & 403 here.
+    return await registry.list_tags(session, f"{api_base}/{repo}", {"Authorization": auth_token})
 
 
 async def get_remote_manifest(
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Self
+
+# names of the counters in the `ferris-counters` record written by runner/benches/bench.rs,
+# in the order they are stored
+COUNTER_NAMES = ("instructions", "cycles", "branch_misses", "l1d_misses", "llc_misses")
+
+
+def _sum(values: Iterable[Optional[int]]) -> Optional[int]:
+    """Sum of the values, or None if any of them is missing, so partial totals are never shown."""
+    total = 0
+    for v in values:
+        if v is None:
+            return None
+        total += v
+    return total
+
+
+@dataclass(slots=True, frozen=True)
+class HardwareCounters:
+    """
+    Totals of the hardware performance counters over several calls of a submission.
+    Counters the host could not open are None.
+    """
+
+    iterations: int
+    instructions: Optional[int]
+    cycles: Optional[int]
+    branch_misses: Optional[int]
+    l1d_misses: Optional[int]
+    llc_misses: Optional[int]
+
+    @classmethod
+    def from_record(cls, blob: dict[str, Any]) -> Optional[Self]:
+        """Parse a `ferris-counters` record, None if the runner could not count anything."""
+        iterations = blob.get("iterations")
+        if not isinstance(iterations, int) or iterations <= 0:
+            return None
+
+        values = [blob.get(name) for name in COUNTER_NAMES]
+        if all(v is None for v in values):
+            return None
+
+        instructions, cycles, branch_misses, l1d_misses, llc_misses = (
+            int(v) if isinstance(v, (int, float)) else None for v in values
+        )
+        return cls(iterations, instructions, cycles, branch_misses, l1d_misses, llc_misses)
+
+    @classmethod
+    def combine(cls, counters: Iterable[Self]) -> Optional[Self]:
+        """Add up the counters of several runs, e.g. one per input. None if there are none."""
+        counters = list(counters)
+        if not counters:
+            return None
+
+        return cls(
+            sum(c.iterations for c in counters),
+            _sum(c.instructions for c in counters),
+            _sum(c.cycles for c in counters),
+            _sum(c.branch_misses for c in counters),
+            _sum(c.l1d_misses for c in counters),
+            _sum(c.llc_misses for c in counters),
+        )
+
+    @property
+    def ipc(self) -> Optional[float]:
+        """Instructions per cycle."""
+        if self.instructions is None or not self.cycles:
+            return None
+        return self.instructions / self.cycles
+
+    def per_kilo_instruction(self, count: Optional[int]) -> Optional[float]:
+        """Events per thousand instructions, the usual way to compare miss counts across code."""
+        if count is None or not self.instructions:
+            return None
+        return count * 1000 / self.instructions
+
+    def describe(self) -> str:
+        parts = []
+        if (ipc := self.ipc) is not None:
+            parts.append(f"IPC: **{ipc:.2f}**")
+        for label, count in (
+            ("Branch misses", self.branch_misses),
+            ("L1d misses", self.l1d_misses),
+            ("LLC misses", self.llc_misses),
+        ):
+            if (mpki := self.per_kilo_instruction(count)) is not None:
+                parts.append(f"{label}: **{mpki:.2f}**/1k instr")
+        return "\n".join(parts)
@@ -1,10 +1,10 @@
 import datetime
+import enum
 import logging
 import os.path
 import sqlite3
 from typing import (
     TYPE_CHECKING,
-    Iterator,
     Literal,
     NewType,
     Optional,
@@ -16,9 +16,18 @@ from typing import (
 )
 from dataclasses import dataclass
 import gzip
+import hashlib
 
 from . import config
+from .calibration import normalize, relative_speed
+from .counters import COUNTER_NAMES, HardwareCounters
+from .entrypoints import Entrypoints
+from .hardware import HardwareClass
+from .memory import MemoryUsage
 from .picoseconds import Picoseconds
+from .profiles import BuildProfile
+from .ranking import RankedTime, RankingMode, rank_times
+from .samples import pack_samples, unpack_samples
 
 if TYPE_CHECKING:
     from lib import RunResult
@@ -32,13 +41,17 @@ AdventPart: TypeAlias = Literal[1, 2]
 
 SessionLabel = NewType("SessionLabel", str)
 SubmissionId = NewType("SubmissionId", int)
+BenchRunId = NewType("BenchRunId", int)
 Year = NewType("Year", int)
 ContainerVersionId = NewType("ContainerVersionId", int)
 ContainerTag = NewType("ContainerTag", str)
+CampaignId = NewType("CampaignId", int)
+RebenchJobId = NewType("RebenchJobId", int)
 
 
 @dataclass(slots=True, frozen=True)
 class BenchmarkRun:
+    id: BenchRunId
     submission: SubmissionId
     run_time: Picoseconds
     label: SessionLabel
@@ -60,12 +73,81 @@ class Submission:
     bencher_version: ContainerVersionId
     benchmark_format: int
     benches: list[BenchmarkRun]
+    build_profile: BuildProfile = BuildProfile.RELEASE
+    entrypoints: Entrypoints = Entrypoints.RUN
 
 
 class ContainerVersionError(Exception):
     __slots__ = ()
 
 
+class RebenchStatus(enum.StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    # the submission was invalidated or removed before the job ran
+    SKIPPED = "skipped"
+
+
+@dataclass(slots=True, frozen=True)
+class RebenchJob:
+    id: RebenchJobId
+    campaign: CampaignId
+    submission: SubmissionId
+    container_version: ContainerVersionId
+    container_tag: ContainerTag
+    # the campaign was queued with SubmissionFilter.include_invalid
+    include_invalid: bool = False
+    # of the container version, older ones can't build every profile
+    bench_format: int = 1
+
+
+@dataclass(slots=True, frozen=True)
+class SubmissionFilter:
+    """Selects submissions for a bulk re-benchmark, fields left as None match everything"""
+
+    year: Optional[Year] = None
+    day: Optional[AdventDay] = None
+    part: Optional[AdventPart] = None
+    user_id: Optional[int] = None
+    bencher_version: Optional[ContainerVersionId] = None
+    submitted_after: Optional[datetime.datetime] = None
+    submitted_before: Optional[datetime.datetime] = None
+    include_invalid: bool = False
+
+    def describe(self) -> str:
+        parts = [
+            f"{name}={value}"
+            for name, value in (
+                ("year", self.year),
+                ("day", self.day),
+                ("part", self.part),
+                ("user", self.user_id),
+                ("version", self.bencher_version),
+                ("after", self.submitted_after and self.submitted_after.date()),
+                ("before", self.submitted_before and self.submitted_before.date()),
+            )
+            if value is not None
+        ]
+        if self.include_invalid:
+            parts.append("including invalid")
+        return ", ".join(parts) or "all submissions"
+
+
+@dataclass(slots=True, frozen=True)
+class CampaignProgress:
+    campaign: CampaignId
+    description: str
+    total: int
+    done: int
+    failed: int
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.done - self.failed
+
+
 _T = TypeVar("_T")
 
 
@@ -223,6 +305,9 @@ class Database:
         container_v: ContainerVersionId,
         benchmark_format: int,
         /,
+        build_profile: BuildProfile = BuildProfile.RELEASE,
+        hardware_class: Optional[HardwareClass] = None,
+        entrypoints: Entrypoints = Entrypoints.RUN,
     ) -> SubmissionId:
         """
         Saves a benchmark submission to the database
@@ -236,7 +321,7 @@ class Database:
 
         # unnamed fields are filled with default types
         rowid = self._cursor.execute(
-            "INSERT INTO submissions (user, year, day_part, code, bencher_version, benchmark_format) VALUES (?, ?, ?, ?, ?, ?)",
+            "INSERT INTO submissions (user, year, day_part, code, bencher_version, benchmark_format, build_profile, hardware_class, entrypoints) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 str(author_id),
                 year,
@@ -244,6 +329,9 @@ class Database:
                 compressed,
                 container_v,
                 benchmark_format,
+                build_profile,
+                hardware_class,
+                entrypoints,
             ),
         ).lastrowid
 
@@ -259,17 +347,46 @@ class Database:
         avg_time: Picoseconds,
         answer: str,
         /,
-    ) -> Optional[bool]:
+        *,
+        attempts: int = 1,
+        variance: Optional[float] = None,
+        bounds: Optional[tuple[Picoseconds, Picoseconds]] = None,
+        bencher_version: Optional[ContainerVersionId] = None,
+    ) -> tuple[BenchRunId, Optional[bool]]:
         """
-        Saves result of a benchmarking run to the database, returns
-        True if answer was valid, False if it was not valid, and None if the answer
+        Saves result of a benchmarking run to the database, returns the BenchRunId of the new row
+        alongside True if answer was valid, False if it was not valid, and None if the answer
         was not available to check
+
+        attempts is how many times the input was measured before this run was accepted,
+        variance is the variance of the accepted run's samples, in ps^2,
+        bounds are the (low, high) bounds of criterion's confidence interval,
+        and bencher_version is the container version the run was measured on,
+        which defaults to the submission's bencher_version
         """
 
-        self._cursor.execute(
-            "INSERT INTO benchmark_runs (submission, session_label, average_time, answer) VALUES (?, ?, ?, ?)",
-            (submission_id, input_used, avg_time.as_picos(), answer),
-        )
+        low, high = (bounds[0].as_picos(), bounds[1].as_picos()) if bounds else (None, None)
+
+        run_id = self._cursor.execute(
+            "INSERT INTO benchmark_runs (submission, session_label, average_time, answer, attempts, sample_variance, low_bound, high_bound, bencher_version) "
+            + "VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, (SELECT bencher_version FROM submissions WHERE submission_id = ?)))",
+            (
+                submission_id,
+                input_used,
+                avg_time.as_picos(),
+                answer,
+                attempts,
+                variance,
+                low,
+                high,
+                bencher_version,
+                submission_id,
+            ),
+        ).lastrowid
+
+        # must be non null after successful .execute call
+        assert run_id is not None
+        bench_run_id = BenchRunId(run_id)
 
         year, day_part = _unwrap(
             self._cursor.execute(
@@ -304,14 +421,222 @@ class Database:
                     "UPDATE submissions SET valid = 0 WHERE submission_id = ?", (submission_id,)
                 )
 
-            return correct
+            return bench_run_id, correct
+
+        return bench_run_id, None
+
+    def save_bench_samples(self, run_id: BenchRunId, samples: Sequence[int], /) -> None:
+        """
+        Saves the raw per-iteration sample times (in picoseconds) criterion measured for a
+        benchmark run, so estimators can be recomputed later without re-running the container
+        """
+
+        self._cursor.execute(
+            "REPLACE INTO benchmark_samples (run, sample_count, samples) VALUES (?, ?, ?)",
+            (run_id, len(samples), pack_samples(samples)),
+        )
+
+    def get_bench_samples(self, run_id: BenchRunId, /) -> Optional[memoryview]:
+        """
+        Loads the raw sample times for a benchmark run as a read-only view of u64 picosecond values,
+        returns None if no samples were stored for this run
+        """
+
+        if (
+            row := self._cursor.execute(
+                "SELECT samples FROM benchmark_samples WHERE run = ?", (run_id,)
+            ).fetchone()
+        ) is not None:
+            return unpack_samples(row[0])
 
         return None
 
+    def get_submission_samples(
+        self, submission_id: SubmissionId, /
+    ) -> dict[BenchRunId, memoryview]:
+        """
+        Loads the raw sample times of every benchmark run for a submission that has them stored,
+        each as a read-only view of u64 picosecond values
+        """
+
+        return {
+            BenchRunId(run_id): unpack_samples(blob)
+            for run_id, blob in self._cursor.execute(
+                "SELECT run, samples FROM benchmark_samples INNER JOIN benchmark_runs ON run = run_id "
+                + "WHERE submission = ?",
+                (submission_id,),
+            )
+        }
+
+    def save_run_result(
+        self,
+        submission_id: SubmissionId,
+        res: "RunResult",
+        /,
+        bencher_version: Optional[ContainerVersionId] = None,
+    ) -> Optional[bool]:
+        """
+        Saves a RunResult as a benchmark run of a submission, along with its samples,
+        returns whether the answer was valid, like save_bench_result
+        """
+
+        run_id, correct = self.save_bench_result(
+            submission_id,
+            res.from_session,
+            res.median,
+            str(res.answer),
+            attempts=res.attempts,
+            variance=res.noise_report.variance if res.noise_report is not None else None,
+            bounds=(res.low_bound, res.high_bound),
+            bencher_version=bencher_version,
+        )
+
+        if len(res.samples) > 0:
+            self.save_bench_samples(run_id, res.samples)
+
+        if res.counters is not None:
+            self.save_counters(run_id, res.counters)
+
+        if res.memory is not None:
+            self.save_memory_usage(run_id, res.memory)
+
+        if res.cold is not None:
+            self.save_cold_time(run_id, res.cold, res.cold_runs)
+
+        if res.parse_time is not None or res.solve_time is not None:
+            self.save_phase_times(run_id, res.parse_time, res.solve_time)
+
+        if res.lane is not None:
+            self.save_lane(run_id, res.lane)
+
+        return correct
+
+    def save_lane(self, run_id: BenchRunId, lane: str, /) -> None:
+        """Saves the measure lane settings, as JSON, that a benchmark run was timed with"""
+
+        self._cursor.execute("UPDATE benchmark_runs SET lane = ? WHERE run_id = ?", (lane, run_id))
+
+    def save_phase_times(
+        self,
+        run_id: BenchRunId,
+        parse_time: Optional[Picoseconds],
+        solve_time: Optional[Picoseconds],
+        /,
+    ) -> None:
+        """Saves the separate parse and solve times of a bench format 2 benchmark run"""
+
+        self._cursor.execute(
+            "UPDATE benchmark_runs SET parse_time = ?, solve_time = ? WHERE run_id = ?",
+            (
+                parse_time.as_picos() if parse_time is not None else None,
+                solve_time.as_picos() if solve_time is not None else None,
+                run_id,
+            ),
+        )
+
+    def save_cold_time(self, run_id: BenchRunId, cold: Picoseconds, runs: int, /) -> None:
+        """
+        Saves the cold start time of a benchmark run's input, runs is how many fresh processes it
+        is the median of, 0 if it is the time of the answer-producing call
+        """
+
+        self._cursor.execute(
+            "UPDATE benchmark_runs SET cold_time = ?, cold_runs = ? WHERE run_id = ?",
+            (cold.as_picos(), runs, run_id),
+        )
+
+    def save_memory_usage(self, run_id: BenchRunId, usage: MemoryUsage, /) -> None:
+        """Saves the heap usage the runner counted for a benchmark run's input"""
+
+        self._cursor.execute(
+            "UPDATE benchmark_runs SET peak_memory = ?, total_allocated = ?, allocation_count = ? "
+            + "WHERE run_id = ?",
+            (usage.peak_bytes, usage.total_bytes, usage.allocations, run_id),
+        )
+
+    def save_counters(self, run_id: BenchRunId, counters: HardwareCounters, /) -> None:
+        """Saves the hardware performance counters collected alongside a benchmark run"""
+
+        self._cursor.execute(
+            "REPLACE INTO benchmark_counters "
+            + f"(run, iterations, {', '.join(COUNTER_NAMES)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id,
+                counters.iterations,
+                counters.instructions,
+                counters.cycles,
+                counters.branch_misses,
+                counters.l1d_misses,
+                counters.llc_misses,
+            ),
+        )
+
+    def get_submission_counters(self, submission_id: SubmissionId, /) -> Optional[HardwareCounters]:
+        """Adds up the hardware counters of a submission's current benchmark runs, if any"""
+
+        return HardwareCounters.combine(
+            HardwareCounters(*row)
+            for row in self._cursor.execute(
+                f"SELECT iterations, {', '.join(COUNTER_NAMES)} FROM benchmark_counters "
+                + "INNER JOIN benchmark_runs ON run = run_id "
+                + "WHERE (submission = ? AND superseded = 0)",
+                (submission_id,),
+            )
+        )
+
+    def save_flamegraph(self, run_id: BenchRunId, svg: Optional[bytes], /) -> None:
+        """
+        Saves the flamegraph from the profiling run of a benchmark run's input, None records
+        that profiling it failed, so it isn't tried again
+        """
+
+        self._cursor.execute(
+            "REPLACE INTO benchmark_profiles (run, flamegraph) VALUES (?, ?)",
+            (run_id, gzip.compress(svg) if svg is not None else None),
+        )
+
+    def unprofiled_runs(
+        self, submission_id: SubmissionId, /
+    ) -> list[tuple[BenchRunId, SessionLabel]]:
+        """
+        The current benchmark runs of a submission that were not profiled yet, with the input
+        they measured, so /profile can fill them in. Runs whose profiling failed are left out
+        """
+
+        return [
+            (BenchRunId(run_id), SessionLabel(label))
+            for run_id, label in self._cursor.execute(
+                "SELECT run_id, session_label FROM benchmark_runs "
+                + "LEFT JOIN benchmark_profiles ON run = run_id "
+                + "WHERE (submission = ? AND superseded = 0 AND run IS NULL AND bencher_version = "
+                + "(SELECT bencher_version FROM submissions WHERE submission_id = ?)) ORDER BY run_id",
+                (submission_id, submission_id),
+            )
+        ]
+
+    def get_submission_flamegraphs(
+        self, submission_id: SubmissionId, /
+    ) -> dict[SessionLabel, bytes]:
+        """
+        Loads the flamegraph svgs of a submission's current benchmark runs, by the input they
+        profiled, inputs that were not profiled are left out
+        """
+
+        return {
+            SessionLabel(label): gzip.decompress(blob)
+            for label, blob in self._cursor.execute(
+                "SELECT session_label, flamegraph FROM benchmark_profiles "
+                + "INNER JOIN benchmark_runs ON run = run_id "
+                + "WHERE (submission = ? AND superseded = 0 AND flamegraph IS NOT NULL) ORDER BY run_id",
+                (submission_id,),
+            )
+        }
+
     def process_submission_average_time(self, submission_id: SubmissionId, /) -> bool:
         """
-        Processes a submissions average time based on all benched results,
-        updating the submissions table in the database, this will also update best_runs
+        Processes a submissions average time based on all benched results measured on the
+        submission's bencher_version, updating the submissions table in the database,
+        this will also update best_runs
 
         This should be called once all benchmarks for this submission have completed
         Returns a bool indicating whether this run was valid, and thus considered for the leaderboard
@@ -325,8 +650,13 @@ class Database:
         # the picoseconds are not perfect, in this way floats are well suited to what we are doing
         valid_i, user, year, day_part = _unwrap(
             self._cursor.execute(
-                "UPDATE submissions SET average_time = CAST(result AS INTEGER) "
-                + "FROM ( SELECT AVG(CAST(average_time AS REAL)) AS result, submission FROM benchmark_runs WHERE (submission = ?) ) "
+                "UPDATE submissions SET average_time = CAST(result AS INTEGER), "
+                + "low_bound = CAST(low AS INTEGER), high_bound = CAST(high AS INTEGER) "
+                + "FROM ( SELECT AVG(CAST(average_time AS REAL)) AS result, "
+                + "AVG(CAST(benchmark_runs.low_bound AS REAL)) AS low, "
+                + "AVG(CAST(benchmark_runs.high_bound AS REAL)) AS high, "
+                + "submission FROM benchmark_runs WHERE (submission = ? AND superseded = 0 AND bencher_version = "
+                + "(SELECT s.bencher_version FROM submissions s WHERE s.submission_id = submission)) ) "
                 + "WHERE submission_id = submission "
                 + "RETURNING valid, user, year, day_part",
                 (submission_id,),
@@ -337,28 +667,126 @@ class Database:
 
         valid = bool(valid_i)
 
-        if valid:
-            # mypy is unable to read the _unwrap tuple definition, and thinks our day_part is unknown
-            day, part = unpack_day_part(day_part)  # type: ignore[arg-type]
-            # mypy is unable to read the _unwrap tuple definition, and thinks our year/user is unknown
-            self.refresh_user_best_runs(year, day, part, user)  # type: ignore[arg-type]
+        self._cursor.execute(
+            "UPDATE submissions SET normalized_time = ? WHERE submission_id = ?",
+            (self._normalized_time(submission_id), submission_id),
+        )
+
+        self._cursor.execute(
+            "UPDATE submissions SET peak_memory = peak, cold_time = CAST(cold AS INTEGER) "
+            + "FROM ( SELECT MAX(benchmark_runs.peak_memory) AS peak, "
+            + "AVG(CAST(benchmark_runs.cold_time AS REAL)) AS cold, "
+            + "submission FROM benchmark_runs WHERE (submission = ? AND superseded = 0 AND bencher_version = "
+            + "(SELECT s.bencher_version FROM submissions s WHERE s.submission_id = submission)) ) "
+            + "WHERE submission_id = submission",
+            (submission_id,),
+        )
+
+        # refresh even if invalid, a re-benchmark can invalidate a submission already on the board
+        # mypy is unable to read the _unwrap tuple definition, and thinks our day_part is unknown
+        day, part = unpack_day_part(day_part)  # type: ignore[arg-type]
+        # mypy is unable to read the _unwrap tuple definition, and thinks our year/user is unknown
+        self.refresh_user_best_runs(year, day, part, user)  # type: ignore[arg-type]
 
         return valid
 
+    def supersede_runs(
+        self, submission_id: SubmissionId, container_v: ContainerVersionId, /
+    ) -> None:
+        """
+        Marks the existing benchmark runs of a submission on a container version as replaced,
+        call before saving the runs of a re-benchmark on that same version
+        """
+
+        self._cursor.execute(
+            "UPDATE benchmark_runs SET superseded = 1 WHERE (submission = ? AND bencher_version = ?)",
+            (submission_id, container_v),
+        )
+
+    def adopt_bencher_version(
+        self,
+        submission_id: SubmissionId,
+        container_v: ContainerVersionId,
+        /,
+        bench_format: Optional[int] = None,
+        *,
+        hardware_class: Optional[HardwareClass] = None,
+    ) -> bool:
+        """
+        Switches a submission over to the benchmark runs measured on another container version,
+        and the bench format and hardware class they were measured with if given, used once a
+        re-benchmark has measured every input. Returns whether the submission is valid.
+        """
+
+        self._cursor.execute(
+            "UPDATE submissions SET bencher_version = ?, "
+            + "benchmark_format = COALESCE(?, benchmark_format), "
+            + "hardware_class = COALESCE(?, hardware_class) WHERE submission_id = ?",
+            (container_v, bench_format, hardware_class, submission_id),
+        )
+
+        return self.process_submission_average_time(submission_id)
+
+    def _normalized_time(self, submission_id: SubmissionId, /) -> Optional[int]:
+        avg_time, bencher_version, hardware_class = _unwrap(
+            self._cursor.execute(
+                "SELECT average_time, bencher_version, hardware_class FROM submissions WHERE submission_id = ?",
+                (submission_id,),
+            ).fetchone(),
+            tuple[Optional[int], int, Optional[str]],
+            "submission_id did not exist in database",
+        )
+
+        if avg_time is None:
+            return None
+
+        # the speed of one host says nothing about another
+        calibrated_on = self._cursor.execute(
+            "SELECT hardware_class FROM calibration_runs WHERE container_version = ? ORDER BY id DESC LIMIT 1",
+            (bencher_version,),
+        ).fetchone()
+        if calibrated_on is not None and calibrated_on[0] != hardware_class:
+            return None
+
+        speed = self.calibration_speed(ContainerVersionId(bencher_version))
+        normalized = normalize(Picoseconds(avg_time), speed)
+
+        return normalized.as_picos() if normalized is not None else None
+
     def refresh_user_best_runs(
-        self, year: Year, day: AdventDay, part: AdventPart, user_id: int
+        self,
+        year: Year,
+        day: AdventDay,
+        part: AdventPart,
+        user_id: int,
+        mode: Optional[RankingMode] = None,
     ) -> None:
         """
         Flushes the best_runs table for a given user and year-day-part, used when inserting new entries or when marking submissions invalid
+
+        In RankingMode.UPPER_BOUND the user's best submission is the one with the lowest upper bound,
+        otherwise it is the one with the lowest average_time. Each build profile and hardware class has its own best submission
         """
+        mode = mode or RankingMode.from_settings()
+
+        # apply a literal here to avoid potential future runtime pollution
+        order: Literal["COALESCE(high_bound, average_time)", "average_time"] = (
+            "COALESCE(high_bound, average_time)"
+            if mode == RankingMode.UPPER_BOUND
+            else "average_time"
+        )
+
         self._cursor.execute(
             "DELETE FROM best_runs WHERE (year = ? AND day_part = ? AND user = ?)",
             (year, pack_day_part(day, part), user_id),
         )
         self._cursor.execute(
-            "INSERT INTO best_runs "
-            + "SELECT user, year, day_part, MIN(average_time) AS best_time, submission_id AS run_id FROM submissions "
-            + "WHERE (year = ? AND day_part = ? AND valid = 1 AND user = ?)",
+            "INSERT INTO best_runs (user, year, day_part, best_time, run_id, best_low, best_high, best_cold, build_profile, hardware_class) "
+            + "SELECT user, year, day_part, average_time, submission_id, low_bound, high_bound, cold_time, build_profile, hardware_class "
+            + "FROM ( SELECT *, ROW_NUMBER() OVER ( "
+            + f"PARTITION BY build_profile, hardware_class ORDER BY {order}, submission_id ) AS profile_rank FROM submissions "
+            + "WHERE (year = ? AND day_part = ? AND valid = 1 AND user = ? AND average_time IS NOT NULL) ) "
+            + "WHERE profile_rank = 1",
             (year, pack_day_part(day, part), user_id),
         )
 
@@ -373,9 +801,12 @@ class Database:
         benchmark_format: int,
         results: list["RunResult"],
         /,
-    ) -> None:
+        build_profile: BuildProfile = BuildProfile.RELEASE,
+        hardware_class: Optional[HardwareClass] = None,
+        entrypoints: Entrypoints = Entrypoints.RUN,
+    ) -> SubmissionId:
         """
-        Save the benchmark run results to the DB.
+        Save the benchmark run results to the DB, returns the id of the new submission.
 
         Legacy API, future code should call save_submission,
         asynchronously save_bench_result for each bench,
@@ -383,49 +814,180 @@ class Database:
         """
 
         id = self.save_submission(
-            author_id, year, day, part, code, container_version, benchmark_format
+            author_id,
+            year,
+            day,
+            part,
+            code,
+            container_version,
+            benchmark_format,
+            build_profile,
+            hardware_class,
+            entrypoints,
         )
 
         for res in results:
-            self.save_bench_result(id, res.from_session, res.median, str(res.answer))
+            self.save_run_result(id, res)
 
         self.process_submission_average_time(id)
 
+        return id
+
+    def pair_submissions(self, part1: SubmissionId, part2: SubmissionId, /) -> None:
+        """Link the two submissions made from one file covering both parts to each other."""
+
+        self._cursor.executemany(
+            "UPDATE submissions SET paired_submission = ? WHERE submission_id = ?",
+            ((part2, part1), (part1, part2)),
+        )
+
     def best_times(
-        self, year: Year, day: AdventDay, part: AdventPart, /
-    ) -> Iterator[tuple[int, Picoseconds]]:
-        """Gets the best times for a given day/part, returning a user_id+timestamp in sorted by lowest time first order"""
+        self,
+        year: Year,
+        day: AdventDay,
+        part: AdventPart,
+        /,
+        mode: Optional[RankingMode] = None,
+        build_profile: Optional[BuildProfile] = None,
+        hardware_class: Optional[HardwareClass] = None,
+    ) -> list[RankedTime]:
+        """
+        Gets the best times for a given day/part, ranked according to mode (defaults to the
+        configured leaderboard.ranking), in best first order. Only submissions built with
+        build_profile if given, otherwise each user's best of any profile. Times are only
+        compared within one hardware class, hardware_class or leaderboard_hardware_class's
+        """
+        mode = mode or RankingMode.from_settings()
+        order = "COALESCE(best_high, best_time)" if mode == RankingMode.UPPER_BOUND else "best_time"
+
+        if hardware_class is None:
+            hardware_class = self.leaderboard_hardware_class(year, day, part, build_profile)
 
         # this will probably stay the same, it is a cache anyways
-        query = "SELECT user, best_time FROM best_runs WHERE (year = ? AND day_part = ?) ORDER BY best_time"
+        query = (
+            "SELECT user, best_time, best_low, best_high, run_id, best_cold FROM ( "
+            + f"SELECT *, ROW_NUMBER() OVER ( PARTITION BY user ORDER BY {order}, run_id ) AS user_rank "
+            + "FROM best_runs WHERE (year = ? AND day_part = ? AND build_profile = COALESCE(?, build_profile) "
+            + "AND hardware_class IS ?) ) "
+            + "WHERE user_rank = 1"
+        )
 
-        return (
-            (int(user), Picoseconds(time))
-            for user, time in self._cursor.execute(query, (year, pack_day_part(day, part)))
+        return rank_times(
+            (
+                RankedTime(
+                    int(user),
+                    Picoseconds(time),
+                    Picoseconds(low) if low is not None else None,
+                    Picoseconds(high) if high is not None else None,
+                    run_id,
+                    cold=Picoseconds(cold) if cold is not None else None,
+                )
+                for user, time, low, high, run_id, cold in self._cursor.execute(
+                    query, (year, pack_day_part(day, part), build_profile, hardware_class)
+                )
+            ),
+            mode,
+        )
+
+    def leaderboard_hardware_class(
+        self,
+        year: Year,
+        day: AdventDay,
+        part: AdventPart,
+        /,
+        build_profile: Optional[BuildProfile] = None,
+    ) -> Optional[HardwareClass]:
+        """
+        The hardware class a day/part's leaderboard shows by default, the one most users have
+        a best time on, ties going to the most recent
+        """
+
+        row = self._cursor.execute(
+            "SELECT hardware_class FROM best_runs "
+            + "WHERE (year = ? AND day_part = ? AND build_profile = COALESCE(?, build_profile)) "
+            + "GROUP BY hardware_class ORDER BY COUNT(DISTINCT user) DESC, MAX(run_id) DESC LIMIT 1",
+            (year, pack_day_part(day, part), build_profile),
+        ).fetchone()
+
+        return HardwareClass(row[0]) if row is not None and row[0] is not None else None
+
+    def record_hardware(self, hardware_class: HardwareClass, description: str, /) -> None:
+        """Saves the description of a hardware class, the first time it measures something"""
+
+        self._cursor.execute(
+            "INSERT OR IGNORE INTO hardware_classes (hardware_class, description) VALUES (?, ?)",
+            (hardware_class, description),
         )
 
+    def classify_unknown_hardware(self, hardware_class: HardwareClass, description: str, /) -> int:
+        """
+        Give everything measured before hosts were told apart the bot host's hardware class,
+        they were all measured on it. Otherwise they'd rank on a board of their own, apart from
+        new submissions measured on the same host. Returns how many submissions were classified.
+        """
+
+        self.record_hardware(hardware_class, description)
+        classified = self._cursor.execute(
+            "UPDATE submissions SET hardware_class = ? WHERE hardware_class IS NULL",
+            (hardware_class,),
+        ).rowcount
+        for table in ("best_runs", "calibration_runs"):
+            self._cursor.execute(
+                f"UPDATE {table} SET hardware_class = ? WHERE hardware_class IS NULL",
+                (hardware_class,),
+            )
+        return classified
+
+    def hardware_classes(self) -> list[tuple[HardwareClass, str]]:
+        """Every hardware class that measured anything, with its description, oldest first"""
+
+        return [
+            (HardwareClass(hardware_class), str(description))
+            for hardware_class, description in self._cursor.execute(
+                "SELECT hardware_class, description FROM hardware_classes ORDER BY first_seen, hardware_class"
+            )
+        ]
+
+    def best_memory(self, year: Year, day: AdventDay, part: AdventPart, /) -> list[tuple[int, int]]:
+        """
+        Gets the memory leaderboard for a given day/part, as (user_id, peak_memory) of each user's
+        valid submission with the lowest peak heap usage, lowest first, top 10 only
+        """
+
+        return [
+            (int(user), peak)
+            for user, peak in self._cursor.execute(
+                "SELECT user, MIN(peak_memory) AS peak FROM submissions "
+                + "WHERE (year = ? AND day_part = ? AND valid = 1 AND peak_memory IS NOT NULL) "
+                + "GROUP BY user ORDER BY peak, MIN(submission_id) LIMIT 10",
+                (year, pack_day_part(day, part)),
+            )
+        ]
+
     def get_lb_submissions(
         self, year: Year, day: AdventDay, part: AdventPart, /
     ) -> list[Submission]:
-        """Gets the fully-hydrated Submissions on the leaderboard for a given day/part."""
-        query = "SELECT run_id FROM best_runs WHERE (year = ? AND day_part = ?) ORDER BY best_time LIMIT 10"
+        """Gets the fully-hydrated Submissions on the leaderboard for a given day/part, in leaderboard order."""
+        ids = [SubmissionId(t.submission) for t in self.best_times(year, day, part)[:10]]
 
-        submission_rows = self._cursor.execute(query, (year, pack_day_part(day, part)))
+        by_id = {s.id: s for s in self.get_submissions_by_ids(ids)}
 
-        return self.get_submissions_by_ids(tuple(id for (id,) in submission_rows))
+        return [by_id[id] for id in ids if id in by_id]
 
     def insert_input(
         self, session_label: SessionLabel, year: Year, day: AdventDay, input_data: str
     ) -> None:
         """
         Inserts an input into the database, input data is required to be passed as a utf8str
-        because all AOC inputs are valid UTF8 (and valid ascii for that matter)
+        because all AOC inputs are valid UTF8 (and valid ascii for that matter).
+        An input that is already stored is kept, the bot and fetch.py may both fetch a day
         """
 
         comp_input = gzip.compress(input_data.encode("utf8"))
 
         self._cursor.execute(
-            "INSERT INTO inputs (year, day, session_label, input) VALUES (?, ?, ?, ?)",
+            "INSERT INTO inputs (year, day, session_label, input) VALUES (?, ?, ?, ?) "
+            + "ON CONFLICT (year, day, session_label) DO NOTHING",
             (year, day, session_label, comp_input),
         )
 
@@ -444,6 +1006,30 @@ class Database:
             )
         }
 
+    def input_labels(self, year: Year, day: AdventDay, /) -> set[SessionLabel]:
+        """The labels of the inputs already stored for the given day"""
+
+        return {
+            SessionLabel(label)
+            for (label,) in self._cursor.execute(
+                "SELECT session_label FROM inputs WHERE (year = ? AND day = ?)", (year, day)
+            )
+        }
+
+    def input_fingerprints(self, year: Year, day: AdventDay, /) -> dict[SessionLabel, str]:
+        """
+        A hash of each input stored for the given day, without decompressing them,
+        to tell whether cached copies of the inputs are still current
+        """
+
+        return {
+            SessionLabel(label): hashlib.sha256(data).hexdigest()
+            for label, data in self._cursor.execute(
+                "SELECT session_label, input FROM inputs WHERE (year = ? AND day = ?)",
+                (year, day),
+            )
+        }
+
     def get_user_submissions(
         self, year: Year, day: AdventDay, part: AdventPart, user_id: int, /
     ) -> list[Submission]:
@@ -457,7 +1043,7 @@ class Database:
     def get_submission_by_id(self, id: SubmissionId, /) -> Optional[Submission]:
         if (
             res := self._cursor.execute(
-                "SELECT year, day_part, user, average_time, code, valid, submitted_at, bencher_version, benchmark_format FROM submissions WHERE (submission_id = ?)",
+                "SELECT year, day_part, user, average_time, code, valid, submitted_at, bencher_version, benchmark_format, build_profile, entrypoints FROM submissions WHERE (submission_id = ?)",
                 (id,),
             ).fetchone()
         ) is not None:
@@ -471,14 +1057,21 @@ class Database:
                 submitted_at,
                 bencher_version,
                 benchmark_format,
+                build_profile,
+                entrypoints,
             ) = res
 
             benches = list[BenchmarkRun](
                 BenchmarkRun(
-                    id, Picoseconds(average_time), label, answer, dt_from_unix(completed_at)
+                    BenchRunId(run_id),
+                    id,
+                    Picoseconds(average_time),
+                    label,
+                    answer,
+                    dt_from_unix(completed_at),
                 )
-                for label, average_time, answer, completed_at in self._cursor.execute(
-                    "SELECT session_label, average_time, answer, completed_at FROM benchmark_runs WHERE (submission = ?)",
+                for run_id, label, average_time, answer, completed_at in self._cursor.execute(
+                    "SELECT run_id, session_label, average_time, answer, completed_at FROM benchmark_runs WHERE (submission = ?)",
                     (id,),
                 )
             )
@@ -498,6 +1091,8 @@ class Database:
                 ContainerVersionId(bencher_version),
                 int(benchmark_format),
                 benches,
+                BuildProfile(build_profile),
+                Entrypoints(entrypoints),
             )
 
         return None
@@ -519,7 +1114,7 @@ class Database:
         # sqlite doesn't let us pass a list of IDs directly. Other DBs do, not sqlite.
         # TODO: Paginate if hundreds of IDs. For sizes we care about, this is fine.
         query = f"""
-            SELECT submission_id, year, day_part, user, average_time, code, valid, submitted_at, bencher_version, benchmark_format 
+            SELECT submission_id, year, day_part, user, average_time, code, valid, submitted_at, bencher_version, benchmark_format, build_profile, entrypoints
             FROM submissions 
             WHERE submission_id in ({", ".join(["?"] * len(ids))})
             """
@@ -539,15 +1134,22 @@ class Database:
             submitted_at,
             bencher_version,
             benchmark_format,
+            build_profile,
+            entrypoints,
         ) in results:
             (day, part) = unpack_day_part(day_part)
 
             benches = list[BenchmarkRun](
                 BenchmarkRun(
-                    subm_id, Picoseconds(average_time), label, answer, dt_from_unix(completed_at)
+                    BenchRunId(run_id),
+                    subm_id,
+                    Picoseconds(average_time),
+                    label,
+                    answer,
+                    dt_from_unix(completed_at),
                 )
-                for label, average_time, answer, completed_at in self._cursor.execute(
-                    "SELECT session_label, average_time, answer, completed_at FROM benchmark_runs WHERE (submission = ?)",
+                for run_id, label, average_time, answer, completed_at in self._cursor.execute(
+                    "SELECT run_id, session_label, average_time, answer, completed_at FROM benchmark_runs WHERE (submission = ?)",
                     (subm_id,),
                 )
             )
@@ -566,6 +1168,8 @@ class Database:
                     ContainerVersionId(bencher_version),
                     int(benchmark_format),
                     benches,
+                    BuildProfile(build_profile),
+                    Entrypoints(entrypoints),
                 )
             )
 
@@ -588,14 +1192,16 @@ class Database:
             self.refresh_user_best_runs(year, day, part, user)
 
     def newest_container_version(
-        self, _bench_format: int
+        self, bench_format: int, min_format: int = 1
     ) -> tuple[ContainerVersionId, ContainerTag]:
         """
-        Find the latest container version that works with our code
+        Find the latest container version that works with our code,
+        which is any version with a bench format up to the one we support,
+        and at least min_format, and whose image is on the host already
         """
-        query = "SELECT id, container_version FROM container_versions ORDER BY creation_time DESC LIMIT 1"
+        query = "SELECT id, container_version FROM container_versions WHERE benchmark_format <= ? AND benchmark_format >= ? AND pulled ORDER BY creation_time DESC LIMIT 1"
 
-        for row in self._cursor.execute(query):
+        for row in self._cursor.execute(query, (bench_format, min_format)):
             # There's only one row anyway.
             return ContainerVersionId(row[0]), ContainerTag(row[1])
 
@@ -617,6 +1223,9 @@ class Database:
         bench_dir: bytes,
         timestamp: Optional[int] = None,
         /,
+        *,
+        bench_format: int = 1,
+        pulled: bool = True,
     ) -> ContainerVersionId:
         if timestamp is None:
             if "." in container_version:
@@ -625,12 +1234,330 @@ class Database:
                 timestamp = int(container_version)
 
         id = self._cursor.execute(
-            "INSERT INTO container_versions (rustc_version, container_version, bench_directory, creation_time) VALUES (?, ?, ?, ?)",
-            (rustc_ver, container_version, bench_dir, timestamp),
+            "INSERT INTO container_versions (rustc_version, container_version, bench_directory, creation_time, benchmark_format, pulled) VALUES (?, ?, ?, ?, ?, ?)",
+            (rustc_ver, container_version, bench_dir, timestamp, bench_format, pulled),
         ).lastrowid
 
         assert id is not None
         return ContainerVersionId(id)
 
+    def container_versions_to_pull(self, bench_format: int, keep: int, /) -> list[ContainerTag]:
+        """
+        The versions among the `keep` newest ones that work with our code whose image is not
+        on the host yet, newest first.
+        """
+        query = """SELECT container_version, pulled FROM container_versions
+            WHERE benchmark_format <= ? ORDER BY creation_time DESC LIMIT ?"""
+        return [
+            ContainerTag(tag)
+            for tag, pulled in self._cursor.execute(query, (bench_format, keep))
+            if not pulled
+        ]
+
+    def pulled_container_versions(self) -> list[tuple[ContainerTag, int, Optional[float]]]:
+        """Tag, bench format and pull duration of every version on the host, newest first."""
+        query = """SELECT container_version, benchmark_format, pull_seconds FROM container_versions
+            WHERE pulled ORDER BY creation_time DESC"""
+        return [
+            (ContainerTag(tag), bench_format, pull_seconds)
+            for tag, bench_format, pull_seconds in self._cursor.execute(query)
+        ]
+
+    def mark_container_pulled(
+        self, container_version: ContainerTag, pull_seconds: Optional[float], /
+    ) -> None:
+        """Record that a version's image is on the host, pull_seconds is None to keep the last."""
+        self._cursor.execute(
+            """UPDATE container_versions SET pulled = 1, pull_seconds = coalesce(?, pull_seconds)
+            WHERE container_version = ?""",
+            (pull_seconds, container_version),
+        )
+
+    def mark_container_removed(self, container_version: ContainerTag, /) -> None:
+        self._cursor.execute(
+            "UPDATE container_versions SET pulled = 0 WHERE container_version = ?",
+            (container_version,),
+        )
+
+    def save_calibration_run(
+        self,
+        container_v: ContainerVersionId,
+        workload: str,
+        median: Picoseconds,
+        low_bound: Picoseconds,
+        high_bound: Picoseconds,
+        /,
+        *,
+        hardware_class: Optional[HardwareClass] = None,
+    ) -> None:
+        """Saves the result of benchmarking one calibration workload on a container version"""
+
+        self._cursor.execute(
+            "INSERT INTO calibration_runs (container_version, workload, median, low_bound, high_bound, hardware_class) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                container_v,
+                workload,
+                median.as_picos(),
+                low_bound.as_picos(),
+                high_bound.as_picos(),
+                hardware_class,
+            ),
+        )
+
+    def calibration_medians(
+        self, container_v: ContainerVersionId, /, *, first: bool = False
+    ) -> dict[str, Picoseconds]:
+        """
+        Gets the calibration median of each workload for a container version,
+        the latest measurement by default, or the earliest one if first is set
+        """
+
+        order: Literal["ASC", "DESC"] = "DESC" if first else "ASC"
+
+        # later rows overwrite earlier ones, so the dict ends up holding the row we want
+        return {
+            str(workload): Picoseconds(median)
+            for workload, median in self._cursor.execute(
+                f"SELECT workload, median FROM calibration_runs WHERE container_version = ? ORDER BY id {order}",
+                (container_v,),
+            )
+        }
+
+    def reference_calibration(self) -> dict[str, Picoseconds]:
+        """
+        Gets the calibration that normalized times are relative to,
+        the first calibration of the first container version that was ever calibrated
+        """
+
+        if (
+            row := self._cursor.execute(
+                "SELECT container_version FROM calibration_runs ORDER BY id LIMIT 1"
+            ).fetchone()
+        ) is None:
+            return {}
+
+        return self.calibration_medians(ContainerVersionId(row[0]), first=True)
+
+    def calibration_speed(self, container_v: ContainerVersionId, /) -> Optional[float]:
+        """
+        How much slower the latest calibration of a container version ran than the reference
+        calibration, None if the version has not been calibrated
+        """
+
+        return relative_speed(self.reference_calibration(), self.calibration_medians(container_v))
+
+    def last_calibration_time(
+        self, container_v: ContainerVersionId, /
+    ) -> Optional[datetime.datetime]:
+        (measured_at,) = _unwrap(
+            self._cursor.execute(
+                "SELECT MAX(measured_at) FROM calibration_runs WHERE container_version = ?",
+                (container_v,),
+            ).fetchone(),
+            tuple[Optional[int]],
+        )
+
+        return dt_from_unix(measured_at) if measured_at is not None else None
+
+    def best_run_submissions(
+        self, year: Year, /, *, exclude_version: Optional[ContainerVersionId] = None
+    ) -> list[SubmissionId]:
+        """
+        Gets every submission currently in best_runs for a year,
+        optionally skipping those already measured on exclude_version
+        """
+
+        return [
+            SubmissionId(subm_id)
+            for (subm_id,) in self._cursor.execute(
+                "SELECT run_id FROM best_runs INNER JOIN submissions ON run_id = submission_id "
+                + "WHERE (best_runs.year = ? AND bencher_version IS NOT ?) ORDER BY best_time",
+                (year, exclude_version),
+            )
+        ]
+
+    def create_rebench_campaign(
+        self,
+        container_v: ContainerVersionId,
+        description: str,
+        submissions: Sequence[SubmissionId],
+        /,
+        *,
+        automatic: bool = False,
+        priority: int = 100,
+        include_invalid: bool = False,
+    ) -> CampaignId:
+        """
+        Queues a re-benchmark of the given submissions on a container version,
+        submissions that already have a pending job for that version are not queued again.
+        Submissions that are invalid by the time their job runs are skipped, unless
+        include_invalid
+        """
+
+        campaign_id = self._cursor.execute(
+            "INSERT INTO rebench_campaigns (container_version, description, automatic, include_invalid) VALUES (?, ?, ?, ?)",
+            (container_v, description, int(automatic), int(include_invalid)),
+        ).lastrowid
+
+        assert campaign_id is not None
+
+        self._cursor.executemany(
+            "INSERT OR IGNORE INTO rebench_jobs (campaign, submission, container_version, priority) VALUES (?, ?, ?, ?)",
+            ((campaign_id, subm_id, container_v, priority) for subm_id in submissions),
+        )
+
+        return CampaignId(campaign_id)
+
+    def select_submissions(self, f: SubmissionFilter, /) -> list[SubmissionId]:
+        """Gets the ids of every submission matching a filter, oldest first"""
+
+        clauses: list[str] = []
+        params: list[object] = []
+
+        if f.year is not None:
+            clauses.append("year = ?")
+            params.append(f.year)
+        if f.day is not None and f.part is not None:
+            clauses.append("day_part = ?")
+            params.append(pack_day_part(f.day, f.part))
+        elif f.day is not None:
+            clauses.append("day_part IN (?, ?)")
+            params.extend((pack_day_part(f.day, 1), pack_day_part(f.day, 2)))
+        elif f.part is not None:
+            # the part is the low bit of day_part
+            clauses.append("(day_part & 1) = ?")
+            params.append(f.part - 1)
+        if f.user_id is not None:
+            clauses.append("user = ?")
+            params.append(str(f.user_id))
+        if f.bencher_version is not None:
+            clauses.append("bencher_version = ?")
+            params.append(f.bencher_version)
+        if f.submitted_after is not None:
+            clauses.append("submitted_at >= ?")
+            params.append(int(f.submitted_after.timestamp()))
+        if f.submitted_before is not None:
+            clauses.append("submitted_at < ?")
+            params.append(int(f.submitted_before.timestamp()))
+        if not f.include_invalid:
+            clauses.append("valid = 1")
+
+        where = f"WHERE ({' AND '.join(clauses)})" if clauses else ""
+
+        return [
+            SubmissionId(subm_id)
+            for (subm_id,) in self._cursor.execute(
+                f"SELECT submission_id FROM submissions {where} ORDER BY submission_id", params
+            )
+        ]
+
+    def get_container_version(self, container_version: ContainerTag, /) -> ContainerVersionId:
+        """Looks up the id of a container version by its tag"""
+
+        if (
+            row := self._cursor.execute(
+                "SELECT id FROM container_versions WHERE container_version = ?",
+                (container_version,),
+            ).fetchone()
+        ) is None:
+            raise ContainerVersionError(f"Unknown container version: {container_version}")
+
+        return ContainerVersionId(row[0])
+
+    def get_container_tag(self, container_v: ContainerVersionId, /) -> ContainerTag:
+        """Looks up the tag of a container version by its id"""
+
+        (tag,) = _unwrap(
+            self._cursor.execute(
+                "SELECT container_version FROM container_versions WHERE id = ?", (container_v,)
+            ).fetchone(),
+            tuple[str],
+            "container version id did not exist in database",
+        )
+
+        return ContainerTag(tag)
+
+    def has_automatic_campaign(self, container_v: ContainerVersionId, /) -> bool:
+        return (
+            self._cursor.execute(
+                "SELECT 1 FROM rebench_campaigns WHERE (container_version = ? AND automatic = 1)",
+                (container_v,),
+            ).fetchone()
+            is not None
+        )
+
+    def claim_rebench_jobs(self, limit: int, /) -> list[RebenchJob]:
+        """Marks up to limit of the next queued re-benchmark jobs as running and returns them"""
+
+        rows = self._cursor.execute(
+            "UPDATE rebench_jobs SET status = ? WHERE job_id IN "
+            + "(SELECT job_id FROM rebench_jobs WHERE status = ? ORDER BY priority, job_id LIMIT ?) "
+            + "RETURNING job_id, campaign, submission, container_version, priority",
+            (RebenchStatus.RUNNING, RebenchStatus.QUEUED, limit),
+        ).fetchall()
+
+        jobs = []
+        # RETURNING does not guarantee any order
+        for job_id, campaign, submission, container_v, _ in sorted(
+            rows, key=lambda r: (r[4], r[0])
+        ):
+            tag, include_invalid, bench_format = _unwrap(
+                self._cursor.execute(
+                    "SELECT container_versions.container_version, include_invalid, benchmark_format FROM container_versions, rebench_campaigns "
+                    + "WHERE id = ? AND campaign_id = ?",
+                    (container_v, campaign),
+                ).fetchone(),
+                tuple[str, int, int],
+                "rebench job references a container version or campaign that does not exist",
+            )
+
+            jobs.append(
+                RebenchJob(
+                    RebenchJobId(job_id),
+                    CampaignId(campaign),
+                    SubmissionId(submission),
+                    ContainerVersionId(container_v),
+                    ContainerTag(tag),
+                    bool(include_invalid),
+                    int(bench_format),
+                )
+            )
+
+        return jobs
+
+    def finish_rebench_job(self, job_id: RebenchJobId, status: RebenchStatus, /) -> None:
+        """Records the outcome of a re-benchmark job, QUEUED puts the job back in the queue"""
+
+        self._cursor.execute(
+            "UPDATE rebench_jobs SET status = ?, finished_at = CASE WHEN ? THEN UNIXEPOCH() END WHERE job_id = ?",
+            (status, status != RebenchStatus.QUEUED, job_id),
+        )
+
+    def requeue_running_rebench_jobs(self) -> int:
+        """Puts jobs that were interrupted (e.g. by a restart) back in the queue, returns how many"""
+
+        return self._cursor.execute(
+            "UPDATE rebench_jobs SET status = ? WHERE status = ?",
+            (RebenchStatus.QUEUED, RebenchStatus.RUNNING),
+        ).rowcount
+
+    def campaign_progress(self, campaign: CampaignId, /) -> Optional[CampaignProgress]:
+        """Counts the jobs of a re-benchmark campaign by outcome, None if it does not exist"""
+
+        if (
+            row := self._cursor.execute(
+                "SELECT description, COUNT(job_id), "
+                + "COALESCE(SUM(status IN (?, ?)), 0), COALESCE(SUM(status = ?), 0) "
+                + "FROM rebench_campaigns LEFT JOIN rebench_jobs ON campaign = campaign_id "
+                + "WHERE campaign_id = ? GROUP BY campaign_id",
+                (RebenchStatus.DONE, RebenchStatus.SKIPPED, RebenchStatus.FAILED, campaign),
+            ).fetchone()
+        ) is None:
+            return None
+
+        description, total, done, failed = row
+
+        return CampaignProgress(campaign, description, total, done, failed)
+
     def in_guild(self, guild_id: int, /) -> GuildDatabase:
         return GuildDatabase(self, guild_id)
@@ -0,0 +1,72 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class Diagnostic:
+    """One compiler message from `cargo check --message-format=json`."""
+
+    level: str
+    # E0308 and the like, None for messages without an error code
+    code: Optional[str]
+    # as rustc would print it, with the source snippet
+    rendered: str
+
+
+def parse_check_output(out: str, /) -> tuple[Optional[bool], list[Diagnostic]]:
+    """
+    Parse cargo's JSON message stream: whether the check passed, None if cargo never got to say
+    (killed by the timeout), and the compiler's errors. Lines that aren't JSON are skipped.
+    """
+    success: Optional[bool] = None
+    errors: list[Diagnostic] = []
+
+    for line in out.splitlines():
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(msg, dict):
+            continue
+
+        if msg.get("reason") == "build-finished":
+            success = bool(msg.get("success"))
+        elif msg.get("reason") == "compiler-message":
+            message = msg.get("message", {})
+            if message.get("level") not in ("error", "error: internal compiler error"):
+                continue
+            # the summary after the real errors
+            if message.get("message", "").startswith("aborting due to"):
+                continue
+            errors.append(
+                Diagnostic(
+                    message["level"],
+                    (message.get("code") or {}).get("code"),
+                    message.get("rendered") or message.get("message", ""),
+                )
+            )
+
+    return (success, errors)
+
+
+def format_diagnostics(errors: list[Diagnostic], max_len: int, /) -> str:
+    """
+    As many whole errors as fit in max_len characters, followed by how many were left out.
+    max_len has to leave room for that count, about 20 characters.
+    """
+    shown = ""
+    for i, error in enumerate(errors):
+        rendered = error.rendered.rstrip() + "\n"
+        after = len(errors) - i - 1
+        footer = f"... and {after} more\n" if after else ""
+        if len(shown) + len(rendered) + len(footer) > max_len:
+            if not shown:
+                # the first error alone is too long, show its start
+                return rendered[: max_len - len(footer) - 4] + "...\n" + footer
+            return shown + f"... and {after + 1} more\n"
+        shown += rendered
+    return shown
@@ -0,0 +1,268 @@
+import asyncio
+import collections
+import dataclasses
+import hmac
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+from .hardware import Hardware
+from .jobs import BenchJob
+
+logger = logging.getLogger(__name__)
+
+# longest a claim waits for a job, whatever the worker asks for
+MAX_CLAIM_WAIT_SECONDS = 60
+# outcomes carry the samples of every run, which can outgrow aiohttp's default of 1 MiB
+MAX_BODY_BYTES = 256 * 2**20
+
+
+class WorkerError(Exception):
+    """A worker could not run a job, with its reason."""
+
+    __slots__ = ()
+
+
+@dataclass(slots=True)
+class _Lease:
+    worker: str
+    hardware: Hardware
+    expires: float
+
+
+class Dispatcher:
+    """
+    The bot's side of the job API: jobs wait here until a worker claims one, and go back to
+    waiting when their worker hasn't been heard from within lease_seconds, e.g. because it died.
+    """
+
+    __slots__ = ("lease_seconds", "_ids", "_pending", "_jobs", "_leases", "_added", "_seen")
+
+    def __init__(self, lease_seconds: float, /) -> None:
+        self.lease_seconds = lease_seconds
+        self._ids = itertools.count(1)
+        # ids of unclaimed jobs, oldest first. Cancelled jobs stay in here until claim skips them
+        self._pending = collections.deque[int]()
+        self._jobs: dict[int, tuple[BenchJob, asyncio.Future[tuple[Hardware, dict[str, Any]]]]] = {}
+        self._leases: dict[int, _Lease] = {}
+        self._added = asyncio.Event()
+        # every worker that ever claimed, with its hardware and the time of its last claim
+        self._seen: dict[str, tuple[Hardware, float]] = {}
+
+    async def run(self, job: BenchJob, /) -> tuple[Hardware, dict[str, Any]]:
+        """
+        Queue a job for the workers and wait for its outcome: the hardware of the worker that
+        ran it, and the outcome as the worker sent it. Raises WorkerError if the worker failed.
+        Cancelling the wait drops the job, a worker reporting it later is told it's gone.
+        """
+        job_id = next(self._ids)
+        future: asyncio.Future[tuple[Hardware, dict[str, Any]]]
+        future = asyncio.get_running_loop().create_future()
+        self._jobs[job_id] = (job, future)
+        self._pending.append(job_id)
+        self._added.set()
+        try:
+            return await future
+        finally:
+            del self._jobs[job_id]
+            self._leases.pop(job_id, None)
+
+    async def claim(
+        self, worker: str, hardware: Hardware, wait: float, /
+    ) -> Optional[tuple[int, BenchJob]]:
+        """The oldest waiting job, leased to worker. Waits up to wait seconds for one."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        self._seen[worker] = (hardware, time.time())
+
+        while True:
+            self._requeue_expired(loop.time())
+            while self._pending:
+                job_id = self._pending.popleft()
+                if job_id in self._jobs:
+                    self._leases[job_id] = _Lease(
+                        worker, hardware, loop.time() + self.lease_seconds
+                    )
+                    logger.info("Job %s claimed by worker %s", job_id, worker)
+                    return (job_id, self._jobs[job_id][0])
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            self._added.clear()
+            try:
+                await asyncio.wait_for(self._added.wait(), remaining)
+            except TimeoutError:
+                pass
+
+    def report(self, job_id: int, worker: str, outcome: dict[str, Any], /) -> bool:
+        """
+        Hand a worker's outcome to the job's waiter. Returns False if the job isn't leased to
+        the worker anymore: it was cancelled, or its lease expired and another worker has it.
+        """
+        lease = self._leases.get(job_id)
+        if lease is None or lease.worker != worker:
+            return False
+
+        del self._leases[job_id]
+        _, future = self._jobs[job_id]
+        if "error" in outcome:
+            future.set_exception(WorkerError(f"Worker {worker}: {outcome['error']}"))
+        else:
+            future.set_result((lease.hardware, outcome))
+        return True
+
+    def heartbeat(self, job_id: int, worker: str, /) -> bool:
+        """
+        Renew the lease of a job its worker is still running. Returns False if the job isn't
+        leased to the worker anymore, it should stop running it then, see report.
+        """
+        lease = self._leases.get(job_id)
+        if lease is None or lease.worker != worker:
+            return False
+
+        lease.expires = asyncio.get_running_loop().time() + self.lease_seconds
+        return True
+
+    def _requeue_expired(self, now: float, /) -> None:
+        for job_id, lease in list(self._leases.items()):
+            if lease.expires < now:
+                logger.warning("Worker %s did not finish job %s in time", lease.worker, job_id)
+                del self._leases[job_id]
+                self._pending.appendleft(job_id)
+
+    def describe(self) -> str:
+        """Waiting and running jobs, and the workers that claimed any, for the /workers command."""
+        waiting = sum(1 for job_id in self._pending if job_id in self._jobs)
+        lines = [f"{waiting} jobs waiting, {len(self._leases)} running."]
+        now = time.time()
+        for worker, (hardware, last_claim) in sorted(self._seen.items()):
+            running = sum(1 for lease in self._leases.values() if lease.worker == worker)
+            lines.append(
+                f"`{worker}` ({hardware.describe()}, class `{hardware.hardware_class()}`): "
+                + f"{running} running, last claim {now - last_claim:.0f}s ago"
+            )
+        return "\n".join(lines)
+
+
+def make_app(dispatcher: Dispatcher, token: str, /) -> web.Application:
+    expected = f"Bearer {token}"
+
+    @web.middleware
+    async def check_token(
+        request: web.Request, handler: Callable[[web.Request], Awaitable[web.StreamResponse]]
+    ) -> web.StreamResponse:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            raise web.HTTPUnauthorized()
+        return await handler(request)
+
+    async def claim(request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+            worker = str(body["worker"])
+            hardware = Hardware(**body["hardware"])
+            wait = min(float(body.get("wait", 0)), MAX_CLAIM_WAIT_SECONDS)
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest()
+
+        claimed = await dispatcher.claim(worker, hardware, wait)
+        if claimed is None:
+            return web.Response(status=204)
+        job_id, job = claimed
+        return web.json_response({"job_id": job_id, "job": job.to_wire()})
+
+    async def outcome(request: web.Request) -> web.Response:
+        try:
+            job_id = int(request.match_info["job_id"])
+            body = await request.json()
+            worker, job_outcome = str(body["worker"]), dict(body["outcome"])
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest()
+
+        if not dispatcher.report(job_id, worker, job_outcome):
+            raise web.HTTPGone()
+        return web.Response(status=204)
+
+    async def heartbeat(request: web.Request) -> web.Response:
+        try:
+            job_id = int(request.match_info["job_id"])
+            body = await request.json()
+            worker = str(body["worker"])
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest()
+
+        if not dispatcher.heartbeat(job_id, worker):
+            raise web.HTTPGone()
+        return web.Response(status=204)
+
+    app = web.Application(middlewares=[check_token], client_max_size=MAX_BODY_BYTES)
+    app.router.add_post("/jobs/claim", claim)
+    app.router.add_post("/jobs/{job_id}/outcome", outcome)
+    app.router.add_post("/jobs/{job_id}/heartbeat", heartbeat)
+    return app
+
+
+async def serve(dispatcher: Dispatcher, listen: str, token: str, /) -> web.AppRunner:
+    """Serve the job API on listen, `host:port` or the path of a unix socket."""
+    runner = web.AppRunner(make_app(dispatcher, token))
+    await runner.setup()
+    site: web.BaseSite
+    if listen.startswith("/"):
+        site = web.UnixSite(runner, listen)
+    else:
+        host, _, port = listen.rpartition(":")
+        site = web.TCPSite(runner, host or None, int(port))
+    await site.start()
+    logger.info("Serving the job API on %s", listen)
+    return runner
+
+
+def job_api_session(server: str, token: str, /) -> aiohttp.ClientSession:
+    """A session for a worker, server is the bot's URL or the path of its unix socket."""
+    headers = {"Authorization": f"Bearer {token}"}
+    if server.startswith("/"):
+        return aiohttp.ClientSession(
+            "http://localhost", connector=aiohttp.UnixConnector(path=server), headers=headers
+        )
+    return aiohttp.ClientSession(server, headers=headers)
+
+
+async def claim_job(
+    session: aiohttp.ClientSession, worker: str, hardware: Hardware, wait: float, /
+) -> Optional[tuple[int, BenchJob]]:
+    async with session.post(
+        "/jobs/claim",
+        json={"worker": worker, "hardware": dataclasses.asdict(hardware), "wait": wait},
+        raise_for_status=True,
+    ) as response:
+        if response.status == 204:
+            return None
+        body = await response.json()
+        return (int(body["job_id"]), BenchJob.from_wire(body["job"]))
+
+
+async def report_outcome(
+    session: aiohttp.ClientSession, worker: str, job_id: int, outcome: dict[str, Any], /
+) -> bool:
+    """Returns False if the bot doesn't want the outcome anymore, see Dispatcher.report."""
+    async with session.post(
+        f"/jobs/{job_id}/outcome", json={"worker": worker, "outcome": outcome}
+    ) as response:
+        if response.status == 410:
+            return False
+        response.raise_for_status()
+        return True
+
+
+async def send_heartbeat(session: aiohttp.ClientSession, worker: str, job_id: int, /) -> bool:
+    """Returns False if the bot doesn't want the job anymore, see Dispatcher.heartbeat."""
+    async with session.post(f"/jobs/{job_id}/heartbeat", json={"worker": worker}) as response:
+        if response.status == 410:
+            return False
+        response.raise_for_status()
+        return True
@@ -0,0 +1,77 @@
+import enum
+import re
+from typing import Optional
+
+
+class Entrypoints(enum.StrEnum):
+    """
+    Which functions of a submission the benchmark calls, chosen when submitting and saved with
+    it, so re-benchmarks call the same ones. Never guessed from the code: helpers named like
+    these are common in code that doesn't mean them for the harness.
+    """
+
+    # `run`, for whichever part was submitted
+    RUN = "run"
+    # `run`, and `parse` and `solve` benchmarked on their own as well (bench format 2)
+    PHASES = "phases"
+    # `part1` and `part2`, one build for both parts (bench format 3), from submit_both
+    BOTH_PARTS = "both_parts"
+
+
+# replaces runner/src/phases.rs for submissions with Entrypoints.PHASES
+PHASES_MACRO = """\
+#[macro_export]
+macro_rules! bench_phases {
+    ($group:expr, $input:expr) => {
+        $group.bench_function("parse", |b| {
+            b.iter(|| $crate::code::parse(criterion::black_box($input)))
+        });
+        // parse runs outside of the timed part, and its output is moved into solve
+        $group.bench_function("solve", |b| {
+            b.iter_batched(
+                || $crate::code::parse($input),
+                |parsed| $crate::code::solve(parsed),
+                criterion::BatchSize::SmallInput,
+            )
+        });
+    };
+}
+"""
+
+_PARSE_FN = re.compile(rb"\bpub\s+fn\s+parse\b")
+_SOLVE_FN = re.compile(rb"\bpub\s+fn\s+solve\b")
+
+
+def has_phases(solution_code: bytes, /) -> bool:
+    """
+    Whether a submission looks like it exports the parse and solve functions, checked before
+    queueing one with Entrypoints.PHASES. The compiler has the final say.
+    """
+    return bool(_PARSE_FN.search(solution_code) and _SOLVE_FN.search(solution_code))
+
+
+# the names a submission covering both parts can export them under, in order of preference
+PART_FUNCTIONS = (("part1", "part2"), ("run_p1", "run_p2"))
+
+
+def both_parts(solution_code: bytes, /) -> Optional[tuple[str, str]]:
+    """
+    The names of the part 1 and part 2 functions if the submission exports both, None for
+    submissions that only export `run` for a single part. Checked before queueing one with
+    Entrypoints.BOTH_PARTS.
+    """
+    for p1, p2 in PART_FUNCTIONS:
+        if re.search(rb"\bpub\s+fn\s+" + p1.encode() + rb"\b", solution_code) and re.search(
+            rb"\bpub\s+fn\s+" + p2.encode() + rb"\b", solution_code
+        ):
+            return (p1, p2)
+    return None
+
+
+def parts_shim(functions: tuple[str, str], /) -> str:
+    """
+    Replacement for runner/src/parts.rs, for submissions covering both parts. The benchmark
+    picks the function for the part in FERRIS_ELF_PART, so one build serves both parts.
+    """
+    p1, p2 = functions
+    return f"pub use crate::code::{{{p1} as run, {p1} as part1, {p2} as part2}};\n"
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+AOC_URL = "https://adventofcode.com"
+# adventofcode.com asks automated tools to identify themselves
+USER_AGENT = "ferris-elf input fetcher (github.com/proegssilb/ferris-elf)"
+
+
+class FetchError(Exception):
+    __slots__ = ()
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """How often, and how far apart, a failed input download is retried."""
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # responses worth trying again, anything else but 200 fails right away
+    retry_statuses: frozenset[int] = field(
+        default_factory=lambda: frozenset({429, 500, 502, 503, 504})
+    )
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Exponential backoff with full jitter, so retrying clients don't retry in lockstep."""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class RateLimiter:
+    """Spaces out the start of requests to one host by at least min_interval seconds."""
+
+    __slots__ = ("_min_interval", "_lock", "_next")
+
+    def __init__(self, min_interval: float) -> None:
+        self._min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self._min_interval
+
+
+async def fetch_input(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    year: int,
+    day: int,
+    token: str,
+    /,
+    *,
+    base_url: str = AOC_URL,
+    rng: Optional[random.Random] = None,
+) -> str:
+    """Download the input of the account behind a session token, retrying per policy."""
+    rng = rng or random.Random()
+    url = f"{base_url}/{year}/day/{day}/input"
+    error = ""
+
+    for attempt in range(1, policy.max_attempts + 1):
+        await limiter.wait()
+        try:
+            async with session.get(url, headers={"Cookie": f"session={token}"}) as resp:
+                if resp.status == 200:
+                    # require utf8 response
+                    return (await resp.read()).decode("utf8")
+                if resp.status not in policy.retry_statuses:
+                    raise FetchError(f"HTTP {resp.status} from {url}")
+                error = f"HTTP {resp.status}"
+        except (aiohttp.ClientError, TimeoutError) as e:
+            error = repr(e)
+
+        if attempt < policy.max_attempts:
+            delay = policy.delay(attempt, rng)
+            logger.info("Fetching %s failed (%s), retrying in %.1fs", url, error, delay)
+            await asyncio.sleep(delay)
+
+    raise FetchError(f"Gave up on {url} after {policy.max_attempts} attempts: {error}")
+
+
+async def fetch_day(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    year: int,
+    day: int,
+    tokens: Mapping[str, str],
+    /,
+    *,
+    base_url: str = AOC_URL,
+) -> tuple[dict[str, str], dict[str, BaseException]]:
+    """
+    Download the inputs of every labelled token for a day at once. One failing token doesn't
+    stop the others, returns the inputs by label and the errors by label.
+    """
+    labels = list(tokens)
+    results = await asyncio.gather(
+        *(
+            fetch_input(session, limiter, policy, year, day, tokens[label], base_url=base_url)
+            for label in labels
+        ),
+        return_exceptions=True,
+    )
+
+    fetched: dict[str, str] = {}
+    failed: dict[str, BaseException] = {}
+    for label, res in zip(labels, results):
+        if isinstance(res, BaseException):
+            failed[label] = res
+        else:
+            fetched[label] = res
+    return (fetched, failed)
+
+
+def new_session(timeout: float) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=timeout), headers={"User-Agent": USER_AGENT}
+    )
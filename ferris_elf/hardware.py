@@ -0,0 +1,62 @@
+import functools
+import hashlib
+import os
+import platform
+import re
+from dataclasses import dataclass
+from typing import NewType, Optional
+
+# short hash of a Hardware, results are only compared within one
+HardwareClass = NewType("HardwareClass", str)
+
+# x86's "model name", arm's "Model" or "Processor", whichever comes first
+CPU_MODEL = re.compile(r"^(?:model name|Model|Processor)\s*:\s*(.+?)\s*$", re.MULTILINE)
+MEM_TOTAL = re.compile(r"^MemTotal:\s*(\d+)\s*kB", re.MULTILINE)
+
+
+@dataclass(slots=True, frozen=True)
+class Hardware:
+    """What a host measuring submissions runs on, as far as it changes their times."""
+
+    cpu_model: str
+    cpus: int
+    # rounded, so kernel reservations that differ between boots don't make a new class
+    memory_gib: int
+    arch: str
+
+    def hardware_class(self) -> HardwareClass:
+        key = "|".join((self.cpu_model, str(self.cpus), str(self.memory_gib), self.arch))
+        return HardwareClass(hashlib.sha256(key.encode()).hexdigest()[:12])
+
+    def describe(self) -> str:
+        return f"{self.cpu_model}, {self.cpus} cpus, {self.memory_gib} GiB ({self.arch})"
+
+
+def parse_cpu_model(cpuinfo: str, /) -> Optional[str]:
+    if (m := CPU_MODEL.search(cpuinfo)) is None:
+        return None
+    return " ".join(m.group(1).split())
+
+
+def parse_memory_gib(meminfo: str, /) -> Optional[int]:
+    if (m := MEM_TOTAL.search(meminfo)) is None:
+        return None
+    return round(int(m.group(1)) / 2**20)
+
+
+def _read(path: str, /) -> str:
+    try:
+        with open(path) as fp:
+            return fp.read()
+    except OSError:
+        return ""
+
+
+@functools.cache
+def local_hardware() -> Hardware:
+    return Hardware(
+        parse_cpu_model(_read("/proc/cpuinfo")) or platform.processor() or "unknown",
+        os.cpu_count() or 1,
+        parse_memory_gib(_read("/proc/meminfo")) or 0,
+        platform.machine(),
+    )
@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Callable, TypeVar
+
+import docker.errors
+
+from . import constants, lib
+from .config import settings
+from .containers import docker_client
+from .database import ContainerTag, Database
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# how long to wait for a running benchmark to finish before checking again
+IDLE_POLL_SECONDS = 10
+
+
+async def in_executor(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+def image_ref(container_tag: ContainerTag, /) -> str:
+    return f"{settings.docker.container_ref}:{container_tag}"
+
+
+async def wait_for_idle_host() -> None:
+    """
+    Pulls saturate the network and disk, so they only start when no benchmark is running and
+    only one runs at a time. They don't take bench_lock, a submission coming in during a pull
+    isn't held back for minutes and runs alongside it. How many layers one pull downloads in
+    parallel is up to the docker daemon's max-concurrent-downloads.
+    """
+    while lib.bench_lock.locked():
+        await asyncio.sleep(IDLE_POLL_SECONDS)
+
+
+async def pull(container_tag: ContainerTag, /) -> None:
+    ref = image_ref(container_tag)
+    try:
+        await in_executor(docker_client().images.get, ref)
+    except docker.errors.ImageNotFound:
+        pass
+    else:
+        # pulled by a submission that picked it before the image manager existed
+        logger.info("Image %s is on the host already", ref)
+        with Database() as db:
+            db.mark_container_pulled(container_tag, None)
+        return
+
+    await wait_for_idle_host()
+    logger.info("Pulling image %s", ref)
+    start = time.monotonic()
+    await in_executor(docker_client().images.pull, settings.docker.container_ref, tag=container_tag)
+    seconds = time.monotonic() - start
+    logger.info("Pulled image %s in %.1fs", ref, seconds)
+
+    with Database() as db:
+        db.mark_container_pulled(container_tag, seconds)
+
+
+async def remove(container_tag: ContainerTag, /) -> None:
+    ref = image_ref(container_tag)
+    logger.info("Removing image %s", ref)
+    try:
+        # untags it, the layers go once no other tag uses them
+        await in_executor(docker_client().images.remove, ref)
+    except docker.errors.ImageNotFound:
+        pass
+    except docker.errors.APIError as e:
+        # e.g. a container still running off it, try again on the next check
+        logger.warning("Could not remove image %s: %s", ref, e)
+        return
+
+    with Database() as db:
+        db.mark_container_removed(container_tag)
+
+
+async def prune() -> int:
+    """
+    Remove the containers of runs the bot never got to clean up, and the image layers no tag
+    points at anymore. Returns the bytes freed.
+    """
+    prefix = f"{settings.docker.container_ref}:"
+    for container in await in_executor(
+        docker_client().containers.list, all=True, filters={"status": "exited"}
+    ):
+        if container.attrs.get("Config", {}).get("Image", "").startswith(prefix):
+            await in_executor(container.remove)
+
+    res = await in_executor(docker_client().images.prune, filters={"dangling": True})
+    freed: int = res.get("SpaceReclaimed") or 0
+    return freed
+
+
+async def disk_usage() -> tuple[int, int]:
+    """Bytes used by the images of our versions, and by every image layer on the host."""
+    df = await in_executor(docker_client().df)
+    prefix = f"{settings.docker.container_ref}:"
+    ours = sum(
+        image["Size"]
+        for image in df.get("Images") or []
+        if any(tag.startswith(prefix) for tag in image.get("RepoTags") or [])
+    )
+    return (ours, df.get("LayersSize") or 0)
+
+
+async def manage_images() -> None:
+    """
+    Pull the images of new container versions before newest_container_version can pick them,
+    so no submission waits on a pull, and remove all but the images.keep newest ones.
+    """
+    keep = int(settings.images.keep)
+
+    with Database() as db:
+        to_pull = db.container_versions_to_pull(constants.SUPPORTED_BENCH_FORMAT, keep)
+    for container_tag in to_pull:
+        try:
+            await pull(container_tag)
+        except docker.errors.APIError as e:
+            logger.error("Could not pull image %s: %s", image_ref(container_tag), e)
+
+    # only what did get pulled counts towards keep, a failed pull doesn't cost a usable version
+    with Database() as db:
+        pulled = db.pulled_container_versions()
+    usable = [
+        tag for tag, bench_format, _ in pulled if bench_format <= constants.SUPPORTED_BENCH_FORMAT
+    ]
+    # between jobs, so none loses its image between its build and its runs
+    async with lib.bench_lock:
+        for container_tag in {tag for tag, _, _ in pulled} - set(usable[:keep]):
+            await remove(container_tag)
+
+    freed = await prune()
+    ours, layers = await disk_usage()
+    logger.info(
+        "Images: %.0f MiB for ours, %.0f MiB of layers in total, pruning freed %.0f MiB",
+        ours / 2**20,
+        layers / 2**20,
+        freed / 2**20,
+    )
+
+
+async def describe_images() -> str:
+    """Pull durations and disk usage, for the /images admin command."""
+    with Database() as db:
+        pulled = db.pulled_container_versions()
+    ours, layers = await disk_usage()
+
+    lines = [
+        f"`{tag}` (format {bench_format}): "
+        + (f"pulled in {seconds:.0f}s" if seconds is not None else "no background pull")
+        for tag, bench_format, seconds in pulled
+    ]
+    lines.append(
+        f"Our images use {ours / 2**20:.0f} MiB, all image layers {layers / 2**20:.0f} MiB."
+    )
+    return "\n".join(lines)
@@ -0,0 +1,54 @@
+import json
+import logging
+import os
+import shutil
+from typing import Mapping, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# input labels, any str subtype such as SessionLabel
+L = TypeVar("L", bound=str)
+
+# written last when filling a day, a day without one is incomplete
+MANIFEST = ".manifest.json"
+
+
+def day_dir(cache_dir: str, year: int, day: int, /) -> str:
+    # absolute, it is bind mounted into the run containers
+    return os.path.abspath(os.path.join(cache_dir, f"{year}-{day:02}"))
+
+
+def is_current(path: str, fingerprints: Mapping[L, str], /) -> bool:
+    """Whether the cached inputs in path are exactly the inputs with these fingerprints."""
+    try:
+        with open(os.path.join(path, MANIFEST)) as fp:
+            return bool(json.load(fp) == dict(fingerprints))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+
+def fill(path: str, inputs: Mapping[L, str], fingerprints: Mapping[L, str], /) -> None:
+    """
+    Write the decompressed inputs of a day to path, replacing what was there. The new inputs
+    are written next to path and swapped in, so a run never sees half of them.
+    """
+    staging = f"{path}.{os.getpid()}.new"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for label, data in inputs.items():
+        with open(os.path.join(staging, label), "w") as fp:
+            fp.write(data)
+    with open(os.path.join(staging, MANIFEST), "w") as fp:
+        json.dump(dict(fingerprints), fp)
+
+    # running containers keep the old inputs they have mounted until they exit
+    old = f"{path}.{os.getpid()}.old"
+    try:
+        os.rename(path, old)
+    except FileNotFoundError:
+        pass
+    os.rename(staging, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    logger.info("Cached %s inputs in %s", len(inputs), path)
@@ -0,0 +1,77 @@
+import base64
+from dataclasses import dataclass
+from typing import Any, Self, cast
+
+from .database import AdventDay, AdventPart, ContainerTag, SessionLabel, Year
+from .entrypoints import Entrypoints
+from .profiles import BuildProfile
+
+
+def b64encode(data: bytes, /) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def b64decode(data: str, /) -> bytes:
+    return base64.b64decode(data, validate=True)
+
+
+@dataclass(slots=True, frozen=True)
+class BenchJob:
+    """
+    A submission to build and measure, with everything needed to do so without the database:
+    the day's inputs, which the bot only fills in for workers, and their answers.
+    """
+
+    user_id: int
+    user_name: str
+    year: Year
+    day: AdventDay
+    parts: tuple[AdventPart, ...]
+    code: bytes
+    profile: BuildProfile
+    container_tag: ContainerTag
+    inputs: dict[SessionLabel, str]
+    # the known answer to each input, per part
+    answers: dict[AdventPart, dict[SessionLabel, str]]
+    entrypoints: Entrypoints = Entrypoints.RUN
+    # for /profile, the inputs to make flamegraphs of instead of measuring every input
+    profile_inputs: tuple[SessionLabel, ...] = ()
+
+    def to_wire(self) -> dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "user_name": self.user_name,
+            "year": self.year,
+            "day": self.day,
+            "parts": list(self.parts),
+            "code": b64encode(self.code),
+            "profile": str(self.profile),
+            "container_tag": self.container_tag,
+            "inputs": self.inputs,
+            # JSON object keys are strings
+            "answers": {str(part): answers for part, answers in self.answers.items()},
+            "entrypoints": str(self.entrypoints),
+            "profile_inputs": list(self.profile_inputs),
+        }
+
+    @classmethod
+    def from_wire(cls, wire: dict[str, Any], /) -> Self:
+        return cls(
+            int(wire["user_id"]),
+            str(wire["user_name"]),
+            Year(int(wire["year"])),
+            cast(AdventDay, int(wire["day"])),
+            tuple(cast(AdventPart, int(part)) for part in wire["parts"]),
+            b64decode(wire["code"]),
+            BuildProfile(wire["profile"]),
+            ContainerTag(str(wire["container_tag"])),
+            {SessionLabel(label): str(data) for label, data in wire["inputs"].items()},
+            {
+                cast(AdventPart, int(part)): {
+                    SessionLabel(label): str(answer) for label, answer in answers.items()
+                }
+                for part, answers in wire["answers"].items()
+            },
+            Entrypoints(wire["entrypoints"]),
+            tuple(SessionLabel(str(label)) for label in wire["profile_inputs"]),
+        )
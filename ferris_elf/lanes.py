@@ -0,0 +1,149 @@
+import enum
+import json
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Callable, Iterable, Optional
+
+
+class LaneKind(enum.StrEnum):
+    """Which cpus, and which limits, a container runs with."""
+
+    # the timed runs, alone on the reserved cpus
+    MEASURE = "measure"
+    # everything else: checks, builds, PGO training, and the bot itself
+    BUILD = "build"
+
+
+def parse_cpuset(spec: str, /) -> set[int]:
+    """The cpus of a cpu list like `0-3,6`, the format of docker's cpuset and of sysfs."""
+    cpus: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def format_cpuset(cpus: Iterable[int], /) -> str:
+    ranges: list[list[int]] = []
+    for cpu in sorted(set(cpus)):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def _read_cpuset(path: str, /) -> Optional[set[int]]:
+    try:
+        with open(path) as fp:
+            return parse_cpuset(fp.read())
+    except (OSError, ValueError):
+        return None
+
+
+def online_cpus() -> set[int]:
+    return _read_cpuset("/sys/devices/system/cpu/online") or {0}
+
+
+def smt_siblings(cpu: int, /) -> set[int]:
+    """The cpus sharing a physical core with cpu, itself included."""
+    return _read_cpuset(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") or {cpu}
+
+
+@dataclass(slots=True, frozen=True)
+class Lane:
+    kind: LaneKind
+    cpus: frozenset[int]
+    # microseconds, the quota is how much of each period the container may use
+    cpu_period: Optional[int] = None
+    cpu_quota: Optional[int] = None
+    pids_limit: Optional[int] = None
+    # (block device, bytes per second) throttles
+    read_bps: tuple[tuple[str, int], ...] = ()
+    write_bps: tuple[tuple[str, int], ...] = ()
+    no_swap: bool = False
+    # SMT siblings of the lane's cpus, which no lane uses
+    idle_cpus: frozenset[int] = frozenset()
+
+    def container_options(self, mem_limit: str, /) -> dict[str, Any]:
+        """Keyword arguments for docker's containers.run, on top of mem_limit."""
+        options: dict[str, Any] = {"cpuset_cpus": format_cpuset(self.cpus)}
+        if self.cpu_period is not None:
+            options["cpu_period"] = self.cpu_period
+        if self.cpu_quota is not None:
+            options["cpu_quota"] = self.cpu_quota
+        if self.pids_limit is not None:
+            options["pids_limit"] = self.pids_limit
+        if self.read_bps:
+            options["device_read_bps"] = [{"Path": p, "Rate": r} for p, r in self.read_bps]
+        if self.write_bps:
+            options["device_write_bps"] = [{"Path": p, "Rate": r} for p, r in self.write_bps]
+        if self.no_swap:
+            # the memory limit including swap, equal to it means no swap at all
+            options["memswap_limit"] = mem_limit
+            options["mem_swappiness"] = 0
+        return options
+
+    def record(self) -> str:
+        """The lane as JSON, saved with each benchmark run measured in it."""
+        return json.dumps(
+            {
+                "cpus": format_cpuset(self.cpus),
+                "idle_cpus": format_cpuset(self.idle_cpus),
+                "cpu_period": self.cpu_period,
+                "cpu_quota": self.cpu_quota,
+                "pids_limit": self.pids_limit,
+                "no_swap": self.no_swap,
+            },
+            sort_keys=True,
+        )
+
+
+def plan_lanes(
+    measure_cpus: AbstractSet[int],
+    online: AbstractSet[int],
+    siblings: Callable[[int], set[int]],
+    /,
+    *,
+    cpu_period: int,
+    cpu_quota: int,
+    pids_limit: int,
+    build_read_bps: tuple[tuple[str, int], ...] = (),
+    build_write_bps: tuple[tuple[str, int], ...] = (),
+    no_swap: bool = True,
+) -> dict[LaneKind, Lane]:
+    """
+    Split the online cpus between the lanes. The SMT siblings of the measure lane's cpus
+    belong to neither, so nothing shares a physical core with a measurement. A cpu_quota of
+    0 allows the measure lane's cpus in full, the fixed period still applies.
+    """
+    if not measure_cpus:
+        raise ValueError("The measure lane has no cpus")
+    if not measure_cpus <= online:
+        raise ValueError(f"cpus {format_cpuset(measure_cpus - online)} are not online")
+
+    reserved = set().union(*(siblings(cpu) for cpu in measure_cpus)) | measure_cpus
+    build_cpus = online - reserved
+    if not build_cpus:
+        raise ValueError("The measure lane leaves no cpus for the rest")
+
+    return {
+        LaneKind.MEASURE: Lane(
+            LaneKind.MEASURE,
+            frozenset(measure_cpus),
+            cpu_period=cpu_period,
+            cpu_quota=cpu_quota or cpu_period * len(measure_cpus),
+            pids_limit=pids_limit,
+            no_swap=no_swap,
+            idle_cpus=frozenset(reserved - measure_cpus),
+        ),
+        LaneKind.BUILD: Lane(
+            LaneKind.BUILD,
+            frozenset(build_cpus),
+            pids_limit=pids_limit,
+            read_bps=build_read_bps,
+            write_bps=build_write_bps,
+        ),
+    }
@@ -1,13 +1,21 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
 import json
 import logging
 import os
 import pathlib
+import re
 import shutil
 import statistics as stats
 import tempfile
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Optional, cast, Self
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Optional, cast, Self
 from zoneinfo import ZoneInfo
 
 import docker
@@ -15,11 +23,15 @@ import discord
 from discord.ext import commands
 
 from .config import settings
-from . import constants
+from . import build_cache, constants, diagnostics, input_cache, manifest, workspace
+from .build_cache import BuildCacheKey
 from .database import (
     AdventDay,
     AdventPart,
     AocInput,
+    ContainerTag,
+    ContainerVersionError,
+    ContainerVersionId,
     Database,
     SessionLabel,
     Submission,
@@ -27,48 +39,113 @@ from .database import (
     Year,
 )
 from .picoseconds import Picoseconds
-from .containers import run_cmd
+from .ranking import RankedTime
+from .samples import pack_samples, unpack_samples
+from .calibration import WORKLOADS, DriftReport, normalize, relative_speed
+from .counters import HardwareCounters
+from .diagnostics import Diagnostic
+from .dispatch import Dispatcher
+from .entrypoints import PHASES_MACRO, Entrypoints, both_parts, parts_shim
+from .hardware import HardwareClass, local_hardware
+from .jobs import BenchJob, b64decode, b64encode
+from .profiles import BuildProfile, cargo_env, training_command
+from .memory import MemoryUsage
+from .containers import DeadlineExceeded, lanes, run_cmd
+from .lanes import LaneKind
+from . import noise
 
 logger = logging.getLogger(__name__)
 
+# Only one benchmark runs at a time, so that measurements don't interfere with each other.
+# Anything else that runs containers on the measurement path (calibration, ...) must hold this.
+bench_lock = asyncio.Lock()
+
+RUNNER_DIR = os.path.join(os.path.dirname(__file__), "..", "runner")
+
+# where pprof writes the flamegraph for the `aoc_sub/run` benchmark, relative to the tmp dir
+FLAMEGRAPH_PATH = os.path.join("target", "criterion", "aoc_sub", "run", "profile", "flamegraph.svg")
+
 
 async def benchmark(
     ctx: commands.Context[Any],
     year: Year,
     day: AdventDay,
-    part: AdventPart,
+    parts: tuple[AdventPart, ...],
     code: bytes,
+    profile: BuildProfile = BuildProfile.RELEASE,
+    entrypoints: Entrypoints = Entrypoints.RUN,
+    dispatcher: Optional[Dispatcher] = None,
 ) -> None:
-    """Run the entire benchmark process, end-to-end."""
+    """
+    Run the entire benchmark process, end-to-end. Submissions covering both parts are built
+    once and saved as one submission per part, linked to each other. With a dispatcher, a
+    worker builds and measures the submission instead of this host.
+    """
     op_name, op_id = ctx.author.name, ctx.author.id
+    parts_name = " and ".join(f"part {p}" for p in parts)
+
+    if not has_inputs(year, day):
+        await ctx.reply(f"There are no inputs for day {day} yet, please submit again later.")
+        return
 
     try:
-        results: list[RunResult] = []
+        submission_ids: dict[AdventPart, SubmissionId] = {}
 
         with Database() as db:
-            (version_id, container_tag) = db.newest_container_version(
-                constants.SUPPORTED_BENCH_FORMAT
-            )
-
-        with tempfile.TemporaryDirectory(suffix=f"-ferris-elf-{op_id}") as tmpdir:
-            populate_tmp_dir(tmpdir, code)
-            if not await build_code(container_tag, op_name, op_id, tmpdir):
-                # This reply is not good UX, but it's better than silence.
-                await ctx.reply("Build failed.")
+            try:
+                (version_id, container_tag) = db.newest_container_version(
+                    constants.SUPPORTED_BENCH_FORMAT, profile.min_bench_format()
+                )
+            except ContainerVersionError:
+                if profile.min_bench_format() == 1:
+                    raise
+                # only images this old are pulled, they lack the tools this profile needs
+                await ctx.reply(
+                    f"{profile} builds need a newer bencher image than this host has, "
+                    + "please submit with another profile for now."
+                )
                 return
 
-            with Database() as db:
-                answers_map = db.load_answers(year, day, part)
+            job = BenchJob(
+                op_id,
+                op_name,
+                year,
+                day,
+                parts,
+                code,
+                profile,
+                container_tag,
+                # workers have no database to read them from
+                {label: i.data for label, i in db.get_inputs(year, day).items()}
+                if dispatcher is not None
+                else {},
+                {part: db.load_answers(year, day, part) for part in parts},
+                entrypoints,
+            )
 
-                for in_file, contents in db.get_inputs(year, day).items():
-                    logger.info("Processing file: %s", in_file)
-                    load_input(tmpdir, contents)
-                    result_lst = await run_code(container_tag, op_name, op_id, tmpdir, in_file)
-                    result = process_run_result(in_file, answers_map, result_lst)
-                    if result is not None:
-                        results.append(result)
+        if dispatcher is not None:
+            hardware, wire = await dispatcher.run(job)
+            outcome = JobOutcome.from_wire(wire)
+        else:
+            hardware = local_hardware()
+            async with bench_lock:
+                inputs_dir, labels = prepare_inputs(year, day)
+                outcome = await run_job(job, inputs_dir, labels)
 
-                db.save_results(
+        if outcome.errors:
+            await ctx.reply(compile_errors_reply(outcome.errors))
+            return
+        if not outcome.built:
+            # This reply is not good UX, but it's better than silence.
+            await ctx.reply("Build failed.")
+            return
+        results = outcome.results
+
+        with Database() as db:
+            hardware_class = hardware.hardware_class()
+            db.record_hardware(hardware_class, hardware.describe())
+            for part in parts:
+                submission_ids[part] = db.save_results(
                     op_id,
                     year,
                     day,
@@ -76,67 +153,485 @@ async def benchmark(
                     code,
                     version_id,
                     constants.SUPPORTED_BENCH_FORMAT,
-                    results,
+                    results[part],
+                    profile,
+                    hardware_class,
+                    entrypoints,
                 )
 
-        verified_results = [r for r in results if r.verified]
-        if len(verified_results) > 0:
-            median = Picoseconds.from_picos(
-                stats.mean([r.median.as_picos() for r in verified_results])
-            )
-            average = Picoseconds.from_picos(
-                stats.mean([r.average.as_picos() for r in verified_results])
+            if len(submission_ids) == 2:
+                db.pair_submissions(submission_ids[1], submission_ids[2])
+            # calibrations are measured on this host
+            speed = db.calibration_speed(version_id) if hardware == local_hardware() else None
+
+        if len(parts) == 1:
+            (part,) = parts
+            verified, description = describe_results(results[part], speed)
+            embed = discord.Embed(
+                title=f"Benchmark complete ({'Verified' if verified else 'Unverified'})",
+                description=description,
             )
-            await ctx.reply(
-                embed=discord.Embed(
-                    title="Benchmark complete (Verified)",
-                    description=f"Median: **{median}**\nAverage: **{average}**",
+        else:
+            embed = discord.Embed(title="Benchmark complete")
+            for part in parts:
+                verified, description = describe_results(results[part], speed)
+                embed.add_field(
+                    name=f"Part {part} ({'Verified' if verified else 'Unverified'})",
+                    value=description,
+                    inline=False,
                 )
+
+        if profile != BuildProfile.RELEASE:
+            embed.description = f"Built with {profile.describe()}.\n" + (embed.description or "")
+        if dispatcher is not None:
+            embed.description = f"Measured on {hardware.describe()}.\n" + (embed.description or "")
+
+        ids = ", ".join(str(submission_ids[p]) for p in parts)
+        if settings.profiling.enabled:
+            embed.set_footer(
+                text=f"Submission {ids}, use /profile {submission_ids[parts[0]]} for flamegraphs"
             )
         else:
-            median = Picoseconds.from_picos(stats.mean([r.median.as_picos() for r in results]))
-            average = Picoseconds.from_picos(stats.mean([r.average.as_picos() for r in results]))
+            embed.set_footer(text=f"Submission {ids}")
+
+        await ctx.reply(embed=embed)
+
+    except Exception:
+        logger.exception(f"Unhandled exception while benchmarking day {day}, {parts_name}.")
+        await ctx.reply(f"Unhandled exception while benchmarking day {day}, {parts_name}.")
+
+
+@dataclass(slots=True)
+class JobOutcome:
+    """What building and measuring a BenchJob came to, on this host or a worker."""
+
+    # the compiler's errors if the code didn't pass the check, the job stops there
+    errors: list[Diagnostic] = field(default_factory=list)
+    built: bool = False
+    results: dict[AdventPart, list["RunResult"]] = field(default_factory=dict)
+    # the svgs of a /profile job, by input, inputs that failed to profile are left out
+    flamegraphs: dict[SessionLabel, bytes] = field(default_factory=dict)
+
+    def to_wire(self) -> dict[str, Any]:
+        return {
+            "errors": [dataclasses.asdict(e) for e in self.errors],
+            "built": self.built,
+            "results": {str(p): [r.to_wire() for r in rs] for p, rs in self.results.items()},
+            "flamegraphs": {label: b64encode(svg) for label, svg in self.flamegraphs.items()},
+        }
+
+    @classmethod
+    def from_wire(cls, wire: dict[str, Any]) -> Self:
+        return cls(
+            [Diagnostic(**e) for e in wire["errors"]],
+            bool(wire["built"]),
+            {
+                cast(AdventPart, int(p)): [RunResult.from_wire(r) for r in rs]
+                for p, rs in wire["results"].items()
+            },
+            {SessionLabel(label): b64decode(svg) for label, svg in wire["flamegraphs"].items()},
+        )
+
+
+async def run_job(job: BenchJob, inputs_dir: str, labels: list[SessionLabel]) -> JobOutcome:
+    """
+    Build and measure a job on this host, with the inputs in inputs_dir, or profile it for jobs
+    with profile_inputs. Uses no database, so workers run it as well. The bot holds bench_lock
+    around it, a worker runs one at a time.
+    """
+    op_name, op_id = job.user_name, job.user_id
+    outcome = JobOutcome()
+
+    with job_tmp_dir(f"-ferris-elf-{op_id}") as tmpdir:
+        populate_tmp_dir(tmpdir, job.code, job.entrypoints)
+        with cached_build(
+            tmpdir, BuildCacheKey(op_id, job.year, job.day, job.container_tag, job.profile)
+        ):
+            if settings.build.check_first and (
+                errors := await check_code(job.container_tag, op_name, op_id, tmpdir)
+            ):
+                outcome.errors = errors
+                return outcome
+
+            if not await build_profiled(
+                job.container_tag,
+                op_name,
+                op_id,
+                tmpdir,
+                job.profile,
+                inputs_dir,
+                labels,
+                job.parts,
+            ):
+                return outcome
+            outcome.built = True
+
+            if job.profile_inputs:
+                for in_file in job.profile_inputs:
+                    svg = await profile_code(
+                        job.container_tag,
+                        op_name,
+                        op_id,
+                        tmpdir,
+                        in_file,
+                        job.parts[0],
+                        inputs_dir,
+                        job.profile,
+                    )
+                    if svg is not None:
+                        outcome.flamegraphs[in_file] = svg
+                return outcome
+
+            for part in job.parts:
+                outcome.results[part] = []
+                for in_file in labels:
+                    logger.info("Processing file: %s, part %s", in_file, part)
+                    result = await measure_input(
+                        job.container_tag,
+                        op_name,
+                        op_id,
+                        tmpdir,
+                        in_file,
+                        job.answers.get(part, {}),
+                        part,
+                        inputs_dir,
+                        job.profile,
+                    )
+                    if result is not None:
+                        outcome.results[part].append(result)
+
+    return outcome
+
+
+def stage_inputs(job: BenchJob, worker: str, /) -> tuple[str, list[SessionLabel]]:
+    """
+    prepare_inputs for workers: the input cache dir with the job's inputs, which came with it.
+    Each worker keeps its own cache, the bot's fingerprints don't apply to it, and workers on
+    one host would swap a day's inputs away under each other's containers.
+    """
+    cache_dir = os.path.join(settings.input_cache.dir, "workers", re.sub(r"[^\w.-]", "_", worker))
+    path = input_cache.day_dir(cache_dir, job.year, job.day)
+    fingerprints = {
+        label: hashlib.sha256(data.encode()).hexdigest() for label, data in job.inputs.items()
+    }
+    if not input_cache.is_current(path, fingerprints):
+        input_cache.fill(path, job.inputs, fingerprints)
+    return (path, list(fingerprints))
+
+
+def has_inputs(year: Year, day: AdventDay) -> bool:
+    """Whether the inputs for a day are stored, submissions for it can't run before."""
+    with Database() as db:
+        return bool(db.input_labels(year, day))
+
+
+async def wait_for_inputs(ctx: commands.Context[Any], year: Year, day: AdventDay) -> bool:
+    """
+    Hold a submission made right at release until the inputs for its day are stored, for up
+    to release.hold_minutes after the day unlocked. Returns False if they are still missing
+    then, right away for days that unlocked before that.
+    """
+    unlock = datetime(year, 12, day, tzinfo=ZoneInfo("America/New_York"))
+    deadline = unlock + timedelta(minutes=float(settings.release.hold_minutes))
+    told = False
+
+    while True:
+        if has_inputs(year, day):
+            return True
+
+        if datetime.now(tz=ZoneInfo("America/New_York")) >= deadline:
+            return False
+        if not told:
             await ctx.reply(
-                embed=discord.Embed(
-                    title="Benchmark complete (Unverified)",
-                    description=f"Median: **{median}**\nAverage: **{average}**",
-                )
+                f"The inputs for day {day} are not fetched yet, "
+                + "your submission will run as soon as they are."
             )
+            told = True
+        await asyncio.sleep(5)
 
-    except Exception:
-        logger.exception(f"Unhandled exception while benchmarking day {day}, part {part}.")
-        await ctx.reply(f"Unhandled exception while benchmarking day {day}, part {part}.")
 
+def describe_results(results: list["RunResult"], speed: Optional[float], /) -> tuple[bool, str]:
+    """
+    Summarize the runs of one part for the benchmark reply, only counting the verified runs if
+    there are any. Returns whether there were, and the summary.
+    """
+    verified_results = [r for r in results if r.verified]
+    shown = verified_results if len(verified_results) > 0 else results
+
+    median = Picoseconds.from_picos(stats.mean([r.median.as_picos() for r in shown]))
+    average = Picoseconds.from_picos(stats.mean([r.average.as_picos() for r in shown]))
+    description = f"Median: **{median}**\nAverage: **{average}**"
+
+    if (normalized := normalize(median, speed)) is not None:
+        description += f"\nNormalized median: **{normalized}**"
+
+    if cold_times := [r.cold.as_picos() for r in shown if r.cold is not None]:
+        cold = Picoseconds.from_picos(stats.median(cold_times))
+        description += f"\nCold start: **{cold}**"
+
+    if phased := [
+        (r.parse_time.as_picos(), r.solve_time.as_picos())
+        for r in shown
+        if r.parse_time is not None and r.solve_time is not None
+    ]:
+        parse = Picoseconds.from_picos(stats.mean(p for p, _ in phased))
+        solve = Picoseconds.from_picos(stats.mean(s for _, s in phased))
+        description += f"\nParse: **{parse}**, Solve: **{solve}**"
+
+    if peak := max(
+        (r.memory for r in shown if r.memory is not None),
+        key=lambda m: m.peak_bytes,
+        default=None,
+    ):
+        description += "\n" + peak.describe()
+
+    if counters := HardwareCounters.combine(r.counters for r in shown if r.counters is not None):
+        description += "\n" + counters.describe()
+
+    return (len(verified_results) > 0, description)
 
-def populate_tmp_dir(tmp_dir: str, solution_code: bytes) -> None:
+
+async def measure_input(
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    in_file: SessionLabel,
+    answers_map: dict[SessionLabel, str],
+    /,
+    part: Optional[AdventPart] = None,
+    inputs_dir: Optional[str] = None,
+    profile: BuildProfile = BuildProfile.RELEASE,
+) -> Optional["RunResult"]:
     """
-    Set up tmp_dir for building. This copies in the runner and submitted code,
-    but not the AOC inputs. We'll read those later.
+    Benchmark the already built code against one input. Runs that are too noisy according to
+    the configured NoisePolicy are re-measured, up to the attempt budget, and the least noisy
+    attempt is kept.
     """
-    logger.info("Building temp dir to use as volume")
-    # Step 1: Copy all the rust files
-    script_dir = os.path.dirname(__file__)
-    runner_src_dir = os.path.join(script_dir, "../runner")
-    # The ignores were causing problems with building
-    # ignores = shutil.ignore_patterns("target/", "Dockerfile", "**/.gitkeep")
-    ignores = shutil.ignore_patterns()
-    shutil.copytree(runner_src_dir, tmp_dir, dirs_exist_ok=True, ignore=ignores)
+    policy = noise.NoisePolicy.from_settings()
+    best: Optional[tuple[float, "RunResult"]] = None
+
+    for attempt in range(1, policy.max_attempts + 1):
+        result_lst = await run_code(
+            container_version, author_name, author_id, tmp_dir, in_file, part, inputs_dir, profile
+        )
+        result = process_run_result(in_file, answers_map, result_lst)
+        if result is None:
+            # the container failed, retrying is not going to make the code work
+            break
+
+        report = noise.assess(result.median, result.low_bound, result.high_bound, result.samples)
+        result.noise_report = report
+
+        badness = report.badness(policy)
+        if best is None or badness < best[0]:
+            best = (badness, result)
+
+        if not report.is_noisy(policy):
+            break
+
+        logger.info(
+            "Noisy run for %s on %s (attempt %s/%s, ci width %.3f, outliers %.3f)",
+            author_id,
+            in_file,
+            attempt,
+            policy.max_attempts,
+            report.ci_width,
+            report.outlier_ratio,
+        )
+
+    if best is None:
+        return None
+
+    chosen = best[1]
+    chosen.attempts = attempt
+    if (host_lanes := lanes()) is not None:
+        chosen.lane = host_lanes[LaneKind.MEASURE].record()
+
+    if (fresh_runs := int(settings.cold.fresh_runs)) > 0:
+        cold_times = await cold_runs(
+            container_version,
+            author_name,
+            author_id,
+            tmp_dir,
+            in_file,
+            fresh_runs,
+            part,
+            inputs_dir,
+            profile,
+        )
+        if cold_times:
+            chosen.cold = Picoseconds.from_picos(stats.median(t.as_picos() for t in cold_times))
+            chosen.cold_runs = len(cold_times)
+
+    return chosen
+
+
+async def calibrate(version_id: ContainerVersionId, container_tag: ContainerTag) -> DriftReport:
+    """
+    Benchmark the reference workloads in runner/calibration on a container version and save the
+    results. Returns how far this calibration drifted from the version's first calibration.
+    """
+    logger.info("Calibrating host on container version %s", container_tag)
+
+    async with bench_lock:
+        for workload in WORKLOADS:
+            with job_tmp_dir("-ferris-elf-calibration") as tmpdir:
+                populate_tmp_dir(tmpdir, workload.code())
+                if not await build_code(container_tag, "calibration", 0, tmpdir):
+                    logger.error("Calibration workload %s failed to build", workload.name)
+                    continue
+
+                label = SessionLabel(workload.name)
+                load_input(tmpdir, AocInput(Year(0), 1, label, workload.input(), None, None))
+                result = await measure_input(container_tag, "calibration", 0, tmpdir, label, {})
+                if result is None:
+                    logger.error("Calibration workload %s failed to run", workload.name)
+                    continue
+
+            with Database() as db:
+                db.save_calibration_run(
+                    version_id,
+                    workload.name,
+                    result.median,
+                    result.low_bound,
+                    result.high_bound,
+                    hardware_class=local_hardware().hardware_class(),
+                )
+
+    with Database() as db:
+        drift = relative_speed(
+            db.calibration_medians(version_id, first=True), db.calibration_medians(version_id)
+        )
+
+    report = DriftReport(container_tag, drift)
+    logger.info("Calibration finished: %s", report.describe())
+    return report
+
+
+@functools.cache
+def workspace_template() -> str:
+    """
+    The template every job's workspace is linked from. Looked up once per process, so a
+    restart after runner/ changed picks the changes up.
+    """
+    template_dir = workspace.prepare_template(RUNNER_DIR, settings.workspace.dir)
+    logger.info("Workspace template in %s", template_dir)
+    return template_dir
+
+
+def job_tmp_dir(suffix: str) -> "tempfile.TemporaryDirectory[str]":
+    """A temp dir for one job's workspace, next to the template so its files can be linked."""
+    # absolute, docker can't bind mount relative paths
+    workspace_dir = os.path.abspath(settings.workspace.dir)
+    os.makedirs(workspace_dir, exist_ok=True)
+    return tempfile.TemporaryDirectory(suffix=suffix, dir=workspace_dir)
+
+
+def populate_tmp_dir(
+    tmp_dir: str, solution_code: bytes, entrypoints: Entrypoints = Entrypoints.RUN
+) -> None:
+    """
+    Set up tmp_dir for building. This links in the runner from the workspace template and
+    writes the submitted code, but not the AOC inputs. We'll read those later.
+    entrypoints are the functions the benchmark calls, as chosen when submitting.
+    """
+    start = time.perf_counter()
+    # Step 1: Link in all the rust files
+    linked = workspace.instantiate(workspace_template(), tmp_dir)
 
     # Step 2: Write code.
-    code_path = os.path.join(tmp_dir, "src", "code.rs")
-    with open(code_path, "wb") as code_file:
-        code_file.write(solution_code)
+    workspace.write_file(os.path.join(tmp_dir, "src", "code.rs"), solution_code)
+
+    # Step 3: Point the benchmark at the entrypoints that were asked for.
+    if entrypoints == Entrypoints.BOTH_PARTS:
+        # checked when submitting, so the functions are there
+        functions = both_parts(solution_code)
+        assert functions is not None, "both parts submission without part functions"
+        workspace.write_file(
+            os.path.join(tmp_dir, "src", "parts.rs"), parts_shim(functions).encode()
+        )
+    elif entrypoints == Entrypoints.PHASES:
+        workspace.write_file(os.path.join(tmp_dir, "src", "phases.rs"), PHASES_MACRO.encode())
+
+    # Step 4: Only depend on the crates the code uses.
+    if settings.build.prune_dependencies:
+        write_pruned_manifest(tmp_dir, solution_code)
 
+    logger.info(
+        "Instantiated workspace %s in %.1f ms (%s)",
+        tmp_dir,
+        (time.perf_counter() - start) * 1000,
+        "linked" if linked else "copied",
+    )
     logger.debug("Contents of tmp dir: %s", os.listdir(tmp_dir))
 
 
+def write_pruned_manifest(tmp_dir: str, solution_code: bytes) -> None:
+    """
+    Write a Cargo.toml that only has the dependencies the code refers to, so cargo resolves
+    and links a fraction of the vendored crates. Without it the full manifest is used.
+    """
+    try:
+        with open(os.path.join(tmp_dir, "Cargo.toml")) as fp:
+            full = fp.read()
+        pruned = manifest.prune_for(full, solution_code.decode("utf-8", errors="replace"))
+        workspace.write_file(os.path.join(tmp_dir, manifest.PRUNED_MANIFEST), pruned.encode())
+    except OSError:
+        logger.exception("Could not write a pruned manifest in %s, using the full one", tmp_dir)
+
+
+def manifest_volume(tmp_dir: str) -> dict[str, dict[str, str]]:
+    """Mounts the pruned manifest over the image's Cargo.toml, if tmp_dir has one."""
+    path = os.path.join(tmp_dir, manifest.PRUNED_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    return {path: {"bind": "/app/Cargo.toml", "mode": "ro"}}
+
+
+@contextmanager
+def cached_build(tmp_dir: str, key: BuildCacheKey) -> Iterator[None]:
+    """
+    Reuse the user's previous `target/` for this day and container version while the block
+    runs, so cargo only rebuilds what changed, and keep it for the next submission afterwards.
+    The cache is best effort, failing to use it never fails the submission.
+    """
+    if not settings.build_cache.enabled:
+        yield
+        return
+
+    target_dir = os.path.join(tmp_dir, "target")
+    try:
+        build_cache.checkout(settings.build_cache.dir, key, target_dir)
+    except OSError:
+        logger.exception("Could not reuse cached build %s", key.dirname())
+
+    try:
+        yield
+    finally:
+        try:
+            # criterion's measurements of this submission are not build state, don't keep them
+            shutil.rmtree(os.path.join(target_dir, "criterion"), ignore_errors=True)
+            build_cache.checkin(settings.build_cache.dir, key, target_dir)
+            build_cache.evict(
+                settings.build_cache.dir, int(settings.build_cache.max_megabytes) * 1024 * 1024
+            )
+        except OSError:
+            logger.exception("Could not cache build %s", key.dirname())
+
+
 async def build_code(
-    container_version: str, author_name: str, author_id: int, tmp_dir: str
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    profile: BuildProfile = BuildProfile.RELEASE,
 ) -> bool:
     """
     Designed to be used with a basic rust container. Run the container
     with `cargo build` to build the code. Code is mounted in as a volume,
-    so that binaries are saved between build/run.
+    so that binaries are saved between build/run. The runs have to use the
+    same profile, or cargo builds everything again.
     """
     logger.info("Running container to build code for %s", author_id)
     image = settings.docker.container_ref
@@ -145,21 +640,174 @@ async def build_code(
     try:
         out = await run_cmd(
             image,
-            "timeout --kill-after=5s 90s cargo build --release",
-            {},
+            "cargo build --release",
+            cargo_env(profile),
+            deadline=float(settings.deadlines.build),
             vols={
-                os.path.join(tmp_dir, "src"): {"bind": "/app/src", "mode": "rw"},
-                os.path.join(tmp_dir, "benches"): {"bind": "/app/benches", "mode": "rw"},
+                os.path.join(tmp_dir, "src"): {"bind": "/app/src", "mode": "ro"},
+                os.path.join(tmp_dir, "benches"): {"bind": "/app/benches", "mode": "ro"},
                 os.path.join(tmp_dir, "target"): {"bind": "/app/target", "mode": "rw"},
+                **manifest_volume(tmp_dir),
             },
         )
         logger.debug("Build container output: %s", out)
         return True
-    except docker.errors.ContainerError:
+    except docker.errors.ContainerError as e:
         logger.exception("Error in docker while building code")
+        errors = e.stderr.decode("utf-8", errors="replace") if e.stderr else ""
+        # more crates won't make it any faster
+        if (
+            not isinstance(e, DeadlineExceeded)
+            and manifest.needs_full_manifest(errors)
+            and drop_pruned_manifest(tmp_dir)
+        ):
+            logger.info("Building %s again with the full manifest", author_id)
+            return await build_code(container_version, author_name, author_id, tmp_dir, profile)
+        return False
+
+
+async def train_pgo(
+    container_version: str,
+    author_id: int,
+    tmp_dir: str,
+    inputs_dir: str,
+    runs: list[tuple[SessionLabel, AdventPart]],
+) -> bool:
+    """
+    First pass of a PGO build: build the code instrumented and run it once on each
+    (input, part), leaving the merged profile in the target dir for the optimized build.
+    """
+    logger.info("Running container to train PGO for %s", author_id)
+    image = settings.docker.container_ref
+    if ":" not in image:
+        image = image + ":" + container_version
+    try:
+        out = await run_cmd(
+            image,
+            training_command(
+                [(os.path.join("/app", "inputs", label), str(part)) for label, part in runs]
+            ),
+            # one call per run is enough to see which paths are hot
+            {"FERRIS_ELF_COLD_ONLY": "1", **cargo_env(BuildProfile.PGO, training=True)},
+            vols=run_volumes(tmp_dir, inputs_dir),
+            deadline=float(settings.deadlines.pgo),
+        )
+        logger.debug("PGO training container output: %s", out)
+        return True
+    except docker.errors.ContainerError:
+        logger.exception("Error in docker while training PGO")
         return False
 
 
+async def build_profiled(
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    profile: BuildProfile,
+    inputs_dir: str,
+    labels: list[SessionLabel],
+    parts: tuple[AdventPart, ...],
+) -> bool:
+    """Build the code with profile, training it on the inputs in inputs_dir first for PGO."""
+    if profile == BuildProfile.PGO:
+        runs = [(label, part) for label in labels for part in parts]
+        if not await train_pgo(container_version, author_id, tmp_dir, inputs_dir, runs):
+            return False
+    return await build_code(container_version, author_name, author_id, tmp_dir, profile)
+
+
+def compile_errors_reply(errors: list[Diagnostic]) -> str:
+    header = "Your code does not compile:\n"
+    # discord messages are at most 2000 characters
+    body = diagnostics.format_diagnostics(errors, 2000 - len(header) - len("```\n```"))
+    return f"{header}```\n{body}```"
+
+
+def drop_pruned_manifest(tmp_dir: str) -> bool:
+    """
+    Go back to the full manifest, when the pruned one could be why the code didn't compile.
+    Returns whether tmp_dir had a pruned one, and compiling again is worth it.
+    """
+    path = os.path.join(tmp_dir, manifest.PRUNED_MANIFEST)
+    if not os.path.exists(path):
+        return False
+    os.unlink(path)
+    return True
+
+
+async def check_code(
+    container_version: str, author_name: str, author_id: int, tmp_dir: str
+) -> list[Diagnostic]:
+    """
+    Run `cargo check` on the code, which rejects code that doesn't compile in a fraction of
+    the time of a release build. Returns the compiler's errors, none if the code passed or the
+    check didn't finish, the build will tell then.
+    """
+    logger.info("Running container to check code for %s", author_id)
+    image = settings.docker.container_ref
+    if ":" not in image:
+        image = image + ":" + container_version
+    # the stream is on stdout, which docker only hands back when the command succeeds
+    cmd = "cargo check --release --lib --message-format=json || true"
+    try:
+        out = await run_cmd(
+            image,
+            f"sh -c '{cmd}'",
+            {},
+            vols={
+                os.path.join(tmp_dir, "src"): {"bind": "/app/src", "mode": "ro"},
+                os.path.join(tmp_dir, "benches"): {"bind": "/app/benches", "mode": "ro"},
+                os.path.join(tmp_dir, "target"): {"bind": "/app/target", "mode": "rw"},
+                **manifest_volume(tmp_dir),
+            },
+            deadline=float(settings.deadlines.check),
+        )
+    except docker.errors.ContainerError:
+        logger.exception("Error in docker while checking code")
+        return []
+
+    success, errors = diagnostics.parse_check_output(out)
+    if success is False and errors:
+        if any(e.code in manifest.MISSING_CRATE_ERRORS for e in errors) and drop_pruned_manifest(
+            tmp_dir
+        ):
+            logger.info("Checking %s again with the full manifest", author_id)
+            return await check_code(container_version, author_name, author_id, tmp_dir)
+        return errors
+    return []
+
+
+def prepare_inputs(year: Year, day: AdventDay) -> tuple[str, list[SessionLabel]]:
+    """
+    Make sure the input cache has the current inputs for the day, decompressing them only if
+    they changed since they were cached. Returns the cache dir, to be mounted as the inputs
+    of run containers, and the labels of the inputs in it.
+    """
+    path = input_cache.day_dir(settings.input_cache.dir, year, day)
+    with Database() as db:
+        fingerprints = db.input_fingerprints(year, day)
+        if not input_cache.is_current(path, fingerprints):
+            inputs = db.get_inputs(year, day)
+            input_cache.fill(path, {label: i.data for label, i in inputs.items()}, fingerprints)
+
+    return (path, list(fingerprints))
+
+
+def run_volumes(tmp_dir: str, inputs_dir: Optional[str]) -> dict[str, dict[str, str]]:
+    """
+    The volumes of a container running the benchmark built in tmp_dir. Inputs come from
+    inputs_dir if given, usually the input cache, otherwise from the workspace.
+    """
+    return {
+        os.path.join(tmp_dir, "src"): {"bind": "/app/src", "mode": "ro"},
+        os.path.join(tmp_dir, "benches"): {"bind": "/app/benches", "mode": "ro"},
+        inputs_dir or os.path.join(tmp_dir, "inputs"): {"bind": "/app/inputs", "mode": "ro"},
+        os.path.join(tmp_dir, "target"): {"bind": "/app/target", "mode": "rw"},
+        **manifest_volume(tmp_dir),
+    }
+
+
 def load_input(tmp_dir: str, input_data: AocInput) -> None:
     """
     Populate tmp_dir with the input files for the requested year/day.
@@ -187,30 +835,46 @@ def load_input(tmp_dir: str, input_data: AocInput) -> None:
 
 
 async def run_code(
-    container_version: str, author_name: str, author_id: int, tmp_dir: str, in_file: SessionLabel, /
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    in_file: SessionLabel,
+    /,
+    part: Optional[AdventPart] = None,
+    inputs_dir: Optional[str] = None,
+    profile: BuildProfile = BuildProfile.RELEASE,
 ) -> Optional[list[dict[str, Any]]]:
     """
     Designed to be used with a basic rust container. Given the code already
-    built in tmp_dir as a volume, run the benchmark itself.
+    built in tmp_dir as a volume, run the benchmark itself. `part` picks the
+    solution function of submissions covering both parts.
     """
     in_file_name = os.path.join("/app", "inputs", in_file)
     logger.info("Running container to run code for %s", author_id)
     image = settings.docker.container_ref
     if ":" not in image:
         image = image + ":" + container_version
+    env = {
+        "FERRIS_ELF_INPUT_FILE_NAME": in_file_name,
+        **cargo_env(profile),
+    }
+    if part is not None:
+        env["FERRIS_ELF_PART"] = str(part)
+    cap_add = None
+    if settings.counters.enabled:
+        env["FERRIS_ELF_PERF_COUNTERS"] = str(int(settings.counters.iterations))
+        # docker's default seccomp profile only allows perf_event_open with this capability
+        cap_add = ["PERFMON"]
     try:
         out = await run_cmd(
             image,
-            "timeout --kill-after=15s 120s cargo criterion --message-format=json",
-            env={
-                "FERRIS_ELF_INPUT_FILE_NAME": in_file_name,
-            },
-            vols={
-                os.path.join(tmp_dir, "src"): {"bind": "/app/src", "mode": "rw"},
-                os.path.join(tmp_dir, "benches"): {"bind": "/app/benches", "mode": "rw"},
-                os.path.join(tmp_dir, "inputs"): {"bind": "/app/inputs", "mode": "rw"},
-                os.path.join(tmp_dir, "target"): {"bind": "/app/target", "mode": "rw"},
-            },
+            "cargo criterion --message-format=json",
+            env=env,
+            cap_add=cap_add,
+            vols=run_volumes(tmp_dir, inputs_dir),
+            deadline=float(settings.deadlines.run),
+            lane=LaneKind.MEASURE,
         )
         logger.debug("Run container output (type: %s):\n%s", type(out), out)
         results = list[dict[str, Any]]()
@@ -230,6 +894,158 @@ async def run_code(
         return None
 
 
+async def cold_runs(
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    in_file: SessionLabel,
+    runs: int,
+    /,
+    part: Optional[AdventPart] = None,
+    inputs_dir: Optional[str] = None,
+    profile: BuildProfile = BuildProfile.RELEASE,
+) -> list[Picoseconds]:
+    """
+    Run the already built benchmark in `runs` fresh processes that only time the first call,
+    with the input dropped from the page cache each time, and return those times.
+    """
+    in_file_name = os.path.join("/app", "inputs", in_file)
+    logger.info("Running container to time cold starts for %s", author_id)
+    image = settings.docker.container_ref
+    if ":" not in image:
+        image = image + ":" + container_version
+    env = {
+        "FERRIS_ELF_INPUT_FILE_NAME": in_file_name,
+        "FERRIS_ELF_COLD_ONLY": "1",
+        **cargo_env(profile),
+    }
+    if part is not None:
+        env["FERRIS_ELF_PART"] = str(part)
+    try:
+        out = await run_cmd(
+            image,
+            f"sh -c 'for i in $(seq {runs}); do cargo bench -q --bench bench; done'",
+            env=env,
+            vols=run_volumes(tmp_dir, inputs_dir),
+            deadline=float(settings.deadlines.cold),
+            lane=LaneKind.MEASURE,
+        )
+    except docker.errors.ContainerError:
+        logger.exception("Error in docker while timing cold starts")
+        return []
+
+    times = []
+    for line in out.splitlines():
+        if len(line) == 0 or line[0] != "{":
+            continue
+        blob = json.loads(line)
+        if blob.get("reason") == "ferris-cold":
+            times.append(Picoseconds.from_nanos(blob["nanos"]))
+
+    return times
+
+
+async def profile_code(
+    container_version: str,
+    author_name: str,
+    author_id: int,
+    tmp_dir: str,
+    in_file: SessionLabel,
+    /,
+    part: Optional[AdventPart] = None,
+    inputs_dir: Optional[str] = None,
+    profile: BuildProfile = BuildProfile.RELEASE,
+) -> Optional[bytes]:
+    """
+    Run the already built benchmark again in criterion's profiling mode, which is the only mode
+    where the pprof profiler in benches/bench.rs samples, and return the flamegraph svg it wrote.
+    This is a separate run so that sampling never perturbs the timed measurement.
+    """
+    flamegraph_path = os.path.join(tmp_dir, FLAMEGRAPH_PATH)
+    # the target dir is shared by every input, don't pick up the previous input's flamegraph
+    pathlib.Path(flamegraph_path).unlink(missing_ok=True)
+
+    in_file_name = os.path.join("/app", "inputs", in_file)
+    logger.info("Running container to profile code for %s", author_id)
+    image = settings.docker.container_ref
+    if ":" not in image:
+        image = image + ":" + container_version
+    env = {
+        "FERRIS_ELF_INPUT_FILE_NAME": in_file_name,
+        **cargo_env(profile),
+    }
+    if part is not None:
+        env["FERRIS_ELF_PART"] = str(part)
+    try:
+        out = await run_cmd(
+            image,
+            f"cargo bench --bench bench -- --profile-time {int(settings.profiling.seconds)}",
+            env=env,
+            vols=run_volumes(tmp_dir, inputs_dir),
+            deadline=float(settings.deadlines.profile),
+            lane=LaneKind.MEASURE,
+        )
+        logger.debug("Profile container output: %s", out)
+    except docker.errors.ContainerError:
+        logger.exception("Error in docker while profiling code")
+        return None
+
+    try:
+        with open(flamegraph_path, "rb") as fp:
+            return fp.read()
+    except FileNotFoundError:
+        logger.warning("Profiling run for %s on %s wrote no flamegraph", author_id, in_file)
+        return None
+
+
+async def profile_submission(
+    submission: Submission, dispatcher: Optional[Dispatcher] = None
+) -> dict[SessionLabel, bytes]:
+    """
+    Build a submission again and profile it on each input its current benchmark runs measured
+    without being profiled yet, for /profile. With a dispatcher, a worker does it instead of
+    this host. The flamegraphs are saved with those runs, and so are failures, so each
+    submission is only ever profiled once. Returns the new flamegraphs.
+    """
+    with Database() as db:
+        runs = db.unprofiled_runs(submission.id)
+        if not runs:
+            return {}
+
+        job = BenchJob(
+            submission.user_id,
+            "profile",
+            submission.year,
+            submission.day,
+            (submission.part,),
+            submission.code.encode("utf8"),
+            submission.build_profile,
+            db.get_container_tag(submission.bencher_version),
+            # workers have no database to read them from
+            {label: i.data for label, i in db.get_inputs(submission.year, submission.day).items()}
+            if dispatcher is not None
+            else {},
+            {},
+            submission.entrypoints,
+            tuple(label for _, label in runs),
+        )
+
+    if dispatcher is not None:
+        _, wire = await dispatcher.run(job)
+        outcome = JobOutcome.from_wire(wire)
+    else:
+        async with bench_lock:
+            inputs_dir, labels = prepare_inputs(submission.year, submission.day)
+            outcome = await run_job(job, inputs_dir, labels)
+
+    with Database() as db:
+        for run_id, in_file in runs:
+            db.save_flamegraph(run_id, outcome.flamegraphs.get(in_file))
+
+    return outcome.flamegraphs
+
+
 @dataclass(slots=True)
 class BuildRunResult:
     """Dataclass to build summary of a benchmarking run."""
@@ -243,6 +1059,15 @@ class BuildRunResult:
     median: Optional[float]
     high_bound: Optional[float]
     low_bound: Optional[float]
+    # per-iteration sample times, in picoseconds
+    samples: "array[int]" = field(default_factory=lambda: array("Q"))
+    counters: Optional[HardwareCounters] = None
+    memory: Optional[MemoryUsage] = None
+    # time of the answer-producing call, in nanoseconds
+    cold: Optional[float] = None
+    # bench format 2 medians of the separate parse and solve benchmarks, in nanoseconds
+    parse_time: Optional[float] = None
+    solve_time: Optional[float] = None
 
 
 def from_ns(v: Optional[float]) -> Picoseconds:
@@ -262,6 +1087,24 @@ class RunResult:
     high_bound: Picoseconds
     low_bound: Picoseconds
     from_session: SessionLabel
+    # raw per-iteration sample times in picoseconds, kept packed to avoid an object per sample
+    samples: "array[int]"
+    # how many times this input was measured before this result was accepted
+    attempts: int = 1
+    noise_report: Optional[noise.NoiseReport] = None
+    # hardware performance counters, when counters are enabled and the host supports them
+    counters: Optional[HardwareCounters] = None
+    # heap usage of a single call
+    memory: Optional[MemoryUsage] = None
+    # time of the first call, the answer-producing one unless fresh process runs replaced it
+    cold: Optional[Picoseconds] = None
+    # how many fresh process runs cold is the median of, 0 if it is the answer-producing call
+    cold_runs: int = 0
+    # medians of the separate parse and solve benchmarks, for bench format 2 submissions with them
+    parse_time: Optional[Picoseconds] = None
+    solve_time: Optional[Picoseconds] = None
+    # JSON of the measure lane the runs were timed in, when lanes are enabled
+    lane: Optional[str] = None
 
     @classmethod
     def from_builder_and_session(cls, b: BuildRunResult, session: SessionLabel) -> Self:
@@ -278,15 +1121,93 @@ class RunResult:
             high_bound=high_bound,
             low_bound=low_bound,
             from_session=session,
+            samples=b.samples,
+            counters=b.counters,
+            memory=b.memory,
+            cold=Picoseconds.from_nanos(b.cold) if b.cold is not None else None,
+            parse_time=Picoseconds.from_nanos(b.parse_time) if b.parse_time is not None else None,
+            solve_time=Picoseconds.from_nanos(b.solve_time) if b.solve_time is not None else None,
         )
 
+    def to_wire(self) -> dict[str, Any]:
+        """As JSON, for workers reporting their results to the bot."""
+
+        def picos(p: Optional[Picoseconds]) -> Optional[int]:
+            return p.as_picos() if p is not None else None
+
+        return {
+            "answer": self.answer,
+            "verified": self.verified,
+            "typical": picos(self.typical),
+            "average": picos(self.average),
+            "median": picos(self.median),
+            "high_bound": picos(self.high_bound),
+            "low_bound": picos(self.low_bound),
+            "from_session": self.from_session,
+            "samples": b64encode(pack_samples(self.samples)),
+            "attempts": self.attempts,
+            "noise_report": dataclasses.asdict(self.noise_report)
+            if self.noise_report is not None
+            else None,
+            "counters": dataclasses.asdict(self.counters) if self.counters is not None else None,
+            "memory": dataclasses.asdict(self.memory) if self.memory is not None else None,
+            "cold": picos(self.cold),
+            "cold_runs": self.cold_runs,
+            "parse_time": picos(self.parse_time),
+            "solve_time": picos(self.solve_time),
+            "lane": self.lane,
+        }
+
+    @classmethod
+    def from_wire(cls, wire: dict[str, Any]) -> Self:
+        def picos(v: Optional[int]) -> Optional[Picoseconds]:
+            return Picoseconds(int(v)) if v is not None else None
+
+        return cls(
+            answer=wire["answer"],
+            verified=bool(wire["verified"]),
+            typical=Picoseconds(int(wire["typical"])),
+            average=Picoseconds(int(wire["average"])),
+            median=Picoseconds(int(wire["median"])),
+            high_bound=Picoseconds(int(wire["high_bound"])),
+            low_bound=Picoseconds(int(wire["low_bound"])),
+            from_session=SessionLabel(wire["from_session"]),
+            samples=array("Q", unpack_samples(b64decode(wire["samples"]))),
+            attempts=int(wire["attempts"]),
+            noise_report=noise.NoiseReport(**wire["noise_report"])
+            if wire["noise_report"] is not None
+            else None,
+            counters=HardwareCounters(**wire["counters"]) if wire["counters"] is not None else None,
+            memory=MemoryUsage(**wire["memory"]) if wire["memory"] is not None else None,
+            cold=picos(wire["cold"]),
+            cold_runs=int(wire["cold_runs"]),
+            parse_time=picos(wire["parse_time"]),
+            solve_time=picos(wire["solve_time"]),
+            lane=wire["lane"],
+        )
+
+
+def benchmark_phase(blob: dict[str, Any], bench_format: int) -> str:
+    """
+    Which phase of a submission a criterion `benchmark-complete` message is for. Before bench
+    format 2 the harness only had the end to end `run` benchmark, since then its id is
+    `aoc_sub/<phase>` with phase one of run, parse or solve.
+    """
+    if bench_format < 2:
+        return "run"
+    return str(blob.get("id", "")).rpartition("/")[2]
+
 
 def process_run_result(
     in_file: SessionLabel,
     answers_map: dict[SessionLabel, str],
     result_lst: Optional[list[dict[str, Any]]],
-) -> Optional[RunResult]:
-    """Given JSON blobs extracted from a container's stdout, get the core stats out."""
+    bench_format: int = constants.SUPPORTED_BENCH_FORMAT,
+) -> Optional["RunResult"]:
+    """
+    Given JSON blobs extracted from a container's stdout, get the core stats out.
+    bench_format is the format of the harness that produced them.
+    """
     result = BuildRunResult(
         answer="",
         verified=False,
@@ -311,31 +1232,98 @@ def process_run_result(
                 result.verified = True
             else:
                 result.verified = False
+        elif reason == "benchmark-complete" and benchmark_phase(blob, bench_format) == "parse":
+            result.parse_time = blob["median"]["estimate"]
+        elif reason == "benchmark-complete" and benchmark_phase(blob, bench_format) == "solve":
+            result.solve_time = blob["median"]["estimate"]
         elif reason == "benchmark-complete":
             result.typical = blob["typical"]["estimate"]
             result.average = blob["mean"]["estimate"]
             result.median = blob["median"]["estimate"]
-            result.high_bound = blob["typical"]["upper_bound"]
-            result.low_bound = blob["typical"]["lower_bound"]
+            # the bounds of the median's confidence interval, the median is the ranked time
+            result.high_bound = blob["median"]["upper_bound"]
+            result.low_bound = blob["median"]["lower_bound"]
+            result.samples = samples_from_criterion(blob)
+        elif reason == "ferris-cold":
+            result.cold = blob["nanos"]
+        elif reason == "ferris-memory":
+            result.memory = MemoryUsage.from_record(blob)
+        elif reason == "ferris-counters":
+            result.counters = HardwareCounters.from_record(blob)
+            if result.counters is None:
+                logger.warning("Hardware counters unavailable: %s", blob.get("error"))
     logger.info("Computed run result: %s", result)
     return RunResult.from_builder_and_session(result, in_file)
 
 
+def samples_from_criterion(blob: dict[str, Any]) -> "array[int]":
+    """
+    Convert the raw measurements in a criterion `benchmark-complete` message into per-iteration
+    sample times in picoseconds. Criterion reports each sample as the total time taken for
+    `iteration_count` iterations, so each measurement is divided by its iteration count.
+    """
+    measured: list[float] = blob.get("measured_values") or []
+    iterations: list[float] = blob.get("iteration_count") or []
+    unit = blob.get("unit", "ns")
+
+    if unit != "ns" or len(measured) != len(iterations):
+        logger.warning("Unexpected criterion sample data (unit %s), not keeping samples", unit)
+        return array("Q")
+
+    return array(
+        "Q", (int(value * 1000 / count) for value, count in zip(measured, iterations) if count > 0)
+    )
+
+
 def get_best_times(
-    cur_year: Year, day: AdventDay
-) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    cur_year: Year,
+    day: AdventDay,
+    profile: Optional[BuildProfile] = None,
+    hardware_class: Optional[HardwareClass] = None,
+) -> tuple[list[RankedTime], list[RankedTime]]:
     """
     Get the current contents of the leaderboard for the given day. Results are returned as a
-    tuple of lists, first for Part 1, then for Part 2. Each list is of (user_id, formatted_time).
+    tuple of lists, first for Part 1, then for Part 2, each ranked by the configured ranking mode.
+    Only submissions built with profile if given, and measured on hardware_class if given,
+    otherwise on the class most users of the part measured on.
     """
 
     with Database() as db:
-        times1 = [(user, str(time)) for user, time in db.best_times(cur_year, day, 1)]
-        times2 = [(user, str(time)) for user, time in db.best_times(cur_year, day, 2)]
+        times1 = db.best_times(
+            cur_year, day, 1, build_profile=profile, hardware_class=hardware_class
+        )
+        times2 = db.best_times(
+            cur_year, day, 2, build_profile=profile, hardware_class=hardware_class
+        )
 
     return (times1, times2)
 
 
+def get_best_memory(
+    cur_year: Year, day: AdventDay
+) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """
+    Get the current contents of the memory leaderboard for the given day, as (user_id, peak bytes).
+    Results are returned as a tuple of lists, first for Part 1, then for Part 2.
+    """
+
+    with Database() as db:
+        return (db.best_memory(cur_year, day, 1), db.best_memory(cur_year, day, 2))
+
+
+def format_ranked_time(entry: RankedTime) -> str:
+    """
+    Format a leaderboard time, with the spread of its confidence interval if known,
+    and its cold start time if known and enabled.
+    """
+    formatted = f"**{entry.time}**"
+    if (spread := entry.spread) is not None:
+        formatted += f" ±{spread}"
+    if settings.leaderboard.show_cold and entry.cold is not None:
+        formatted += f" (cold {entry.cold})"
+    return formatted
+
+
 def invalidate_submission(submission_id: SubmissionId) -> Submission:
     """Mark a submission as invalid, and shouldn't be on the leaderboard."""
     with Database() as db:
@@ -0,0 +1,84 @@
+import re
+from typing import AbstractSet
+
+# written next to the workspace's Cargo.toml, mounted over it in the containers when present
+PRUNED_MANIFEST = "Cargo.pruned.toml"
+
+# used by benches/bench.rs itself, whatever the submission uses
+HARNESS_CRATES = frozenset({"libc"})
+
+# anything that can name a crate: `name::path`, `use name;`, `use name as other;`
+# and `extern crate name;`. Local modules and types match too, which only keeps a crate
+# that wasn't needed
+CRATE_PATH = re.compile(r"\b([A-Za-z_]\w*)\s*::")
+USE_CRATE = re.compile(r"\buse\s+(?:::)?([A-Za-z_]\w*)\s*(?:;|\bas\b)")
+EXTERN_CRATE = re.compile(r"\bextern\s+crate\s+([A-Za-z_]\w*)")
+
+SECTION = re.compile(r"^\s*\[\[?\s*([^\]]+?)\s*\]\]?\s*(?:#.*)?$")
+
+# rustc errors about a crate that isn't there: unresolved import, undeclared crate or
+# module, can't find crate
+MISSING_CRATE_ERRORS = ("E0432", "E0433", "E0463")
+
+
+def referenced_crates(code: str, /) -> set[str]:
+    """Every name the code could be referring to a crate by."""
+    return {
+        m.group(1)
+        for pattern in (CRATE_PATH, USE_CRATE, EXTERN_CRATE)
+        for m in pattern.finditer(code)
+    }
+
+
+def sections(manifest: str, /) -> list[tuple[str, list[str]]]:
+    """
+    Split a manifest into its tables, as the table name and its lines including the header.
+    Lines before the first header are under the name "".
+    """
+    res: list[tuple[str, list[str]]] = [("", [])]
+    for line in manifest.splitlines(keepends=True):
+        if (m := SECTION.match(line)) is not None:
+            res.append((m.group(1), []))
+        res[-1][1].append(line)
+    return res
+
+
+def dependency_names(manifest: str, /) -> set[str]:
+    return {
+        name.removeprefix("dependencies.")
+        for name, _ in sections(manifest)
+        if name.startswith("dependencies.")
+    }
+
+
+def prune(manifest: str, keep: AbstractSet[str], /) -> str:
+    """
+    The manifest with only the `[dependencies.<name>]` tables in keep, or used by the harness.
+    Each table is kept as is, with its version and features. Build dependencies are
+    dropped, the runner has no build script.
+    """
+    out: list[str] = []
+    for name, lines in sections(manifest):
+        if name.startswith(("build_dependencies.", "build-dependencies.")):
+            continue
+        if name.startswith("dependencies.") and (
+            name.removeprefix("dependencies.") not in keep | HARNESS_CRATES
+        ):
+            continue
+        out.extend(lines)
+    return "".join(out)
+
+
+def prune_for(manifest: str, code: str, /) -> str:
+    """The manifest with only the dependencies the code refers to."""
+    return prune(manifest, referenced_crates(code) & dependency_names(manifest))
+
+
+def needs_full_manifest(build_errors: str, /) -> bool:
+    """
+    Whether a failed build with the pruned manifest could succeed with the full one: the code
+    used a crate the scan missed, or cargo failed before rustc ran at all.
+    """
+    if any(f"error[{code}]" in build_errors for code in MISSING_CRATE_ERRORS):
+        return True
+    return "error[E" not in build_errors
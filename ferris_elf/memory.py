@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Self
+
+_UNITS = ("B", "KiB", "MiB", "GiB")
+
+
+def format_bytes(n: int) -> str:
+    """Format a byte count with a binary unit, e.g. 1536 -> 1.50 KiB."""
+    value = float(n)
+    for unit in _UNITS[:-1]:
+        if abs(value) < 1024:
+            return f"{n} {unit}" if unit == "B" else f"{value:.2f} {unit}"
+        value /= 1024
+    return f"{value:.2f} {_UNITS[-1]}"
+
+
+@dataclass(slots=True, frozen=True)
+class MemoryUsage:
+    """Heap usage of a single call of a submission, as counted by the runner's global allocator."""
+
+    # highest number of bytes allocated at the same time
+    peak_bytes: int
+    # sum of the sizes of every allocation, reallocations count their new size
+    total_bytes: int
+    allocations: int
+
+    @classmethod
+    def from_record(cls, blob: dict[str, Any]) -> Optional[Self]:
+        """Parse a `ferris-memory` record, None if it is malformed."""
+        try:
+            return cls(
+                max(int(blob["peak_bytes"]), 0),
+                int(blob["total_bytes"]),
+                int(blob["allocations"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def describe(self) -> str:
+        return (
+            f"Peak memory: **{format_bytes(self.peak_bytes)}** "
+            + f"({self.allocations} allocations, {format_bytes(self.total_bytes)} total)"
+        )
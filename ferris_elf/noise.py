@@ -0,0 +1,80 @@
+import statistics as stats
+from dataclasses import dataclass
+from typing import Optional, Self, Sequence
+
+from .config import settings
+from .picoseconds import Picoseconds
+
+
+@dataclass(slots=True, frozen=True)
+class NoisePolicy:
+    """Thresholds above which a benchmark run is considered too noisy to trust."""
+
+    # (upper_bound - lower_bound) / estimate of criterion's confidence interval
+    max_ci_width: float
+    # fraction of samples outside the tukey fences
+    max_outlier_ratio: float
+    # total number of times a single input may be measured, including the first run
+    max_attempts: int
+
+    @classmethod
+    def from_settings(cls) -> Self:
+        return cls(
+            max_ci_width=float(settings.noise.max_ci_width),
+            max_outlier_ratio=float(settings.noise.max_outlier_ratio),
+            max_attempts=int(settings.noise.max_attempts),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class NoiseReport:
+    """Summary of how noisy a single benchmark run was."""
+
+    ci_width: float
+    outlier_ratio: float
+    # variance of the per-iteration samples, in picoseconds squared
+    variance: Optional[float]
+
+    def is_noisy(self, policy: NoisePolicy) -> bool:
+        return self.ci_width > policy.max_ci_width or self.outlier_ratio > policy.max_outlier_ratio
+
+    def badness(self, policy: NoisePolicy) -> float:
+        """How far past the policy thresholds this run is, used to pick the best of several runs."""
+        return max(
+            self.ci_width / policy.max_ci_width if policy.max_ci_width > 0 else 0.0,
+            self.outlier_ratio / policy.max_outlier_ratio if policy.max_outlier_ratio > 0 else 0.0,
+        )
+
+
+def relative_ci_width(estimate: Picoseconds, low: Picoseconds, high: Picoseconds) -> float:
+    """The width of a confidence interval, relative to the estimate it surrounds."""
+    if estimate.as_picos() <= 0:
+        return 0.0
+    return (high.as_picos() - low.as_picos()) / estimate.as_picos()
+
+
+def outlier_ratio(samples: Sequence[int]) -> float:
+    """
+    Fraction of samples that fall outside the tukey fences (1.5 IQR past the quartiles),
+    this is the same classification criterion uses when it warns about mild outliers.
+    """
+    if len(samples) < 4:
+        return 0.0
+
+    q1, _, q3 = stats.quantiles(samples, n=4)
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    outliers = sum(1 for s in samples if s < low_fence or s > high_fence)
+    return outliers / len(samples)
+
+
+def assess(
+    estimate: Picoseconds, low: Picoseconds, high: Picoseconds, samples: Sequence[int]
+) -> NoiseReport:
+    """Build a NoiseReport from criterion's estimate, its confidence bounds and the raw samples."""
+    return NoiseReport(
+        ci_width=relative_ci_width(estimate, low, high),
+        outlier_ratio=outlier_ratio(samples),
+        variance=stats.variance(samples) if len(samples) >= 2 else None,
+    )
@@ -0,0 +1,74 @@
+import enum
+import shlex
+from typing import Iterable
+
+# the Dockerfile's RUSTFLAGS, which setting RUSTFLAGS for a profile replaces
+BASE_RUSTFLAGS = "-C target-cpu=native"
+
+# inside the container, under target/ so the build cache keeps them with the build
+PGO_RAW_DIR = "/app/target/pgo-raw"
+PGO_PROFILE = "/app/target/pgo.profdata"
+
+# the first bench format whose image ships the llvm-tools component, which PGO builds need
+PGO_BENCH_FORMAT = 3
+
+
+class BuildProfile(enum.StrEnum):
+    """How a submission is compiled, chosen when submitting and saved with it."""
+
+    # cargo's release profile, what every submission used to get
+    RELEASE = "release"
+    # fat link time optimization across every crate, in one codegen unit
+    LTO = "lto"
+    # LTO, optimized with a profile of the code running on the day's inputs
+    PGO = "pgo"
+
+    def describe(self) -> str:
+        return {
+            BuildProfile.RELEASE: "release",
+            BuildProfile.LTO: "release with fat LTO and 1 codegen unit",
+            BuildProfile.PGO: "release with fat LTO, 1 codegen unit and profile-guided optimization",
+        }[self]
+
+    def min_bench_format(self) -> int:
+        """The oldest bench format of a container version that can build this profile"""
+        return PGO_BENCH_FORMAT if self == BuildProfile.PGO else 1
+
+
+def cargo_env(profile: BuildProfile, /, *, training: bool = False) -> dict[str, str]:
+    """
+    Environment for every cargo command of a job built with profile, builds and runs alike,
+    or cargo rebuilds everything when the settings change between them. `training` is the
+    instrumented build of a PGO job, which collects the profile the final build uses.
+    """
+    if profile == BuildProfile.RELEASE:
+        return {}
+
+    # benchmarks are built with cargo's bench profile, which inherits these
+    env = {
+        "CARGO_PROFILE_RELEASE_LTO": "fat",
+        "CARGO_PROFILE_RELEASE_CODEGEN_UNITS": "1",
+    }
+    if profile == BuildProfile.PGO:
+        flag = f"-Cprofile-generate={PGO_RAW_DIR}" if training else f"-Cprofile-use={PGO_PROFILE}"
+        env["RUSTFLAGS"] = f"{BASE_RUSTFLAGS} {flag}"
+    return env
+
+
+def training_command(runs: Iterable[tuple[str, str]], /) -> list[str]:
+    """
+    The command running an instrumented build on each (input file, part) once and merging
+    the profiles of all runs into PGO_PROFILE. llvm-profdata comes with the llvm-tools rustup
+    component, matching the toolchain's LLVM.
+    """
+    script = [f"rm -rf {PGO_RAW_DIR}"]
+    for in_file, part in runs:
+        script.append(
+            f"FERRIS_ELF_INPUT_FILE_NAME={shlex.quote(in_file)} FERRIS_ELF_PART={shlex.quote(part)} "
+            + "cargo bench -q --bench bench"
+        )
+    script.append(
+        '"$(rustc --print sysroot)"/lib/rustlib/*/bin/llvm-profdata merge '
+        + f"-o {PGO_PROFILE} {PGO_RAW_DIR}"
+    )
+    return ["sh", "-ec", " && ".join(script)]
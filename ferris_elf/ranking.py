@@ -0,0 +1,91 @@
+import dataclasses
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Iterable, Optional, Self
+
+from .config import settings
+from .picoseconds import Picoseconds
+
+
+class RankingMode(StrEnum):
+    """How leaderboard entries are ordered and ranked."""
+
+    # order by the estimate alone, every entry gets its own rank
+    MEDIAN = "median"
+    # order by the estimate, entries whose confidence interval overlaps the interval of the
+    # first entry in their group share that entry's rank
+    TIES = "ties"
+    # order by the upper bound of the confidence interval, pessimistic but hard to game by
+    # resubmitting until a lucky run comes in
+    UPPER_BOUND = "upper_bound"
+
+    @classmethod
+    def from_settings(cls) -> Self:
+        return cls(settings.leaderboard.ranking)
+
+
+@dataclass(slots=True, frozen=True)
+class RankedTime:
+    """A single leaderboard entry, with its confidence bounds when they are known."""
+
+    user_id: int
+    time: Picoseconds
+    low_bound: Optional[Picoseconds]
+    high_bound: Optional[Picoseconds]
+    submission: int
+    # 1 based, entries that are tied share a rank
+    rank: int = 0
+    # first call in a fresh process, shown next to the time but never used for ranking
+    cold: Optional[Picoseconds] = None
+
+    @property
+    def spread(self) -> Optional[Picoseconds]:
+        """Half the width of the confidence interval, displayed as +- next to the time."""
+        if self.low_bound is None or self.high_bound is None:
+            return None
+        return Picoseconds.from_picos((self.high_bound.as_picos() - self.low_bound.as_picos()) / 2)
+
+    @property
+    def conservative_time(self) -> Picoseconds:
+        return self.high_bound if self.high_bound is not None else self.time
+
+    def overlaps(self, other: "RankedTime") -> bool:
+        """Whether the confidence intervals of two entries overlap, entries without one never do."""
+        if (
+            self.low_bound is None
+            or self.high_bound is None
+            or other.low_bound is None
+            or other.high_bound is None
+        ):
+            return False
+
+        return (
+            self.low_bound.as_picos() <= other.high_bound.as_picos()
+            and other.low_bound.as_picos() <= self.high_bound.as_picos()
+        )
+
+
+def rank_times(times: Iterable[RankedTime], mode: RankingMode) -> list[RankedTime]:
+    """Sort leaderboard entries and assign ranks according to the given mode."""
+
+    match mode:
+        case RankingMode.UPPER_BOUND:
+            ordered = sorted(times, key=lambda t: (t.conservative_time.as_picos(), t.submission))
+            return [
+                dataclasses.replace(t, time=t.conservative_time, rank=i)
+                for i, t in enumerate(ordered, start=1)
+            ]
+        case RankingMode.TIES:
+            ordered = sorted(times, key=lambda t: (t.time.as_picos(), t.submission))
+            out: list[RankedTime] = []
+            leader: Optional[RankedTime] = None
+            for i, t in enumerate(ordered, start=1):
+                if leader is not None and leader.overlaps(t):
+                    out.append(dataclasses.replace(t, rank=leader.rank))
+                else:
+                    leader = dataclasses.replace(t, rank=i)
+                    out.append(leader)
+            return out
+        case RankingMode.MEDIAN:
+            ordered = sorted(times, key=lambda t: (t.time.as_picos(), t.submission))
+            return [dataclasses.replace(t, rank=i) for i, t in enumerate(ordered, start=1)]
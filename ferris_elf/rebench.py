@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import logging
+from typing import Callable, Optional, Sequence
+
+from . import constants
+from . import lib
+from .config import settings
+from .hardware import local_hardware
+from .database import (
+    CampaignId,
+    ContainerTag,
+    ContainerVersionError,
+    Database,
+    RebenchJob,
+    RebenchJobId,
+    RebenchStatus,
+    Submission,
+    SubmissionFilter,
+)
+
+logger = logging.getLogger(__name__)
+
+# manual backfills run after the automatic leaderboard campaigns, which use the default of 100
+BACKFILL_PRIORITY = 200
+
+
+def ensure_version_campaign() -> None:
+    """
+    Queue a re-benchmark of the current year's leaderboard on the newest container version,
+    unless one was already created for it. Entries measured on that version already are skipped.
+    """
+    with Database() as db:
+        try:
+            version_id, container_tag = db.newest_container_version(
+                constants.SUPPORTED_BENCH_FORMAT
+            )
+        except ContainerVersionError:
+            # bg_update has not found any versions yet
+            return
+
+        if db.has_automatic_campaign(version_id):
+            return
+
+        year = lib.year()
+        submissions = db.best_run_submissions(year, exclude_version=version_id)
+        campaign = db.create_rebench_campaign(
+            version_id,
+            f"Leaderboard {year} on container version {container_tag}",
+            submissions,
+            automatic=True,
+        )
+
+    logger.info(
+        "Created re-benchmark campaign %s for %s leaderboard entries on container version %s",
+        campaign,
+        len(submissions),
+        container_tag,
+    )
+
+
+def queue_backfill(
+    f: SubmissionFilter,
+    /,
+    *,
+    container_tag: Optional[ContainerTag] = None,
+    priority: int = BACKFILL_PRIORITY,
+) -> tuple[CampaignId, int]:
+    """
+    Queue a re-benchmark of every submission matching the filter, on the given container version
+    or the newest one. Returns the new campaign and how many jobs it queued, submissions that
+    already have a pending job on that version are not queued twice.
+    """
+    with Database() as db:
+        if container_tag is None:
+            version_id, container_tag = db.newest_container_version(
+                constants.SUPPORTED_BENCH_FORMAT
+            )
+        else:
+            version_id = db.get_container_version(container_tag)
+
+        submissions = db.select_submissions(f)
+        campaign = db.create_rebench_campaign(
+            version_id,
+            f"Backfill of {f.describe()} on container version {container_tag}",
+            submissions,
+            priority=priority,
+            include_invalid=f.include_invalid,
+        )
+        progress = db.campaign_progress(campaign)
+        queued = progress.total if progress is not None else 0
+
+    logger.info(
+        "Created backfill campaign %s, %s of %s matching submissions queued",
+        campaign,
+        queued,
+        len(submissions),
+    )
+
+    return campaign, queued
+
+
+async def _build(job: RebenchJob, submission: Submission, tmpdir: str) -> bool:
+    lib.populate_tmp_dir(tmpdir, submission.code.encode("utf8"), submission.entrypoints)
+    inputs_dir, labels = lib.prepare_inputs(submission.year, submission.day)
+    return await lib.build_profiled(
+        job.container_tag,
+        "rebench",
+        submission.user_id,
+        tmpdir,
+        submission.build_profile,
+        inputs_dir,
+        labels,
+        (submission.part,),
+    )
+
+
+async def _measure(
+    job: RebenchJob, submission: Submission, tmpdir: str, should_yield: Callable[[], bool]
+) -> RebenchStatus:
+    """
+    Re-measure one built submission on the job's container version. The new runs are only saved
+    once every input was measured, so a job that yields to live submissions leaves nothing behind.
+    """
+    results: list[lib.RunResult] = []
+
+    with Database() as db:
+        answers_map = db.load_answers(submission.year, submission.day, submission.part)
+    inputs_dir, labels = lib.prepare_inputs(submission.year, submission.day)
+
+    for in_file in labels:
+        if should_yield():
+            return RebenchStatus.QUEUED
+
+        result = await lib.measure_input(
+            job.container_tag,
+            "rebench",
+            submission.user_id,
+            tmpdir,
+            in_file,
+            answers_map,
+            submission.part,
+            inputs_dir,
+            submission.build_profile,
+        )
+        if result is None:
+            return RebenchStatus.FAILED
+        results.append(result)
+
+    hardware = local_hardware()
+    with Database() as db:
+        db.supersede_runs(submission.id, job.container_version)
+        for res in results:
+            db.save_run_result(submission.id, res, job.container_version)
+        db.record_hardware(hardware.hardware_class(), hardware.describe())
+        db.adopt_bencher_version(
+            submission.id,
+            job.container_version,
+            constants.SUPPORTED_BENCH_FORMAT,
+            hardware_class=hardware.hardware_class(),
+        )
+
+    return RebenchStatus.DONE
+
+
+async def run_batch(
+    jobs: Sequence[RebenchJob], should_yield: Callable[[], bool]
+) -> dict[RebenchJobId, RebenchStatus]:
+    """
+    Run a batch of re-benchmark jobs. Every submission in the batch is built at the same time,
+    in the build lane without the bench lock, so live submissions arriving meanwhile measure
+    right away. Then they are measured one after another, each under the bench lock. Jobs that
+    yielded to live submissions come back as QUEUED and should be retried later.
+    """
+    statuses: dict[RebenchJobId, RebenchStatus] = {}
+    runnable: list[tuple[RebenchJob, Submission]] = []
+
+    with Database() as db:
+        for job in jobs:
+            submission = db.get_submission_by_id(job.submission)
+            if submission is None or not (submission.valid or job.include_invalid):
+                statuses[job.id] = RebenchStatus.SKIPPED
+            elif job.bench_format < submission.build_profile.min_bench_format():
+                logger.info(
+                    "Skipping re-benchmark job %s, container version %s can't build %s",
+                    job.id,
+                    job.container_tag,
+                    submission.build_profile,
+                )
+                statuses[job.id] = RebenchStatus.SKIPPED
+            else:
+                runnable.append((job, submission))
+
+    with contextlib.ExitStack() as stack:
+        tmpdirs = [
+            stack.enter_context(lib.job_tmp_dir(f"-ferris-elf-rebench-{job.id}"))
+            for job, _ in runnable
+        ]
+
+        built = await asyncio.gather(
+            *(_build(job, subm, tmpdir) for (job, subm), tmpdir in zip(runnable, tmpdirs)),
+            return_exceptions=True,
+        )
+
+        for (job, submission), tmpdir, ok in zip(runnable, tmpdirs, built):
+            if isinstance(ok, BaseException):
+                logger.error("Building re-benchmark job %s failed", job.id, exc_info=ok)
+            if ok is not True:
+                statuses[job.id] = RebenchStatus.FAILED
+                continue
+
+            try:
+                async with lib.bench_lock:
+                    # checked once the lock is ours, live submissions may have taken it first
+                    if should_yield():
+                        statuses[job.id] = RebenchStatus.QUEUED
+                        continue
+                    statuses[job.id] = await _measure(job, submission, tmpdir, should_yield)
+            except Exception:
+                logger.exception("Re-benchmark job %s failed", job.id)
+                statuses[job.id] = RebenchStatus.FAILED
+
+    return statuses
+
+
+async def rebench_worker(is_busy: Callable[[], bool]) -> None:
+    """
+    Background task working through queued re-benchmark jobs in batches of rebench.batch_size.
+    It only starts a batch while is_busy() is False, abandons the rest of a batch between inputs
+    as soon as it turns True, and waits rebench.throttle_seconds between batches, so live
+    submissions are never kept waiting.
+    """
+    with Database() as db:
+        if requeued := db.requeue_running_rebench_jobs():
+            logger.info("Re-queued %s interrupted re-benchmark jobs", requeued)
+
+    while True:
+        try:
+            ensure_version_campaign()
+
+            if is_busy() or lib.bench_lock.locked():
+                await asyncio.sleep(float(settings.rebench.idle_seconds))
+                continue
+
+            with Database() as db:
+                jobs = db.claim_rebench_jobs(int(settings.rebench.batch_size))
+
+            if not jobs:
+                await asyncio.sleep(float(settings.rebench.idle_seconds))
+                continue
+
+            logger.info(
+                "Re-benchmarking submissions %s",
+                ", ".join(f"{job.submission} on {job.container_tag}" for job in jobs),
+            )
+            try:
+                statuses = await run_batch(jobs, is_busy)
+            except Exception:
+                logger.exception("Re-benchmark batch failed")
+                statuses = {}
+
+            with Database() as db:
+                for job in jobs:
+                    db.finish_rebench_job(job.id, statuses.get(job.id, RebenchStatus.FAILED))
+                progress = [
+                    p
+                    for c in sorted({job.campaign for job in jobs})
+                    if (p := db.campaign_progress(c)) is not None
+                ]
+
+            for p in progress:
+                logger.info(
+                    "Re-benchmark campaign %s '%s' has %s/%s jobs left, %s failed",
+                    p.campaign,
+                    p.description,
+                    p.remaining,
+                    p.total,
+                    p.failed,
+                )
+        except Exception:
+            logger.exception("Unknown issue in re-benchmark worker.")
+
+        await asyncio.sleep(float(settings.rebench.throttle_seconds))
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Any, Iterable, Mapping, Optional
+
+import aiohttp
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+# image labels set by runner/Dockerfile, see .github/workflows/docker-image.yml
+BENCH_FORMAT_LABEL = "bench_format"
+RUSTC_VERSION_LABEL = "rustc_version"
+
+# a tag may point at a single-platform manifest or at an index of them
+ACCEPT_MANIFESTS = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+
+
+def next_page_url(response: aiohttp.ClientResponse) -> Optional[str]:
+    """The next page of a paginated listing, from its `Link: <...>; rel="next"` header."""
+    link = response.links.get("next")
+    if link is None:
+        return None
+    # usually relative to the registry, e.g. </v2/<repo>/tags/list?last=...&n=...>
+    return str(response.url.join(URL(link["url"])))
+
+
+async def list_tags(
+    session: aiohttp.ClientSession, repo_url: str, headers: Mapping[str, str], /
+) -> list[str]:
+    """Every tag of the repository at repo_url (`<api base>/<repo>`), across all pages."""
+    tags: list[str] = []
+    url: Optional[str] = f"{repo_url}/tags/list"
+
+    while url is not None:
+        async with session.get(url, headers=headers, raise_for_status=True) as response:
+            # a repository without tags may say null instead of []
+            tags.extend((await response.json())["tags"] or [])
+            url = next_page_url(response)
+
+    return tags
+
+
+async def get_json(
+    session: aiohttp.ClientSession, url: str, headers: Mapping[str, str], /
+) -> dict[str, Any]:
+    async with session.get(url, headers=headers, raise_for_status=True) as response:
+        # registries don't always send the json content type for blobs
+        rv: dict[str, Any] = await response.json(content_type=None)
+        return rv
+
+
+def pick_platform(index: dict[str, Any], /) -> Optional[str]:
+    """The digest of the linux/amd64 manifest in an image index, the bench host's platform."""
+    for entry in index.get("manifests", []):
+        platform = entry.get("platform", {})
+        if platform.get("os") == "linux" and platform.get("architecture") == "amd64":
+            digest: str = entry["digest"]
+            return digest
+    return None
+
+
+async def image_labels(
+    session: aiohttp.ClientSession, repo_url: str, tag: str, headers: Mapping[str, str], /
+) -> dict[str, str]:
+    """The labels of an image, read from its config blob without pulling any layers."""
+    headers = {**headers, "Accept": ACCEPT_MANIFESTS}
+    manifest = await get_json(session, f"{repo_url}/manifests/{tag}", headers)
+
+    if "manifests" in manifest:
+        digest = pick_platform(manifest)
+        if digest is None:
+            raise ValueError(f"No linux/amd64 image for tag {tag}")
+        manifest = await get_json(session, f"{repo_url}/manifests/{digest}", headers)
+
+    config = await get_json(session, f"{repo_url}/blobs/{manifest['config']['digest']}", headers)
+    labels: Optional[dict[str, str]] = config.get("config", {}).get("Labels")
+    return labels or {}
+
+
+async def labels_for_tags(
+    session: aiohttp.ClientSession,
+    repo_url: str,
+    tags: Iterable[str],
+    headers: Mapping[str, str],
+    /,
+) -> dict[str, dict[str, str] | BaseException]:
+    """
+    Fetch the labels of several tags at once. One failing tag doesn't stop the others, its
+    error is returned in place of its labels.
+    """
+    tags = list(tags)
+    results = await asyncio.gather(
+        *(image_labels(session, repo_url, tag, headers) for tag in tags), return_exceptions=True
+    )
+    return dict(zip(tags, results))
+
+
+def bench_format_of(tag: str, labels: Mapping[str, str], /) -> int:
+    """
+    The bench format of an image, from its label, or from its `<format>.<timestamp>` tag when
+    it has none.
+    """
+    if BENCH_FORMAT_LABEL in labels:
+        return int(labels[BENCH_FORMAT_LABEL])
+    if "." in tag:
+        return int(tag.split(".")[0])
+    return 1
+
+
+def rustc_version_of(labels: Mapping[str, str], /) -> Optional[str]:
+    """
+    The toolchain version from the label holding `rustc --version` output, such as
+    `rustc 1.83.0 (90b35a623 2024-11-26)`. None when the image has no such label.
+    """
+    parts = labels.get(RUSTC_VERSION_LABEL, "").split()
+    if len(parts) < 2 or parts[0] != "rustc":
+        return None
+    return parts[1]
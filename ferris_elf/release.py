@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+import logging
+import os
+from typing import cast
+from zoneinfo import ZoneInfo
+
+import aiohttp
+
+from . import constants, lib
+from .config import settings
+from .database import AdventDay, Database, SessionLabel, Year
+from .fetcher import RateLimiter, RetryPolicy, fetch_day, new_session
+
+logger = logging.getLogger(__name__)
+
+# puzzles unlock at midnight here
+AOC_TZ = ZoneInfo("America/New_York")
+
+
+def next_unlock(now: datetime.datetime) -> datetime.datetime:
+    """The first puzzle release after now, the next year's day 1 once the event is over."""
+    local = now.astimezone(AOC_TZ)
+    for day in range(1, constants.MAX_DAY + 1):
+        unlock = datetime.datetime(local.year, 12, day, tzinfo=AOC_TZ)
+        if unlock > local:
+            return unlock
+    return datetime.datetime(local.year + 1, 12, 1, tzinfo=AOC_TZ)
+
+
+async def fetch_missing_inputs(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    year: Year,
+    day: AdventDay,
+) -> bool:
+    """
+    Download and store the inputs of every token for a day, skipping the ones already stored,
+    and put them in the input cache. Returns whether every input is stored now.
+    """
+    with Database() as db:
+        stored = db.input_labels(year, day)
+    missing = {label: k for label, k in settings.aoc_auth.tokens.items() if label not in stored}
+    if not missing:
+        logger.info("All inputs for %s day %s are already stored", year, day)
+        return True
+
+    logger.info("Fetching %s inputs for %s day %s", len(missing), year, day)
+    fetched, failed = await fetch_day(
+        session, limiter, policy, year, day, missing, base_url=settings.aoc.base_url
+    )
+
+    # one transaction for the whole day
+    with Database() as db:
+        for label, content in fetched.items():
+            db.insert_input(SessionLabel(label), year, day, content)
+
+    for label, e in failed.items():
+        logger.error("Could not fetch input %s for %s day %s: %s", label, year, day, e)
+
+    if fetched:
+        # decompress them into the input cache now, rather than on the first submission
+        lib.prepare_inputs(year, day)
+
+    return not failed
+
+
+def example_code() -> bytes:
+    """The runner's example code, from the workspace template, which is made if it isn't yet."""
+    with open(os.path.join(lib.workspace_template(), "src", "code.rs"), "rb") as fp:
+        return fp.read()
+
+
+async def prewarm() -> None:
+    """
+    Get the newest container version ready for the rush after a release: make the workspace
+    template and build the runner's example code once, which pulls the image and brings the
+    toolchain and dependency sources into the page cache.
+    """
+    with Database() as db:
+        _, container_tag = db.newest_container_version(constants.SUPPORTED_BENCH_FORMAT)
+
+    # copying the template and reading from it would block the bot's event loop
+    example = await asyncio.get_running_loop().run_in_executor(None, example_code)
+
+    logger.info("Pre-warming container version %s", container_tag)
+    async with lib.bench_lock:
+        with lib.job_tmp_dir("-ferris-elf-prewarm") as tmpdir:
+            lib.populate_tmp_dir(tmpdir, example)
+            if not await lib.build_code(container_tag, "prewarm", 0, tmpdir):
+                logger.error("Pre-warm build on %s failed", container_tag)
+
+
+async def fetch_release(year: Year, day: AdventDay) -> None:
+    """Fetch the inputs of a day that just unlocked, retrying quickly until they are there."""
+    policy = RetryPolicy(
+        max_attempts=int(settings.release.fetch_attempts),
+        base_delay=0.5,
+        max_delay=5,
+        # our clock may be a little ahead of adventofcode.com's
+        retry_statuses=RetryPolicy().retry_statuses | {404},
+    )
+    limiter = RateLimiter(float(settings.fetch.min_interval_seconds))
+
+    async with new_session(float(settings.fetch.timeout_seconds)) as session:
+        if not await fetch_missing_inputs(session, limiter, policy, year, day):
+            logger.error("Some inputs for %s day %s are missing after release", year, day)
+
+
+async def release_worker() -> None:
+    """
+    Background task that pre-warms caches release.prewarm_minutes before each puzzle unlocks,
+    and fetches the inputs right as it does, so the first submissions don't wait on either.
+    """
+    lead = datetime.timedelta(minutes=float(settings.release.prewarm_minutes))
+
+    while True:
+        unlock = next_unlock(datetime.datetime.now(tz=AOC_TZ))
+        year, day = Year(unlock.year), cast(AdventDay, unlock.day)
+        try:
+            logger.info("Next puzzle unlocks at %s", unlock)
+            await sleep_until(unlock - lead)
+            await prewarm()
+        except Exception:
+            logger.exception("Unknown issue while pre-warming for day %s.", day)
+
+        try:
+            await sleep_until(unlock)
+            await fetch_release(year, day)
+        except Exception:
+            logger.exception("Unknown issue while fetching the inputs for day %s.", day)
+
+
+async def sleep_until(when: datetime.datetime) -> None:
+    delay = (when - datetime.datetime.now(tz=AOC_TZ)).total_seconds()
+    if delay > 0:
+        await asyncio.sleep(delay)
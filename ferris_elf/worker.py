@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+from typing import Any
+
+import aiohttp
+from dynaconf import ValidationError
+
+from . import lib
+from .config import settings
+from .containers import lanes
+from .dispatch import claim_job, job_api_session, report_outcome, send_heartbeat
+from .hardware import local_hardware
+
+logger = logging.getLogger(__name__)
+
+# pause after the bot couldn't be reached before trying again
+RETRY_SECONDS = 5
+# how often a worker tells the bot it's still running a job, and learns it was cancelled
+HEARTBEAT_SECONDS = 10
+
+
+async def keep_lease(
+    session: aiohttp.ClientSession, name: str, job_id: int, running: "asyncio.Task[Any]", /
+) -> bool:
+    """
+    Wait for a running job, sending the bot a heartbeat every HEARTBEAT_SECONDS so its lease
+    doesn't expire. Cancels the job and returns False once the bot doesn't want it anymore,
+    e.g. after /cancel.
+    """
+    while True:
+        done, _ = await asyncio.wait([running], timeout=HEARTBEAT_SECONDS)
+        if done:
+            return True
+
+        try:
+            wanted = await send_heartbeat(session, name, job_id)
+        except aiohttp.ClientError:
+            # keep going, the outcome may still be wanted once the bot is back
+            logger.exception("Could not reach the bot about job %s", job_id)
+            continue
+        if not wanted:
+            running.cancel()
+            # cancelling removes its containers
+            await asyncio.wait([running])
+            return False
+
+
+async def work(server: str, token: str, name: str, /) -> None:
+    """Claim jobs from the bot at server and run them, one at a time, forever."""
+    hardware = local_hardware()
+    logger.info("Worker %s on %s, class %s", name, hardware.describe(), hardware.hardware_class())
+
+    async with job_api_session(server, token) as session:
+        while True:
+            try:
+                claimed = await claim_job(
+                    session, name, hardware, float(settings.workers.poll_seconds)
+                )
+                if claimed is None:
+                    continue
+                job_id, job = claimed
+                logger.info(
+                    "Running job %s for %s: %s day %s parts %s",
+                    job_id,
+                    job.user_name,
+                    job.year,
+                    job.day,
+                    job.parts,
+                )
+
+                try:
+                    inputs_dir, labels = lib.stage_inputs(job, name)
+                    running = asyncio.create_task(lib.run_job(job, inputs_dir, labels))
+                    if not await keep_lease(session, name, job_id, running):
+                        logger.warning("The bot dropped job %s, cancelled it", job_id)
+                        continue
+                    outcome = running.result().to_wire()
+                except Exception as e:
+                    logger.exception("Job %s failed", job_id)
+                    outcome = {"error": repr(e)}
+
+                if not await report_outcome(session, name, job_id, outcome):
+                    logger.warning("The bot no longer wanted job %s", job_id)
+            except aiohttp.ClientError:
+                logger.exception("Could not reach the bot at %s", server)
+                await asyncio.sleep(RETRY_SECONDS)
+
+
+def main() -> None:
+    logformat = "%(asctime)s:%(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(
+        encoding="utf-8", level=logging.INFO, datefmt="%a, %d %b %Y %H:%M:%S %z", format=logformat
+    )
+
+    parser = argparse.ArgumentParser("ferris-elf-worker")
+    parser.add_argument(
+        "--name",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="how the bot refers to this worker, unique among them",
+    )
+    parser.add_argument("--server", help="the bot's job API, defaults to workers.server")
+    parsed = parser.parse_args()
+
+    try:
+        settings.validators.validate()
+    except ValidationError:
+        logger.exception("Invalid config. Workers need the bot's settings and secrets files.")
+        sys.exit(1)
+    if not settings.workers.get("token"):
+        logger.error("No workers.token in the secrets file, the bot would reject every claim.")
+        sys.exit(1)
+
+    try:
+        lanes()
+    except ValueError:
+        logger.exception("Invalid lanes config.")
+        sys.exit(1)
+
+    asyncio.run(work(parsed.server or settings.workers.server, settings.workers.token, parsed.name))
@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# directories that containers or jobs write to, these are copied into each workspace.
+# Everything else is hardlinked, and is only ever mounted read-only, so no job can change
+# the template for the jobs after it.
+WRITABLE_DIRS = ("inputs", "target")
+
+
+def runner_digest(runner_dir: str, /) -> str:
+    """A hash of the names and contents of every file in the runner."""
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(runner_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, runner_dir).encode() + b"\0")
+            with open(path, "rb") as fp:
+                digest.update(hashlib.sha256(fp.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def prepare_template(runner_dir: str, workspace_dir: str, /) -> str:
+    """
+    Copy the runner into a template in workspace_dir named after its contents, returns its path.
+    A template is never changed once made, it is copied in a temp dir and renamed into place,
+    so jobs linking from it never see it half made, whichever process they are in. Templates of
+    older runners stay for processes that still use them.
+    """
+    template_dir = os.path.join(workspace_dir, f"template-{runner_digest(runner_dir)}")
+    if os.path.isdir(template_dir):
+        return template_dir
+
+    os.makedirs(workspace_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".template-", dir=workspace_dir)
+    try:
+        shutil.copytree(runner_dir, tmp_dir, dirs_exist_ok=True)
+        os.rename(tmp_dir, template_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # the rename fails if another process made the same template first
+        if not os.path.isdir(template_dir):
+            raise
+    return template_dir
+
+
+def instantiate(template_dir: str, dest: str, /) -> bool:
+    """
+    Fill dest with a workspace made from the template, hardlinking the files outside of
+    WRITABLE_DIRS. Falls back to copying when dest is on another filesystem.
+    Returns whether the files were linked.
+    """
+    linked = True
+    for dirpath, dirnames, filenames in os.walk(template_dir):
+        rel = os.path.relpath(dirpath, template_dir)
+        os.makedirs(os.path.join(dest, rel), exist_ok=True)
+
+        if rel == ".":
+            for name in WRITABLE_DIRS:
+                if name in dirnames:
+                    dirnames.remove(name)
+                    shutil.copytree(
+                        os.path.join(template_dir, name),
+                        os.path.join(dest, name),
+                        dirs_exist_ok=True,
+                    )
+
+        for name in filenames:
+            src, dst = os.path.join(dirpath, name), os.path.join(dest, rel, name)
+            if linked:
+                try:
+                    os.link(src, dst)
+                    continue
+                except OSError:
+                    logger.warning("Can't hardlink workspace files to %s, copying them", dest)
+                    linked = False
+            shutil.copy2(src, dst)
+
+    return linked
+
+
+def write_file(path: str, data: bytes, /) -> None:
+    """
+    Write a file in a workspace. The file is replaced rather than written to, it may be
+    linked to the template.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as fp:
+        fp.write(data)
@@ -1,37 +1,37 @@
 # NOTE: this is called in ops/systemd/ferris-elf-fetch.service
 # any changes to the CLI api should be reflected there
 
+import asyncio
 import logging
 import argparse
+import sys
 from typing import cast
 
-import requests
-
 from ferris_elf import lib
 from ferris_elf.config import settings
 from ferris_elf.lib import today
-from ferris_elf.database import AdventDay, Database, Year
-
-keys = settings.aoc_auth.tokens
-
+from ferris_elf.database import AdventDay, Year
+from ferris_elf.fetcher import RateLimiter, RetryPolicy, new_session
+from ferris_elf.release import fetch_missing_inputs
 
 logger = logging.getLogger(__name__)
 
 
-def get(year: Year, day: AdventDay) -> None:
-    logger.info("Fetching input for day %s", day)
+async def get(days: list[tuple[Year, AdventDay]]) -> bool:
+    """
+    Download and store the inputs of every token for each day, skipping the ones already
+    stored. Returns whether every input is stored now.
+    """
+    limiter = RateLimiter(float(settings.fetch.min_interval_seconds))
+    policy = RetryPolicy(max_attempts=int(settings.fetch.max_attempts))
+    complete = True
 
-    for label, k in keys.items():
-        r = requests.get(
-            f"https://adventofcode.com/{year}/day/{day}/input", cookies=dict(session=k)
-        )
-        r.raise_for_status()
+    async with new_session(float(settings.fetch.timeout_seconds)) as session:
+        for year, day in days:
+            if not await fetch_missing_inputs(session, limiter, policy, year, day):
+                complete = False
 
-        # require utf8 response
-        content = r.content.decode("utf8")
-
-        with Database() as db:
-            db.insert_input(label, year, day, content)
+    return complete
 
 
 def split_yd(data: str) -> tuple[Year, AdventDay]:
@@ -50,21 +50,51 @@ def split_yd(data: str) -> tuple[Year, AdventDay]:
     return cast(tuple[Year, AdventDay], yd)
 
 
+def split_range(data: str) -> list[tuple[Year, AdventDay]]:
+    """
+    Parse `year` (every day released so far) or `year:first-last` into the days it covers.
+    """
+    year_s, _, days = data.partition(":")
+    year = Year(int(year_s))
+
+    if days:
+        first_s, _, last_s = days.partition("-")
+        first, last = int(first_s), int(last_s or first_s)
+    elif year == lib.year():
+        first, last = 1, today()
+    else:
+        first, last = 1, 25
+
+    assert 1 <= first <= last <= 25, "days not within valid range (1..=25)"
+
+    # SAFETY: just asserted above that every day is in valid range
+    return [(year, cast(AdventDay, d)) for d in range(first, last + 1)]
+
+
 if __name__ == "__main__":
     logging.basicConfig(encoding="utf-8", level=logging.INFO)
 
     parser = argparse.ArgumentParser("aoc-fetch")
-    parser.add_argument(
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
         "--download",
         "-d",
         const=str(today()),
         nargs="?",
-        required=True,
         help="download all inputs for a given day, defaults to current year and day, pass day or year:day to override",
     )
+    group.add_argument(
+        "--backfill",
+        "-b",
+        help="download all inputs for a year, or a range of its days with year:first-last",
+    )
 
     parsed = parser.parse_args()
 
-    year, day = split_yd(parsed.download)
+    if parsed.backfill is not None:
+        days = split_range(parsed.backfill)
+    else:
+        days = [split_yd(parsed.download)]
 
-    get(year, day)
+    if not asyncio.run(get(days)):
+        sys.exit(1)
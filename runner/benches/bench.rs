@@ -1,23 +1,300 @@
 use std::fs;
 use std::env;
+use std::time::Instant;
 use criterion::{black_box, criterion_group, criterion_main, Criterion};
-use ferris_elf::code;
+use ferris_elf::parts;
 use pprof::criterion::{Output, PProfProfiler};
 
+/// Measure one solution function of the submission as the `aoc_sub/run` benchmark.
+/// A macro rather than a generic fn, so `input.as_ref()` still infers whether it takes &str or &[u8]
+macro_rules! bench_solution {
+    ($group:expr, $input:expr, $cold_only:expr, $run:path) => {{
+        // the first call is timed on its own, before anything else warms caches or the allocator
+        let start = Instant::now();
+        let answer = black_box($run(black_box($input.as_ref())));
+        let cold = start.elapsed();
+        println!(r#"{{"reason": "ferris-answer", "answer":"{}" }}"#, answer);
+        println!(r#"{{"reason": "ferris-cold", "nanos": {} }}"#, cold.as_nanos());
+
+        if $cold_only {
+            std::process::exit(0);
+        }
+
+        // heap usage of a single call, counted separately so counting never skews the cold time
+        memory::measure(|| {
+            black_box($run(black_box($input.as_ref())));
+        });
+
+        // optional hardware counter pass, done before criterion starts so it never overlaps the timing
+        if let Some(iterations) = env::var("FERRIS_ELF_PERF_COUNTERS").ok().and_then(|v| v.parse().ok()) {
+            counters::report(iterations, || {
+                black_box($run(black_box($input.as_ref())));
+            });
+        }
+
+        $group.bench_function("run", |b| b.iter(|| $run(black_box($input.as_ref()))));
+    }};
+}
+
 //note that criterion does not allow setting hard limits on bench time
 //we have to enforce time limits outside - see the ./run_bench.sh script
 pub fn all(c: &mut Criterion) {
     let file_name: String = env::var("FERRIS_ELF_INPUT_FILE_NAME").unwrap_or("/app/inputs/input1.txt".to_owned());
+    // fresh process runs that only time the first call, see ferris_elf/lib.py::cold_runs
+    let cold_only = env::var("FERRIS_ELF_COLD_ONLY").is_ok();
+    if cold_only {
+        evict_from_page_cache(&file_name);
+    }
     let input = fs::read_to_string(&file_name).expect(&format!("Failed to read file: {}", (&file_name)));
     let mut group = c.benchmark_group("aoc_sub");
 
-    let answer = code::run(input.as_ref());
-    println!(r#"{{"reason": "ferris-answer", "answer":"{}" }}"#, answer);
-
-    group.bench_function("run", |b| b.iter(|| code::run(black_box(input.as_ref()))));
+    // submissions covering both parts are built once and run once per part,
+    // see ferris_elf/entrypoints.py::parts_shim
+    match env::var("FERRIS_ELF_PART").as_deref() {
+        Ok("1") => bench_solution!(group, input, cold_only, parts::part1),
+        Ok("2") => bench_solution!(group, input, cold_only, parts::part2),
+        _ => bench_solution!(group, input, cold_only, parts::run),
+    }
+    // separate `parse` and `solve` benchmarks, if the submission has them (bench format 2)
+    ferris_elf::bench_phases!(group, input.as_str());
     group.finish();
 }
 
+/// Drop the input file from the page cache, so a cold run reads it from disk again.
+/// Unlike drop_caches this works without privileges, failures only make the run less cold.
+fn evict_from_page_cache(file_name: &str) {
+    use std::os::unix::io::AsRawFd;
+
+    if let Ok(file) = fs::File::open(file_name) {
+        unsafe {
+            libc::posix_fadvise(file.as_raw_fd(), 0, 0, libc::POSIX_FADV_DONTNEED);
+        }
+    }
+}
+
+/// Global allocator that counts heap usage, but only while `measure` is running,
+/// outside of that every call is a single relaxed load on top of the system allocator
+mod memory {
+    use std::alloc::{GlobalAlloc, Layout, System};
+    use std::sync::atomic::{AtomicBool, AtomicIsize, AtomicUsize, Ordering::Relaxed};
+
+    pub struct Counting;
+
+    static ENABLED: AtomicBool = AtomicBool::new(false);
+    // signed, memory allocated before measuring may be freed while measuring
+    static CURRENT: AtomicIsize = AtomicIsize::new(0);
+    static PEAK: AtomicIsize = AtomicIsize::new(0);
+    static TOTAL: AtomicUsize = AtomicUsize::new(0);
+    static COUNT: AtomicUsize = AtomicUsize::new(0);
+
+    fn record_alloc(size: usize) {
+        COUNT.fetch_add(1, Relaxed);
+        TOTAL.fetch_add(size, Relaxed);
+        let current = CURRENT.fetch_add(size as isize, Relaxed) + size as isize;
+        PEAK.fetch_max(current, Relaxed);
+    }
+
+    fn record_dealloc(size: usize) {
+        CURRENT.fetch_sub(size as isize, Relaxed);
+    }
+
+    unsafe impl GlobalAlloc for Counting {
+        unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+            let ptr = System.alloc(layout);
+            if !ptr.is_null() && ENABLED.load(Relaxed) {
+                record_alloc(layout.size());
+            }
+            ptr
+        }
+
+        unsafe fn alloc_zeroed(&self, layout: Layout) -> *mut u8 {
+            let ptr = System.alloc_zeroed(layout);
+            if !ptr.is_null() && ENABLED.load(Relaxed) {
+                record_alloc(layout.size());
+            }
+            ptr
+        }
+
+        unsafe fn dealloc(&self, ptr: *mut u8, layout: Layout) {
+            System.dealloc(ptr, layout);
+            if ENABLED.load(Relaxed) {
+                record_dealloc(layout.size());
+            }
+        }
+
+        unsafe fn realloc(&self, ptr: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+            let new_ptr = System.realloc(ptr, layout, new_size);
+            if !new_ptr.is_null() && ENABLED.load(Relaxed) {
+                record_dealloc(layout.size());
+                record_alloc(new_size);
+            }
+            new_ptr
+        }
+    }
+
+    /// Call f with heap counting enabled and print its usage as a `ferris-memory` record.
+    pub fn measure<T>(f: impl FnOnce() -> T) -> T {
+        CURRENT.store(0, Relaxed);
+        PEAK.store(0, Relaxed);
+        TOTAL.store(0, Relaxed);
+        COUNT.store(0, Relaxed);
+
+        ENABLED.store(true, Relaxed);
+        let out = f();
+        ENABLED.store(false, Relaxed);
+
+        println!(
+            r#"{{"reason": "ferris-memory", "peak_bytes": {}, "total_bytes": {}, "allocations": {} }}"#,
+            PEAK.load(Relaxed),
+            TOTAL.load(Relaxed),
+            COUNT.load(Relaxed)
+        );
+        out
+    }
+}
+
+#[global_allocator]
+static ALLOCATOR: memory::Counting = memory::Counting;
+
+/// Hardware performance counters through perf_event_open(2), counting user space only
+/// so it works with the default perf_event_paranoid of 2
+mod counters {
+    use std::io;
+
+    // the first fields of struct perf_event_attr, which is all PERF_ATTR_SIZE_VER0 requires
+    #[repr(C)]
+    #[derive(Default)]
+    struct PerfEventAttr {
+        kind: u32,
+        size: u32,
+        config: u64,
+        sample_period: u64,
+        sample_type: u64,
+        read_format: u64,
+        flags: u64,
+        wakeup_events: u32,
+        bp_type: u32,
+        config1: u64,
+    }
+
+    const PERF_TYPE_HARDWARE: u32 = 0;
+    const PERF_TYPE_HW_CACHE: u32 = 3;
+
+    const FLAG_DISABLED: u64 = 1 << 0;
+    const FLAG_EXCLUDE_KERNEL: u64 = 1 << 5;
+    const FLAG_EXCLUDE_HV: u64 = 1 << 6;
+
+    const IOC_ENABLE: u64 = 0x2400;
+    const IOC_DISABLE: u64 = 0x2401;
+    const IOC_RESET: u64 = 0x2403;
+
+    // cache id | (op << 8) | (result << 16), op 0 is read, result 1 is miss
+    const L1D_READ_MISS: u64 = 0 | (0 << 8) | (1 << 16);
+    const LL_READ_MISS: u64 = 2 | (0 << 8) | (1 << 16);
+
+    // must match COUNTER_NAMES in ferris_elf/counters.py
+    const EVENTS: [(&str, u32, u64); 5] = [
+        ("instructions", PERF_TYPE_HARDWARE, 1),
+        ("cycles", PERF_TYPE_HARDWARE, 0),
+        ("branch_misses", PERF_TYPE_HARDWARE, 5),
+        ("l1d_misses", PERF_TYPE_HW_CACHE, L1D_READ_MISS),
+        ("llc_misses", PERF_TYPE_HW_CACHE, LL_READ_MISS),
+    ];
+
+    struct Counter {
+        fd: libc::c_int,
+    }
+
+    impl Counter {
+        fn open(kind: u32, config: u64) -> io::Result<Self> {
+            let attr = PerfEventAttr {
+                kind,
+                size: std::mem::size_of::<PerfEventAttr>() as u32,
+                config,
+                flags: FLAG_DISABLED | FLAG_EXCLUDE_KERNEL | FLAG_EXCLUDE_HV,
+                ..Default::default()
+            };
+            // this thread, on any cpu, no group, no flags
+            let fd = unsafe {
+                libc::syscall(libc::SYS_perf_event_open, &attr as *const PerfEventAttr, 0, -1, -1, 0)
+            };
+            if fd < 0 {
+                return Err(io::Error::last_os_error());
+            }
+            Ok(Counter { fd: fd as libc::c_int })
+        }
+
+        fn ioctl(&self, request: u64) {
+            unsafe {
+                libc::ioctl(self.fd, request as _, 0);
+            }
+        }
+
+        fn read(&self) -> Option<u64> {
+            let mut value = 0u64;
+            let n = unsafe { libc::read(self.fd, &mut value as *mut u64 as *mut libc::c_void, 8) };
+            (n == 8).then_some(value)
+        }
+    }
+
+    impl Drop for Counter {
+        fn drop(&mut self) {
+            unsafe {
+                libc::close(self.fd);
+            }
+        }
+    }
+
+    /// Count the events over `iterations` calls of f and print them as a `ferris-counters` record.
+    /// Events the host does not support are reported as null.
+    pub fn report(iterations: u64, mut f: impl FnMut()) {
+        let mut error = None;
+        let counters: Vec<Option<Counter>> = EVENTS
+            .iter()
+            .map(|&(_, kind, config)| {
+                Counter::open(kind, config)
+                    .map_err(|e| error = Some(e.to_string()))
+                    .ok()
+            })
+            .collect();
+
+        if counters.iter().all(Option::is_none) {
+            println!(
+                r#"{{"reason": "ferris-counters", "error": "{}" }}"#,
+                error.unwrap_or_default().replace('"', "'")
+            );
+            return;
+        }
+
+        for c in counters.iter().flatten() {
+            c.ioctl(IOC_RESET);
+            c.ioctl(IOC_ENABLE);
+        }
+        for _ in 0..iterations {
+            f();
+        }
+        for c in counters.iter().flatten() {
+            c.ioctl(IOC_DISABLE);
+        }
+
+        let fields: Vec<String> = EVENTS
+            .iter()
+            .zip(&counters)
+            .map(|(&(name, _, _), c)| match c.as_ref().and_then(Counter::read) {
+                Some(v) => format!(r#""{}": {}"#, name, v),
+                None => format!(r#""{}": null"#, name),
+            })
+            .collect();
+        println!(
+            r#"{{"reason": "ferris-counters", "iterations": {}, {} }}"#,
+            iterations,
+            fields.join(", ")
+        );
+    }
+}
+
+// criterion only starts the profiler when run with --profile-time, which the bot does in a
+// separate run after the timed one, so sampling never perturbs the measurement
 criterion_group!(
     name=benches;
     config=Criterion::default().with_profiler(PProfProfiler::new(100, Output::Flamegraph(None)));
@@ -0,0 +1,34 @@
+// Calibration workload: breadth first search across a grid maze.
+// Exercises branchy code and queue/visited bookkeeping. Do not change this file,
+// calibration results are only comparable while the workload stays the same.
+use std::collections::VecDeque;
+use std::fmt::Display;
+
+pub fn run(input: &str) -> impl Display {
+    let grid: Vec<&[u8]> = input.lines().map(|l| l.as_bytes()).collect();
+    let height = grid.len();
+    let width = grid[0].len();
+
+    let mut dist = vec![u32::MAX; width * height];
+    let mut queue = VecDeque::new();
+    dist[0] = 0;
+    queue.push_back((0usize, 0usize));
+
+    while let Some((x, y)) = queue.pop_front() {
+        let d = dist[y * width + x];
+        let neighbours = [
+            (x.wrapping_sub(1), y),
+            (x + 1, y),
+            (x, y.wrapping_sub(1)),
+            (x, y + 1),
+        ];
+        for (nx, ny) in neighbours {
+            if nx < width && ny < height && grid[ny][nx] != b'#' && dist[ny * width + nx] == u32::MAX {
+                dist[ny * width + nx] = d + 1;
+                queue.push_back((nx, ny));
+            }
+        }
+    }
+
+    dist.iter().filter(|&&d| d != u32::MAX).map(|&d| d as u64).sum::<u64>()
+}
@@ -0,0 +1,16 @@
+// Calibration workload: parse a list of integers, sort it, and fold the gaps.
+// Exercises parsing, allocation and a cache-unfriendly sort. Do not change this file,
+// calibration results are only comparable while the workload stays the same.
+use std::fmt::Display;
+
+pub fn run(input: &str) -> impl Display {
+    let mut nums: Vec<u64> = input
+        .lines()
+        .filter(|l| !l.is_empty())
+        .map(|l| l.parse().unwrap())
+        .collect();
+    nums.sort_unstable();
+    nums.windows(2)
+        .map(|w| (w[1] - w[0]) % 1_000_003)
+        .fold(0u64, |acc, gap| acc.wrapping_mul(31).wrapping_add(gap))
+}
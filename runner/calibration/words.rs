@@ -0,0 +1,15 @@
+// Calibration workload: count word frequencies with a HashMap.
+// Exercises hashing, string handling and small allocations. Do not change this file,
+// calibration results are only comparable while the workload stays the same.
+use std::collections::HashMap;
+use std::fmt::Display;
+
+pub fn run(input: &str) -> impl Display {
+    let mut counts: HashMap<&str, u32> = HashMap::new();
+    for word in input.split_ascii_whitespace() {
+        *counts.entry(word).or_insert(0) += 1;
+    }
+    let mut top: Vec<(&str, u32)> = counts.into_iter().collect();
+    top.sort_unstable_by(|a, b| b.1.cmp(&a.1).then(a.0.cmp(b.0)));
+    top.iter().take(10).map(|(_, c)| *c as u64).sum::<u64>()
+}
@@ -1 +1,3 @@
 pub mod code;
+pub mod parts;
+mod phases;
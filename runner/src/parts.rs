@@ -0,0 +1,6 @@
+// The solution functions the benchmark calls for each part. The bot overwrites this file with
+// ferris_elf/entrypoints.py::parts_shim for submissions made with submit_both, this default is
+// for the ones that only export `run`, which is then benchmarked whichever part is asked for.
+pub use crate::code::run;
+pub use crate::code::run as part1;
+pub use crate::code::run as part2;
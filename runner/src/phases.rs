@@ -0,0 +1,9 @@
+// Bench format 2: submissions made with the phases option get their `parse` and `solve`
+// benchmarked separately. The bot overwrites this file with ferris_elf/entrypoints.py::PHASES_MACRO
+// for those submissions, this default is for the ones that only export `run`.
+
+/// Benchmark the parse and solve phases of the submission into a criterion benchmark group
+#[macro_export]
+macro_rules! bench_phases {
+    ($group:expr, $input:expr) => {};
+}
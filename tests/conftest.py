@@ -0,0 +1,78 @@
+import os.path
+import sqlite3
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+import pytest
+
+from ferris_elf.database import (
+    BenchRunId,
+    ContainerTag,
+    ContainerVersionId,
+    Database,
+    SessionLabel,
+    SubmissionId,
+    Year,
+)
+from ferris_elf.picoseconds import Picoseconds
+
+SCHEMA = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+
+
+@pytest.fixture
+def db() -> Iterator[Database]:
+    """A Database on a fresh in-memory copy of db/schema.sql."""
+    con = sqlite3.connect(":memory:")
+    with open(SCHEMA) as fp:
+        con.executescript(fp.read())
+    con.execute("PRAGMA foreign_keys = ON")
+    Database.connection = con
+    try:
+        with Database() as database:
+            yield database
+    finally:
+        Database.connection = None
+        con.close()
+
+
+class StubContext:
+    """Stands in for a command's discord context, keeps the replies."""
+
+    def __init__(self) -> None:
+        self.author = SimpleNamespace(name="someone", id=1)
+        self.replies: list[str] = []
+
+    async def reply(self, content: str, **kwargs: Any) -> None:
+        self.replies.append(content)
+
+
+def add_version(db: Database, tag: str, /, *, pulled: bool = True) -> ContainerVersionId:
+    return db.insert_container_version("1.74.0", ContainerTag(tag), b"", pulled=pulled)
+
+
+def add_submission(
+    db: Database, user_id: int, version: ContainerVersionId, /, *, day: int = 1, part: int = 1
+) -> SubmissionId:
+    """A submission for 2023, with inputs a, b and c stored for its day."""
+    for label in ("a", "b", "c"):
+        db.insert_input(SessionLabel(label), Year(2023), day, label)  # type: ignore[arg-type]
+    return db.save_submission(user_id, Year(2023), day, part, b"fn run() {}", version, 1)  # type: ignore[arg-type]
+
+
+def add_run(
+    db: Database,
+    submission: SubmissionId,
+    label: str,
+    nanos: int,
+    /,
+    *,
+    version: Optional[ContainerVersionId] = None,
+) -> BenchRunId:
+    run_id, _ = db.save_bench_result(
+        submission,
+        SessionLabel(label),
+        Picoseconds.from_nanos(nanos),
+        "42",
+        bencher_version=version,
+    )
+    return run_id
@@ -0,0 +1,151 @@
+import asyncio
+from typing import Any
+
+import discord
+import pytest
+
+from ferris_elf import lib
+from ferris_elf.bot import Job, MyBot
+from ferris_elf.database import Database, Submission, Year
+from ferris_elf.entrypoints import Entrypoints
+from ferris_elf.profiles import BuildProfile
+
+from .conftest import StubContext, add_run, add_submission, add_version
+
+
+def job(ctx: StubContext, day: int) -> Job:
+    return (ctx, Year(2023), day, (1,), b"", BuildProfile.RELEASE, Entrypoints.RUN, None)  # type: ignore[return-value]
+
+
+def test_cancelled_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    benchmarked: list[int] = []
+    started = asyncio.Event()
+
+    async def benchmark(ctx: StubContext, year: Year, day: int, *args: Any, **kwargs: Any) -> None:
+        if day == 1:
+            started.set()
+            # runs until cancelled
+            await asyncio.sleep(60)
+        benchmarked.append(day)
+
+    monkeypatch.setattr(lib, "benchmark", benchmark)
+    monkeypatch.setattr(lib, "has_inputs", lambda year, day: True)
+
+    async def go() -> None:
+        bot = MyBot(intents=discord.Intents.none(), command_prefix="!")
+        contexts = [StubContext() for _ in range(3)]
+        job_ids = [bot.enqueue(job(ctx, day)) for day, ctx in enumerate(contexts, start=1)]
+
+        consumer = asyncio.create_task(bot.on_ready())
+        await started.wait()
+        assert bot.has_live_work()
+        # one running, one queued
+        assert bot.cancel(job_ids[0])
+        assert bot.cancel(job_ids[1])
+        assert not bot.cancel(job_ids[1])
+
+        await asyncio.wait_for(bot.queue.join(), 5)
+        consumer.cancel()
+
+        assert benchmarked == [3]
+        assert contexts[0].replies == ["Your submission was cancelled."]
+        assert contexts[1].replies == ["Your submission was cancelled."]
+        assert contexts[2].replies == []
+        assert not bot.has_live_work()
+
+    asyncio.run(go())
+
+
+def test_parked_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    benchmarked: list[int] = []
+    # inputs are stored for these days
+    stored = {3}
+    fetched = asyncio.Event()
+
+    async def benchmark(ctx: StubContext, year: Year, day: int, *args: Any, **kwargs: Any) -> None:
+        benchmarked.append(day)
+
+    async def wait_for_inputs(ctx: StubContext, year: Year, day: int) -> bool:
+        if day == 2:
+            # still missing when the hold ends
+            return False
+        await fetched.wait()
+        stored.add(day)
+        return True
+
+    monkeypatch.setattr(lib, "benchmark", benchmark)
+    monkeypatch.setattr(lib, "has_inputs", lambda year, day: day in stored)
+    monkeypatch.setattr(lib, "wait_for_inputs", wait_for_inputs)
+
+    async def go() -> None:
+        bot = MyBot(intents=discord.Intents.none(), command_prefix="!")
+        contexts = [StubContext() for _ in range(5)]
+        job_ids = [bot.enqueue(job(ctx, day)) for day, ctx in enumerate(contexts, start=1)]
+
+        consumer = asyncio.create_task(bot.on_ready())
+        await asyncio.wait_for(bot.queue.join(), 5)
+        # the jobs without inputs don't hold up the ones behind them
+        assert benchmarked == [3]
+        assert contexts[1].replies == [
+            "There are no inputs for day 2 yet, please submit again later."
+        ]
+        assert set(bot.parked) == {job_ids[0], job_ids[3], job_ids[4]}
+        assert bot.cancel(job_ids[4])
+
+        fetched.set()
+        await asyncio.wait_for(asyncio.gather(*bot.parked.values(), return_exceptions=True), 5)
+        await asyncio.wait_for(bot.queue.join(), 5)
+        consumer.cancel()
+
+        assert benchmarked == [3, 1, 4]
+        assert contexts[4].replies == ["Your submission was cancelled."]
+        assert not bot.has_live_work()
+
+    asyncio.run(go())
+
+
+def test_profile_jobs_queued(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    sub = add_submission(db, 1, add_version(db, "1.1700000000"))
+    run = add_run(db, sub, "a", 100)
+    submission = db.get_submission_by_id(sub)
+    assert submission is not None
+    done: list[Any] = []
+
+    async def benchmark(ctx: StubContext, year: Year, day: int, *args: Any, **kwargs: Any) -> None:
+        done.append(day)
+
+    async def profile_submission(submission: Submission, *args: Any) -> None:
+        done.append("profile")
+        db.save_flamegraph(run, b"<svg></svg>")
+
+    monkeypatch.setattr(lib, "benchmark", benchmark)
+    monkeypatch.setattr(lib, "profile_submission", profile_submission)
+    monkeypatch.setattr(lib, "has_inputs", lambda year, day: True)
+
+    def profile_job(ctx: StubContext) -> Job:
+        return (ctx, Year(2023), 1, (1,), b"", BuildProfile.RELEASE, Entrypoints.RUN, submission)  # type: ignore[return-value]
+
+    async def go() -> None:
+        bot = MyBot(intents=discord.Intents.none(), command_prefix="!")
+        contexts = [StubContext() for _ in range(4)]
+        bot.enqueue(job(contexts[0], 1))
+        profiled = bot.enqueue(profile_job(contexts[1]))
+        cancelled = bot.enqueue(profile_job(contexts[2]))
+        bot.enqueue(job(contexts[3], 2))
+        # counted like submissions, and cancelled like them
+        assert len(bot.queued) == 4
+        assert bot.cancel(cancelled)
+
+        consumer = asyncio.create_task(bot.on_ready())
+        await asyncio.wait_for(bot.queue.join(), 5)
+        consumer.cancel()
+
+        # in turn, not ahead of the submission queued before it
+        assert done == [1, "profile", 2]
+        assert profiled not in bot.running
+        assert contexts[1].replies == [
+            f"Profile of submission {sub}\nFlamegraphs are attached, one per input."
+        ]
+        assert contexts[2].replies == ["Your submission was cancelled."]
+
+    asyncio.run(go())
@@ -0,0 +1,59 @@
+import os
+import pathlib
+
+from ferris_elf.build_cache import BuildCacheKey, checkin, checkout, evict
+
+
+def make_target(path: pathlib.Path, size: int) -> None:
+    path.mkdir(parents=True)
+    (path / "artifact").write_bytes(b"x" * size)
+
+
+def test_roundtrip(tmp_path: pathlib.Path) -> None:
+    cache = str(tmp_path / "cache")
+    key = BuildCacheKey(1, 2024, 3, "2.1700000000")
+    target = tmp_path / "job" / "target"
+
+    assert not checkout(cache, key, str(target))
+
+    make_target(target, 10)
+    checkin(cache, key, str(target))
+    assert not target.exists()
+
+    fresh = tmp_path / "job2" / "target"
+    make_target(fresh, 1)
+    assert checkout(cache, key, str(fresh))
+    assert (fresh / "artifact").read_bytes() == b"x" * 10
+    # the entry is in use, nobody else can check it out meanwhile
+    assert not checkout(cache, key, str(tmp_path / "job3" / "target"))
+
+
+def test_keys_do_not_share(tmp_path: pathlib.Path) -> None:
+    cache = str(tmp_path / "cache")
+    target = tmp_path / "job" / "target"
+    make_target(target, 10)
+    checkin(cache, BuildCacheKey(1, 2024, 3, "v1"), str(target))
+
+    for other in (
+        BuildCacheKey(2, 2024, 3, "v1"),
+        BuildCacheKey(1, 2024, 4, "v1"),
+        BuildCacheKey(1, 2024, 3, "v2"),
+        BuildCacheKey(1, 2024, 3, "v1", "pgo"),
+    ):
+        assert not checkout(cache, other, str(tmp_path / "other" / "target"))
+
+
+def test_evict_least_recently_used(tmp_path: pathlib.Path) -> None:
+    cache = tmp_path / "cache"
+    for i, name in enumerate(("old", "mid", "new")):
+        make_target(cache / name, 64 * 1024)
+        os.utime(cache / name, (1000 + i, 1000 + i))
+
+    assert evict(str(cache), 10**9) == []
+    assert evict(str(cache), 64 * 1024 * 2 + 8192) == ["old"]
+    assert evict(str(cache), 0) == ["mid", "new"]
+    assert os.listdir(cache) == []
+
+
+def test_evict_missing_dir(tmp_path: pathlib.Path) -> None:
+    assert evict(str(tmp_path / "nope"), 0) == []
@@ -0,0 +1,40 @@
+import os.path
+
+import pytest
+
+from ferris_elf.calibration import WORKLOADS, DriftReport, normalize, relative_speed
+from ferris_elf.picoseconds import Picoseconds
+
+
+def ps(x: int) -> Picoseconds:
+    return Picoseconds.from_picos(x)
+
+
+def test_workloads_ship_with_runner() -> None:
+    for workload in WORKLOADS:
+        assert os.path.isfile(workload.source_path)
+
+
+def test_workload_inputs_are_deterministic() -> None:
+    for workload in WORKLOADS:
+        assert workload.input() == workload.input()
+
+
+def test_relative_speed_is_geometric_mean() -> None:
+    reference = {"a": ps(100), "b": ps(100)}
+    measured = {"a": ps(200), "b": ps(50), "c": ps(7)}
+    assert relative_speed(reference, measured) == pytest.approx(1.0)
+    assert relative_speed(reference, {"a": ps(150), "b": ps(150)}) == pytest.approx(1.5)
+    assert relative_speed(reference, {"c": ps(1)}) is None
+
+
+def test_normalize() -> None:
+    assert normalize(ps(3000), 1.5) == ps(2000)
+    assert normalize(ps(3000), None) is None
+
+
+def test_drift_threshold() -> None:
+    assert DriftReport("1.1", 1.08).exceeds(0.05)
+    assert DriftReport("1.1", 0.9).exceeds(0.05)
+    assert not DriftReport("1.1", 1.01).exceeds(0.05)
+    assert not DriftReport("1.1", None).exceeds(0.05)
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+import docker.errors
+import pytest
+import requests
+
+from ferris_elf import containers
+from ferris_elf.containers import DeadlineExceeded, run_cmd
+
+
+class StubContainer:
+    """Exits with exit_status after running for seconds, or once removed."""
+
+    def __init__(self, exit_status: int, seconds: float) -> None:
+        self.short_id = "stub"
+        self.exit_status = exit_status
+        self.seconds = seconds
+        self.removed = threading.Event()
+
+    def wait(self, timeout: float) -> dict[str, int]:
+        if self.removed.wait(min(self.seconds, timeout)):
+            return {"StatusCode": 137}
+        if self.seconds > timeout:
+            # what docker-py raises when the wait request times out
+            raise requests.exceptions.ReadTimeout()
+        return {"StatusCode": self.exit_status}
+
+    def logs(self, stdout: bool, stderr: bool) -> bytes:
+        return b"out" if stdout else b"err"
+
+    def remove(self, force: bool) -> None:
+        assert force
+        self.removed.set()
+
+
+class StubContainers:
+    def __init__(self, container: StubContainer) -> None:
+        self.container = container
+        self.options: dict[str, Any] = {}
+
+    def run(self, image: str, cmd: str | list[str], **options: Any) -> StubContainer:
+        assert options["detach"]
+        self.options = options
+        return self.container
+
+
+class StubClient:
+    def __init__(self, container: StubContainer) -> None:
+        self.containers = StubContainers(container)
+
+
+def stub_docker(monkeypatch: pytest.MonkeyPatch, container: StubContainer) -> StubClient:
+    client = StubClient(container)
+    monkeypatch.setattr(containers, "docker_client", lambda: client)
+    return client
+
+
+def test_output(monkeypatch: pytest.MonkeyPatch) -> None:
+    container = StubContainer(0, 0)
+    client = stub_docker(monkeypatch, container)
+
+    assert asyncio.run(run_cmd("image", "true", {}, {}, deadline=1)) == "out"
+    assert client.containers.options["network_mode"] == "none"
+    assert container.removed.is_set()
+
+
+def test_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    container = StubContainer(101, 0)
+    stub_docker(monkeypatch, container)
+
+    with pytest.raises(docker.errors.ContainerError) as e:
+        asyncio.run(run_cmd("image", "false", {}, {}, deadline=1))
+    assert e.value.exit_status == 101
+    assert e.value.stderr == b"err"
+    assert container.removed.is_set()
+
+
+def test_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    container = StubContainer(0, 60)
+    stub_docker(monkeypatch, container)
+
+    with pytest.raises(DeadlineExceeded) as e:
+        asyncio.run(run_cmd("image", "sleep 60", {}, {}, deadline=0.1))
+    assert e.value.exit_status == 124
+    assert container.removed.is_set()
+
+
+def test_cancel_removes_container(monkeypatch: pytest.MonkeyPatch) -> None:
+    container = StubContainer(0, 60)
+    stub_docker(monkeypatch, container)
+
+    async def go() -> None:
+        task = asyncio.create_task(run_cmd("image", "sleep 60", {}, {}, deadline=60))
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # killed right away, not once the deadline passes
+        assert time.monotonic() - started < 5
+
+    asyncio.run(go())
+    assert container.removed.is_set()
@@ -0,0 +1,44 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.counters import HardwareCounters
+
+RECORD = {
+    "reason": "ferris-counters",
+    "iterations": 10,
+    "instructions": 4000,
+    "cycles": 2000,
+    "branch_misses": 8,
+    "l1d_misses": 40,
+    "llc_misses": None,
+}
+
+
+def test_from_record() -> None:
+    c = HardwareCounters.from_record(RECORD)
+    assert c is not None
+    assert c.ipc == 2.0
+    assert c.per_kilo_instruction(c.l1d_misses) == 10.0
+    assert c.per_kilo_instruction(c.llc_misses) is None
+    assert "IPC: **2.00**" in c.describe()
+    assert "LLC" not in c.describe()
+
+
+def test_unavailable_record() -> None:
+    assert HardwareCounters.from_record({"reason": "ferris-counters", "error": "EACCES"}) is None
+    assert HardwareCounters.from_record({"iterations": 10}) is None
+
+
+@given(st.lists(st.integers(min_value=1, max_value=2**40), min_size=1, max_size=10))
+def test_combine_sums(instrs: list[int]) -> None:
+    combined = HardwareCounters.combine(HardwareCounters(1, i, i, None, 0, 0) for i in instrs)
+    assert combined is not None
+    assert combined.iterations == len(instrs)
+    assert combined.instructions == sum(instrs)
+    assert combined.ipc == 1.0
+    # a counter missing on any run is missing on the total
+    assert combined.branch_misses is None
+
+
+def test_combine_empty() -> None:
+    assert HardwareCounters.combine([]) is None
@@ -0,0 +1,256 @@
+from ferris_elf.database import (
+    CampaignId,
+    ContainerTag,
+    Database,
+    RebenchStatus,
+    SessionLabel,
+    SubmissionFilter,
+    Year,
+)
+from ferris_elf.entrypoints import Entrypoints
+from ferris_elf.hardware import HardwareClass
+from ferris_elf.picoseconds import Picoseconds
+from ferris_elf.profiles import BuildProfile
+
+from .conftest import add_run, add_submission, add_version
+
+
+def test_rebench_claim_order(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    subs = [add_submission(db, user, version) for user in range(4)]
+    backfill = db.create_rebench_campaign(version, "backfill", subs[:2], priority=500)
+    urgent = db.create_rebench_campaign(version, "urgent", subs[2:], priority=10)
+
+    first = db.claim_rebench_jobs(3)
+    # by priority, then in the order they were queued
+    assert [(j.campaign, j.submission) for j in first] == [
+        (urgent, subs[2]),
+        (urgent, subs[3]),
+        (backfill, subs[0]),
+    ]
+    assert all(j.container_tag == "1.1700000000" for j in first)
+    # claimed jobs aren't handed out again
+    assert [j.submission for j in db.claim_rebench_jobs(3)] == [subs[1]]
+    assert db.claim_rebench_jobs(3) == []
+
+
+def test_rebench_pending_jobs_not_queued_twice(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    sub = add_submission(db, 1, version)
+    db.create_rebench_campaign(version, "first", [sub])
+    again = db.create_rebench_campaign(version, "second", [sub])
+
+    progress = db.campaign_progress(again)
+    assert progress is not None and progress.total == 0
+
+
+def test_rebench_requeue_after_crash(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    subs = [add_submission(db, user, version) for user in range(3)]
+    db.create_rebench_campaign(version, "c", subs)
+
+    done, *interrupted = db.claim_rebench_jobs(3)
+    db.finish_rebench_job(done.id, RebenchStatus.DONE)
+    # the bot restarts with the other two running
+    assert db.requeue_running_rebench_jobs() == 2
+    assert [j.id for j in db.claim_rebench_jobs(3)] == [j.id for j in interrupted]
+
+
+def test_campaign_progress(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    subs = [add_submission(db, user, version) for user in range(5)]
+    campaign = db.create_rebench_campaign(version, "every day 1", subs)
+
+    jobs = db.claim_rebench_jobs(4)
+    db.finish_rebench_job(jobs[0].id, RebenchStatus.DONE)
+    db.finish_rebench_job(jobs[1].id, RebenchStatus.SKIPPED)
+    db.finish_rebench_job(jobs[2].id, RebenchStatus.FAILED)
+    # put back, e.g. while live submissions wait
+    db.finish_rebench_job(jobs[3].id, RebenchStatus.QUEUED)
+
+    progress = db.campaign_progress(campaign)
+    assert progress is not None
+    assert (progress.description, progress.total, progress.done, progress.failed) == (
+        "every day 1",
+        5,
+        2,
+        1,
+    )
+    assert progress.remaining == 2
+    assert db.campaign_progress(CampaignId(campaign + 1)) is None
+
+
+def test_select_submissions(db: Database) -> None:
+    old, new = add_version(db, "1.1700000000"), add_version(db, "1.1710000000")
+    day1_part1 = add_submission(db, 1, old)
+    day1_part2 = add_submission(db, 1, old, part=2)
+    day2 = add_submission(db, 2, new, day=2)
+    invalid = add_submission(db, 2, new, day=2, part=2)
+    db.mark_submission_invalid(invalid)
+
+    assert db.select_submissions(SubmissionFilter()) == [day1_part1, day1_part2, day2]
+    assert db.select_submissions(SubmissionFilter(include_invalid=True)) == [
+        day1_part1,
+        day1_part2,
+        day2,
+        invalid,
+    ]
+    assert db.select_submissions(SubmissionFilter(day=1)) == [day1_part1, day1_part2]
+    assert db.select_submissions(SubmissionFilter(day=1, part=2)) == [day1_part2]
+    assert db.select_submissions(SubmissionFilter(part=2, include_invalid=True)) == [
+        day1_part2,
+        invalid,
+    ]
+    assert db.select_submissions(SubmissionFilter(user_id=2)) == [day2]
+    assert db.select_submissions(SubmissionFilter(bencher_version=old)) == [day1_part1, day1_part2]
+    assert db.select_submissions(SubmissionFilter(year=Year(2022))) == []
+
+
+def test_campaign_include_invalid(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    sub = add_submission(db, 1, version)
+    db.create_rebench_campaign(version, "valid only", [sub])
+    (job,) = db.claim_rebench_jobs(1)
+    db.finish_rebench_job(job.id, RebenchStatus.DONE)
+    db.create_rebench_campaign(version, "with invalid", [sub], include_invalid=True)
+
+    assert not job.include_invalid
+    assert db.claim_rebench_jobs(1)[0].include_invalid
+
+
+def test_entrypoints_saved(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    plain = add_submission(db, 1, version)
+    phases = db.save_submission(
+        2,
+        Year(2023),
+        1,
+        1,
+        b"",
+        version,
+        2,
+        entrypoints=Entrypoints.PHASES,
+    )
+
+    # rebenches build them the way they were submitted
+    assert [s.entrypoints for s in db.get_submissions_by_ids((plain, phases))] == [
+        Entrypoints.RUN,
+        Entrypoints.PHASES,
+    ]
+    submission = db.get_submission_by_id(phases)
+    assert submission is not None and submission.entrypoints == Entrypoints.PHASES
+
+
+def test_pair_submissions(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    part1, part2 = (
+        db.save_submission(
+            1, Year(2023), 1, part, b"", version, 3, entrypoints=Entrypoints.BOTH_PARTS
+        )
+        for part in (1, 2)
+    )
+    single = add_submission(db, 1, version, part=2)
+    db.pair_submissions(part1, part2)
+
+    assert Database.connection is not None
+    paired = dict(
+        Database.connection.execute("SELECT submission_id, paired_submission FROM submissions")
+    )
+    assert paired == {part1: part2, part2: part1, single: None}
+    assert all(
+        s.entrypoints == Entrypoints.BOTH_PARTS for s in db.get_submissions_by_ids((part1, part2))
+    )
+
+
+def test_same_time_in_two_profiles(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    db.insert_input(SessionLabel("a"), Year(2023), 1, "a")
+    for profile, hardware_class in [
+        (BuildProfile.RELEASE, "a"),
+        (BuildProfile.LTO, "a"),
+        (BuildProfile.RELEASE, "b"),
+    ]:
+        sub = db.save_submission(
+            1, Year(2023), 1, 1, b"", version, 3, profile, HardwareClass(hardware_class)
+        )
+        add_run(db, sub, "a", 100)
+        # used to fail on best_runs_index, which ignored profile and hardware class
+        assert db.process_submission_average_time(sub)
+
+    for profile, hardware_class in [
+        (BuildProfile.RELEASE, "a"),
+        (BuildProfile.LTO, "a"),
+        (BuildProfile.RELEASE, "b"),
+    ]:
+        (best,) = db.best_times(
+            Year(2023), 1, 1, build_profile=profile, hardware_class=HardwareClass(hardware_class)
+        )
+        assert best.time == Picoseconds.from_nanos(100)
+
+
+def test_container_versions_to_pull(db: Database) -> None:
+    add_version(db, "1.100")
+    add_version(db, "1.200", pulled=False)
+    add_version(db, "1.400", pulled=False)
+    db.insert_container_version("1.74.0", ContainerTag("1.300"), b"", bench_format=4, pulled=False)
+
+    # the keep newest that our harness can use, newest first
+    assert db.container_versions_to_pull(3, 2) == ["1.400", "1.200"]
+    assert db.container_versions_to_pull(3, 1) == ["1.400"]
+    assert db.container_versions_to_pull(4, 2) == ["1.400", "1.300"]
+
+    db.mark_container_pulled(ContainerTag("1.400"), 12.5)
+    assert db.container_versions_to_pull(3, 2) == ["1.200"]
+    # None keeps the last pull's duration
+    db.mark_container_pulled(ContainerTag("1.400"), None)
+    assert db.pulled_container_versions() == [("1.400", 1, 12.5), ("1.100", 1, None)]
+
+    db.mark_container_removed(ContainerTag("1.400"))
+    assert db.container_versions_to_pull(3, 2) == ["1.400", "1.200"]
+    assert db.pulled_container_versions() == [("1.100", 1, None)]
+
+
+def test_newest_container_version_min_format(db: Database) -> None:
+    old = db.insert_container_version("1.74.0", ContainerTag("1.100"), b"", bench_format=3)
+    new = add_version(db, "1.200")
+
+    assert db.newest_container_version(3) == (new, "1.200")
+    # PGO builds skip the newer format 1 image, which lacks llvm-tools
+    assert db.newest_container_version(3, BuildProfile.PGO.min_bench_format()) == (old, "1.100")
+
+
+def test_unknown_hardware_on_local_board(db: Database) -> None:
+    version = add_version(db, "1.1700000000")
+    local = HardwareClass("local")
+    # measured before hardware classes
+    old = add_submission(db, 1, version)
+    add_run(db, old, "a", 100)
+    db.process_submission_average_time(old)
+    new = db.save_submission(2, Year(2023), 1, 1, b"", version, 3, hardware_class=local)
+    add_run(db, new, "a", 200)
+    db.process_submission_average_time(new)
+
+    assert db.classify_unknown_hardware(local, "this host") == 1
+    assert db.classify_unknown_hardware(local, "this host") == 0
+
+    board = db.best_times(Year(2023), 1, 1)
+    assert [(t.user_id, t.submission) for t in board] == [(1, old), (2, new)]
+    assert db.best_times(Year(2023), 1, 1, hardware_class=local) == board
+    assert db.hardware_classes() == [(local, "this host")]
+
+
+def test_flamegraphs(db: Database) -> None:
+    old, new = add_version(db, "1.1700000000"), add_version(db, "1.1710000000")
+    sub = add_submission(db, 1, old)
+    first_a, first_b = add_run(db, sub, "a", 100), add_run(db, sub, "b", 200)
+    db.save_flamegraph(first_a, b"<svg>a</svg>")
+
+    assert db.unprofiled_runs(sub) == [(first_b, "b")]
+    assert db.get_submission_flamegraphs(sub) == {"a": b"<svg>a</svg>"}
+
+    # re-measured on a new version, the old runs' flamegraphs don't apply anymore
+    db.supersede_runs(sub, old)
+    second_a = add_run(db, sub, "a", 90, version=new)
+    db.adopt_bencher_version(sub, new)
+    assert db.unprofiled_runs(sub) == [(second_a, "a")]
+    assert db.get_submission_flamegraphs(sub) == {}
@@ -0,0 +1,62 @@
+import json
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.diagnostics import Diagnostic, format_diagnostics, parse_check_output
+
+
+def compiler_message(level: str, message: str, code: str | None = None) -> str:
+    return json.dumps(
+        {
+            "reason": "compiler-message",
+            "package_id": "path+file:///app#ferris-elf@0.0.0",
+            "message": {
+                "level": level,
+                "message": message,
+                "code": {"code": code, "explanation": "..."} if code else None,
+                "rendered": f"{level}{f'[{code}]' if code else ''}: {message}\n --> src/code.rs:1:1\n",
+            },
+        }
+    )
+
+
+def test_parse_check_output() -> None:
+    out = "\n".join(
+        [
+            "    Checking ferris-elf v0.0.0 (/app)",
+            json.dumps({"reason": "compiler-artifact", "package_id": "libc"}),
+            compiler_message("warning", "unused variable: `x`"),
+            compiler_message("error", "mismatched types", "E0308"),
+            compiler_message("error", "expected one of `;` or `}`"),
+            compiler_message("error", "aborting due to 2 previous errors"),
+            json.dumps({"reason": "build-finished", "success": False}),
+        ]
+    )
+    success, errors = parse_check_output(out)
+    assert success is False
+    assert [(e.level, e.code) for e in errors] == [("error", "E0308"), ("error", None)]
+    assert errors[0].rendered.startswith("error[E0308]: mismatched types")
+
+
+def test_killed_check() -> None:
+    assert parse_check_output("    Checking ferris-elf v0.0.0 (/app)\n") == (None, [])
+
+
+def test_passed_check() -> None:
+    out = json.dumps({"reason": "build-finished", "success": True})
+    assert parse_check_output(out) == (True, [])
+
+
+@given(
+    st.lists(st.text(min_size=1, max_size=500), min_size=1, max_size=20),
+    st.integers(min_value=40, max_value=2000),
+)
+def test_format_fits(messages: list[str], max_len: int) -> None:
+    errors = [Diagnostic("error", None, m) for m in messages]
+    assert len(format_diagnostics(errors, max_len)) <= max_len
+
+
+def test_format_all_when_they_fit() -> None:
+    errors = [Diagnostic("error", "E0308", "error[E0308]: mismatched types\n")] * 3
+    assert format_diagnostics(errors, 2000) == "error[E0308]: mismatched types\n" * 3
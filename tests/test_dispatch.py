@@ -0,0 +1,159 @@
+import asyncio
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+
+from ferris_elf.database import ContainerTag, SessionLabel, Year
+from ferris_elf.dispatch import (
+    Dispatcher,
+    WorkerError,
+    claim_job,
+    make_app,
+    report_outcome,
+    send_heartbeat,
+)
+from ferris_elf.hardware import Hardware
+from ferris_elf.jobs import BenchJob
+from ferris_elf.profiles import BuildProfile
+
+TOKEN = "t"
+HARDWARE = Hardware("Test CPU", 4, 16, "x86_64")
+
+
+def job(user_id: int) -> BenchJob:
+    return BenchJob(
+        user_id,
+        f"user{user_id}",
+        Year(2023),
+        1,
+        (1,),
+        b"fn main() {}",
+        BuildProfile.RELEASE,
+        ContainerTag("3.2"),
+        {SessionLabel("a"): "1\n2\n"},
+        {1: {SessionLabel("a"): "3"}},
+    )
+
+
+def test_workers_split_jobs() -> None:
+    async def go() -> None:
+        dispatcher = Dispatcher(60)
+        async with TestServer(make_app(dispatcher, TOKEN)) as server:
+            headers = {"Authorization": f"Bearer {TOKEN}"}
+            async with aiohttp.ClientSession(server.make_url(""), headers=headers) as session:
+
+                async def worker(name: str) -> list[int]:
+                    done = []
+                    while (claimed := await claim_job(session, name, HARDWARE, 0.2)) is not None:
+                        job_id, claimed_job = claimed
+                        assert await report_outcome(
+                            session, name, job_id, {"user": claimed_job.user_id}
+                        )
+                        done.append(claimed_job.user_id)
+                        # let the other workers claim
+                        await asyncio.sleep(0.01)
+                    return done
+
+                runs = [asyncio.create_task(dispatcher.run(job(n))) for n in range(6)]
+                done = await asyncio.gather(*(worker(f"w{n}") for n in range(3)))
+                outcomes = await asyncio.gather(*runs)
+
+        assert sorted(user for worker_done in done for user in worker_done) == list(range(6))
+        assert all(worker_done for worker_done in done)
+        assert [outcome for _, outcome in outcomes] == [{"user": n} for n in range(6)]
+        assert all(hardware == HARDWARE for hardware, _ in outcomes)
+
+    asyncio.run(go())
+
+
+def test_expired_lease_is_requeued() -> None:
+    async def go() -> None:
+        dispatcher = Dispatcher(0.05)
+        run = asyncio.create_task(dispatcher.run(job(1)))
+        first = await dispatcher.claim("dead", HARDWARE, 1)
+        assert first is not None
+
+        await asyncio.sleep(0.1)
+        second = await dispatcher.claim("alive", HARDWARE, 1)
+        assert second is not None and second[0] == first[0]
+
+        # the first worker lost its lease to the second
+        assert not dispatcher.report(first[0], "dead", {})
+        assert dispatcher.report(second[0], "alive", {"ok": True})
+        assert (await run)[1] == {"ok": True}
+
+    asyncio.run(go())
+
+
+def test_cancelled_job_is_gone() -> None:
+    async def go() -> None:
+        dispatcher = Dispatcher(60)
+        async with TestServer(make_app(dispatcher, TOKEN)) as server:
+            headers = {"Authorization": f"Bearer {TOKEN}"}
+            async with aiohttp.ClientSession(server.make_url(""), headers=headers) as session:
+                run = asyncio.create_task(dispatcher.run(job(1)))
+                claimed = await claim_job(session, "w", HARDWARE, 1)
+                assert claimed is not None
+
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+                assert not await report_outcome(session, "w", claimed[0], {})
+                # and nobody else gets it
+                assert await claim_job(session, "w", HARDWARE, 0) is None
+
+    asyncio.run(go())
+
+
+def test_heartbeat_keeps_lease() -> None:
+    async def go() -> None:
+        dispatcher = Dispatcher(0.1)
+        async with TestServer(make_app(dispatcher, TOKEN)) as server:
+            headers = {"Authorization": f"Bearer {TOKEN}"}
+            async with aiohttp.ClientSession(server.make_url(""), headers=headers) as session:
+                run = asyncio.create_task(dispatcher.run(job(1)))
+                claimed = await claim_job(session, "w", HARDWARE, 1)
+                assert claimed is not None
+
+                # running longer than the lease, but still heard from
+                for _ in range(5):
+                    await asyncio.sleep(0.05)
+                    assert await send_heartbeat(session, "w", claimed[0])
+                assert await claim_job(session, "other", HARDWARE, 0) is None
+                assert not await send_heartbeat(session, "other", claimed[0])
+
+                # /cancel, the worker learns on its next heartbeat
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+                assert not await send_heartbeat(session, "w", claimed[0])
+
+    asyncio.run(go())
+
+
+def test_worker_error() -> None:
+    async def go() -> None:
+        dispatcher = Dispatcher(60)
+        run = asyncio.create_task(dispatcher.run(job(1)))
+        claimed = await dispatcher.claim("w", HARDWARE, 1)
+        assert claimed is not None
+        dispatcher.report(claimed[0], "w", {"error": "docker is down"})
+        try:
+            await run
+        except WorkerError as e:
+            assert "docker is down" in str(e)
+        else:
+            raise AssertionError("expected a WorkerError")
+
+    asyncio.run(go())
+
+
+def test_bad_token() -> None:
+    async def go() -> None:
+        async with TestServer(make_app(Dispatcher(60), TOKEN)) as server:
+            headers = {"Authorization": "Bearer wrong"}
+            async with (
+                aiohttp.ClientSession(server.make_url(""), headers=headers) as session,
+                session.post("/jobs/claim", json={}) as response,
+            ):
+                assert response.status == 401
+
+    asyncio.run(go())
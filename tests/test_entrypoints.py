@@ -0,0 +1,52 @@
+from typing import Optional
+
+import pytest
+
+from ferris_elf.entrypoints import both_parts, has_phases, parts_shim
+
+
+@pytest.mark.parametrize(
+    ("code", "expected"),
+    [
+        (b"pub fn run(i: &str) -> u32 { 0 }", False),
+        (b"pub fn parse(i: &str) -> u32 { 0 }\npub fn solve(p: u32) -> u32 { p }", True),
+        (b"pub fn parse(i: &str) -> u32 { 0 }", False),
+        # private helpers aren't exported, the harness can't call them
+        (b"fn parse(i: &str) -> u32 { 0 }\nfn solve(p: u32) -> u32 { p }", False),
+        (b"pub fn parser(i: &str) -> u32 { 0 }\npub fn solver(p: u32) -> u32 { p }", False),
+    ],
+)
+def test_has_phases(code: bytes, expected: bool) -> None:
+    assert has_phases(code) == expected
+
+
+@pytest.mark.parametrize(
+    ("code", "expected"),
+    [
+        (b"pub fn run(i: &str) -> u32 { 0 }", None),
+        (
+            b"pub fn part1(i: &str) -> u32 { 0 }\npub fn part2(i: &str) -> u32 { 0 }",
+            ("part1", "part2"),
+        ),
+        (
+            b"pub fn run_p1(i: &str) -> u32 { 0 }\npub fn run_p2(i: &str) -> u32 { 0 }",
+            ("run_p1", "run_p2"),
+        ),
+        # both naming schemes, the first one is preferred
+        (
+            b"pub fn run_p1(i: &str) {}\npub fn run_p2(i: &str) {}\npub fn part1(i: &str) {}\npub fn part2(i: &str) {}",
+            ("part1", "part2"),
+        ),
+        (b"pub fn part1(i: &str) -> u32 { 0 }\nfn part2(i: &str) -> u32 { 0 }", None),
+        (b"pub fn part1(i: &str) -> u32 { 0 }\npub fn run_p2(i: &str) -> u32 { 0 }", None),
+    ],
+)
+def test_both_parts(code: bytes, expected: Optional[tuple[str, str]]) -> None:
+    assert both_parts(code) == expected
+
+
+def test_parts_shim() -> None:
+    # under the names the benchmark calls, like the default runner/src/parts.rs
+    assert parts_shim(("run_p1", "run_p2")) == (
+        "pub use crate::code::{run_p1 as run, run_p1 as part1, run_p2 as part2};\n"
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import random
+
+import hypothesis.strategies as st
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from hypothesis import given
+
+from ferris_elf.fetcher import FetchError, RateLimiter, RetryPolicy, fetch_day, new_session
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+
+def stand_in(failures: dict[str, list[int]]) -> web.Application:
+    """Serves `input for <token>`, after answering with the listed statuses for that token."""
+
+    async def handler(request: web.Request) -> web.Response:
+        token = request.cookies.get("session", "")
+        if pending := failures.get(token):
+            return web.Response(status=pending.pop(0))
+        day = request.match_info["day"]
+        return web.Response(text=f"input for {token} on day {day}\n")
+
+    app = web.Application()
+    app.router.add_get("/{year}/day/{day}/input", handler)
+    return app
+
+
+def run_fetch(
+    failures: dict[str, list[int]], tokens: dict[str, str]
+) -> tuple[dict[str, str], dict[str, BaseException]]:
+    async def go() -> tuple[dict[str, str], dict[str, BaseException]]:
+        async with TestServer(stand_in(failures)) as server, new_session(5) as session:
+            return await fetch_day(
+                session,
+                RateLimiter(0),
+                FAST,
+                2024,
+                3,
+                tokens,
+                base_url=str(server.make_url("")).rstrip("/"),
+            )
+
+    return asyncio.run(go())
+
+
+def test_fetch_all_tokens() -> None:
+    fetched, failed = run_fetch({}, {"a": "tok-a", "b": "tok-b"})
+    assert fetched == {"a": "input for tok-a on day 3\n", "b": "input for tok-b on day 3\n"}
+    assert failed == {}
+
+
+def test_retries_transient_errors() -> None:
+    fetched, failed = run_fetch({"tok-a": [503, 429]}, {"a": "tok-a"})
+    assert fetched == {"a": "input for tok-a on day 3\n"}
+    assert failed == {}
+
+
+def test_one_failure_keeps_the_rest() -> None:
+    fetched, failed = run_fetch(
+        {"tok-a": [500, 500, 500], "tok-b": [400]}, {"a": "tok-a", "b": "tok-b", "c": "tok-c"}
+    )
+    assert list(fetched) == ["c"]
+    assert isinstance(failed["a"], FetchError)
+    # not retried, a bad request won't get better
+    assert isinstance(failed["b"], FetchError)
+    assert "400" in str(failed["b"])
+
+
+@given(st.integers(min_value=1, max_value=30), st.integers())
+def test_delay_bounded(attempt: int, seed: int) -> None:
+    policy = RetryPolicy(base_delay=1, max_delay=60)
+    assert 0 <= policy.delay(attempt, random.Random(seed)) <= min(60, 2 ** (attempt - 1))
+
+
+def test_rate_limiter_spaces_requests() -> None:
+    async def go() -> float:
+        limiter = RateLimiter(0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(limiter.wait() for _ in range(4)))
+        return loop.time() - start
+
+    assert asyncio.run(go()) >= 0.15
@@ -0,0 +1,32 @@
+from ferris_elf.hardware import Hardware, parse_cpu_model, parse_memory_gib
+
+X86_CPUINFO = """processor\t: 0
+vendor_id\t: AuthenticAMD
+model name\t: AMD Ryzen 9 7950X  16-Core Processor
+cpu MHz\t\t: 4500.000
+"""
+
+ARM_CPUINFO = """processor\t: 0
+BogoMIPS\t: 108.00
+
+Model\t\t: Raspberry Pi 5 Model B Rev 1.0
+"""
+
+
+def test_parse_cpu_model() -> None:
+    assert parse_cpu_model(X86_CPUINFO) == "AMD Ryzen 9 7950X 16-Core Processor"
+    assert parse_cpu_model(ARM_CPUINFO) == "Raspberry Pi 5 Model B Rev 1.0"
+    assert parse_cpu_model("") is None
+
+
+def test_parse_memory_gib() -> None:
+    # a 64 GiB machine, less what the kernel keeps for itself
+    assert parse_memory_gib("MemTotal:       65800000 kB\nMemFree: 1 kB\n") == 63
+    assert parse_memory_gib("") is None
+
+
+def test_hardware_class() -> None:
+    hardware = Hardware("AMD Ryzen 9 7950X 16-Core Processor", 32, 63, "x86_64")
+    # stable across processes and releases, it's saved with every result
+    assert hardware.hardware_class() == "d6ad98af515e"
+    assert hardware.hardware_class() != Hardware("Other", 32, 63, "x86_64").hardware_class()
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Any
+
+import docker.errors
+import pytest
+
+from ferris_elf import images, lib
+from ferris_elf.config import settings
+from ferris_elf.database import ContainerTag, Database
+
+from .conftest import add_version
+
+
+class StubImages:
+    """The images on a host, remove fails for the ones a container still runs off."""
+
+    def __init__(self, present: set[str], busy: frozenset[str] = frozenset()) -> None:
+        self.present = present
+        self.busy = busy
+        self.pulled: list[str] = []
+        self.removed: list[str] = []
+
+    def get(self, ref: str) -> object:
+        if ref not in self.present:
+            raise docker.errors.ImageNotFound(ref)
+        return object()
+
+    def pull(self, repository: str, tag: str) -> None:
+        self.pulled.append(tag)
+        self.present.add(f"{repository}:{tag}")
+
+    def remove(self, ref: str) -> None:
+        if ref in self.busy:
+            raise docker.errors.APIError("image is in use by a container")
+        self.present.discard(ref)
+        self.removed.append(ref)
+
+    def prune(self, filters: dict[str, Any]) -> dict[str, Any]:
+        return {"SpaceReclaimed": 0}
+
+
+class StubContainers:
+    def list(self, **filters: Any) -> list[Any]:
+        return []
+
+
+class StubClient:
+    def __init__(self, images: StubImages) -> None:
+        self.images = images
+        self.containers = StubContainers()
+
+    def df(self) -> dict[str, Any]:
+        return {"Images": [], "LayersSize": 0}
+
+
+def stub_docker(monkeypatch: pytest.MonkeyPatch, stub: StubImages) -> None:
+    client = StubClient(stub)
+    monkeypatch.setattr(images, "docker_client", lambda: client)
+
+
+def test_manage_images(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert settings.images.keep == 3
+    for tag in ("1.100", "1.200", "1.300"):
+        add_version(db, tag)
+    add_version(db, "1.400", pulled=False)
+    # needs a newer harness than ours
+    db.insert_container_version("1.74.0", ContainerTag("1.500"), b"", bench_format=99, pulled=False)
+    stub = StubImages({images.image_ref(ContainerTag(t)) for t in ("1.100", "1.200", "1.300")})
+    stub_docker(monkeypatch, stub)
+
+    asyncio.run(images.manage_images())
+
+    assert stub.pulled == ["1.400"]
+    assert stub.removed == [images.image_ref(ContainerTag("1.100"))]
+    assert [tag for tag, _, _ in db.pulled_container_versions()] == ["1.400", "1.300", "1.200"]
+    assert db.container_versions_to_pull(3, 3) == []
+
+
+def test_image_on_host_already(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    add_version(db, "1.100", pulled=False)
+    stub = StubImages({images.image_ref(ContainerTag("1.100"))})
+    stub_docker(monkeypatch, stub)
+
+    asyncio.run(images.pull(ContainerTag("1.100")))
+
+    assert stub.pulled == []
+    assert db.pulled_container_versions() == [("1.100", 1, None)]
+
+
+def test_remove_busy_image(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    add_version(db, "1.100")
+    ref = images.image_ref(ContainerTag("1.100"))
+    stub_docker(monkeypatch, StubImages({ref}, busy=frozenset({ref})))
+
+    asyncio.run(images.remove(ContainerTag("1.100")))
+
+    # still on the host, tried again on the next check
+    assert [tag for tag, _, _ in db.pulled_container_versions()] == ["1.100"]
+
+
+def test_pull_waits_for_benchmark(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    add_version(db, "1.100", pulled=False)
+    stub = StubImages(set())
+    stub_docker(monkeypatch, stub)
+    monkeypatch.setattr(images, "IDLE_POLL_SECONDS", 0.01)
+
+    async def go() -> None:
+        async with lib.bench_lock:
+            pulling = asyncio.create_task(images.pull(ContainerTag("1.100")))
+            await asyncio.sleep(0.05)
+            assert stub.pulled == []
+        await asyncio.wait_for(pulling, 5)
+        assert stub.pulled == ["1.100"]
+
+    asyncio.run(go())
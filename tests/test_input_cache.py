@@ -0,0 +1,34 @@
+import os
+import pathlib
+
+from ferris_elf.input_cache import MANIFEST, day_dir, fill, is_current
+
+
+def test_day_dir_is_absolute() -> None:
+    path = day_dir("input_cache/", 2024, 3)
+    assert os.path.isabs(path)
+    assert path.endswith("2024-03")
+
+
+def test_fill(tmp_path: pathlib.Path) -> None:
+    path = day_dir(str(tmp_path), 2024, 1)
+    assert not is_current(path, {"a": "1"})
+
+    fill(path, {"a": "input a\n", "b": "input b\n"}, {"a": "1", "b": "2"})
+    assert is_current(path, {"a": "1", "b": "2"})
+    assert (pathlib.Path(path) / "a").read_text() == "input a\n"
+
+    # a changed or added input invalidates the day
+    assert not is_current(path, {"a": "1", "b": "3"})
+    assert not is_current(path, {"a": "1", "b": "2", "c": "4"})
+
+
+def test_refill_replaces(tmp_path: pathlib.Path) -> None:
+    path = day_dir(str(tmp_path), 2024, 1)
+    fill(path, {"a": "old\n", "b": "old\n"}, {"a": "1", "b": "2"})
+    fill(path, {"a": "new\n"}, {"a": "3"})
+
+    assert sorted(os.listdir(path)) == sorted([MANIFEST, "a"])
+    assert (pathlib.Path(path) / "a").read_text() == "new\n"
+    # nothing is left over from the swap
+    assert os.listdir(tmp_path) == ["2024-01"]
@@ -0,0 +1,42 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.database import ContainerTag, SessionLabel, Year
+from ferris_elf.entrypoints import Entrypoints
+from ferris_elf.jobs import BenchJob
+from ferris_elf.profiles import BuildProfile
+
+labels = st.text(min_size=1, max_size=8).map(SessionLabel)
+
+
+@given(
+    st.binary(),
+    st.sampled_from(list(BuildProfile)),
+    st.dictionaries(labels, st.text()),
+    st.dictionaries(labels, st.text()),
+    st.sampled_from(list(Entrypoints)),
+    st.lists(labels, max_size=3).map(tuple),
+)
+def test_wire_roundtrip(
+    code: bytes,
+    profile: BuildProfile,
+    inputs: dict[SessionLabel, str],
+    answers: dict[SessionLabel, str],
+    entrypoints: Entrypoints,
+    profile_inputs: tuple[SessionLabel, ...],
+) -> None:
+    job = BenchJob(
+        1234,
+        "someone",
+        Year(2023),
+        7,
+        (1, 2),
+        code,
+        profile,
+        ContainerTag("3.2"),
+        inputs,
+        {1: answers, 2: {}},
+        entrypoints,
+        profile_inputs,
+    )
+    assert BenchJob.from_wire(job.to_wire()) == job
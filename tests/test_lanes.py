@@ -0,0 +1,65 @@
+import hypothesis.strategies as st
+import pytest
+from hypothesis import given
+
+from ferris_elf.lanes import LaneKind, format_cpuset, parse_cpuset, plan_lanes
+
+
+def siblings(cpu: int) -> set[int]:
+    # 4 cores with 2 threads each, numbered like linux does: cpu n and n + 4 share a core
+    return {cpu % 4, cpu % 4 + 4}
+
+
+def test_parse_cpuset() -> None:
+    assert parse_cpuset("0-3,6\n") == {0, 1, 2, 3, 6}
+    assert parse_cpuset("5") == {5}
+    assert parse_cpuset("") == set()
+
+
+@given(st.sets(st.integers(min_value=0, max_value=256)))
+def test_cpuset_roundtrip(cpus: set[int]) -> None:
+    assert parse_cpuset(format_cpuset(cpus)) == cpus
+
+
+def test_measure_lane_idles_siblings() -> None:
+    lanes = plan_lanes(
+        {2, 3}, set(range(8)), siblings, cpu_period=100000, cpu_quota=0, pids_limit=64
+    )
+    measure, build = lanes[LaneKind.MEASURE], lanes[LaneKind.BUILD]
+
+    assert measure.idle_cpus == {6, 7}
+    assert build.cpus == {0, 1, 4, 5}
+    # the whole of both cpus
+    assert measure.cpu_quota == 200000
+
+    options = measure.container_options("8g")
+    assert options["cpuset_cpus"] == "2-3"
+    assert options["memswap_limit"] == "8g"
+    assert options["pids_limit"] == 64
+
+
+def test_build_lane_throttles() -> None:
+    lanes = plan_lanes(
+        {1},
+        set(range(8)),
+        siblings,
+        cpu_period=100000,
+        cpu_quota=50000,
+        pids_limit=64,
+        build_write_bps=(("/dev/sda", 1 << 20),),
+    )
+    options = lanes[LaneKind.BUILD].container_options("8g")
+    assert options["cpuset_cpus"] == "0,2-4,6-7"
+    assert options["device_write_bps"] == [{"Path": "/dev/sda", "Rate": 1 << 20}]
+    assert "cpu_quota" not in options
+    assert lanes[LaneKind.MEASURE].cpu_quota == 50000
+
+
+def test_invalid_plans() -> None:
+    with pytest.raises(ValueError):
+        plan_lanes({9}, set(range(8)), siblings, cpu_period=100000, cpu_quota=0, pids_limit=64)
+    with pytest.raises(ValueError):
+        # every core is reserved
+        plan_lanes(
+            {0, 1, 2, 3}, set(range(8)), siblings, cpu_period=100000, cpu_quota=0, pids_limit=64
+        )
@@ -0,0 +1,253 @@
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from ferris_elf import lib, workspace
+from ferris_elf.config import settings
+from ferris_elf.database import ContainerTag, Database, SessionLabel, Year
+from ferris_elf.dispatch import Dispatcher
+from ferris_elf.entrypoints import PHASES_MACRO, Entrypoints, parts_shim
+from ferris_elf.jobs import BenchJob
+from ferris_elf.picoseconds import Picoseconds
+from ferris_elf.profiles import BuildProfile
+
+from .conftest import StubContext, add_run, add_submission, add_version
+from .test_dispatch import HARDWARE
+
+
+@pytest.fixture
+def profiling(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[str]:
+    """Stands in for building and profiling, which need docker, returns what was done."""
+    done: list[str] = []
+
+    async def check_code(*args: Any) -> list[Any]:
+        return []
+
+    async def build_profiled(*args: Any) -> bool:
+        done.append("build")
+        return True
+
+    async def profile_code(
+        tag: str, name: str, user: int, tmpdir: str, in_file: SessionLabel, *args: Any
+    ) -> Optional[bytes]:
+        done.append(in_file)
+        # fails to profile input c
+        return f"<svg>{in_file}</svg>".encode() if in_file != "c" else None
+
+    monkeypatch.setattr(lib, "check_code", check_code)
+    monkeypatch.setattr(lib, "build_profiled", build_profiled)
+    monkeypatch.setattr(lib, "profile_code", profile_code)
+    monkeypatch.setattr(lib, "populate_tmp_dir", lambda tmpdir, code, entrypoints: None)
+    monkeypatch.setattr(lib, "prepare_inputs", lambda year, day: (str(tmp_path), ["a", "b", "c"]))
+    monkeypatch.setattr(
+        lib, "job_tmp_dir", lambda suffix: tempfile.TemporaryDirectory(suffix, dir=tmp_path)
+    )
+    return done
+
+
+def test_profile_submission(db: Database, profiling: list[str]) -> None:
+    version = add_version(db, "1.1700000000")
+    sub = add_submission(db, 1, version)
+    add_run(db, sub, "a", 100)
+    add_run(db, sub, "b", 200)
+    add_run(db, sub, "c", 300)
+
+    submission = db.get_submission_by_id(sub)
+    assert submission is not None
+    flamegraphs = asyncio.run(lib.profile_submission(submission))
+
+    # only the inputs it was measured on
+    assert flamegraphs == {"a": b"<svg>a</svg>", "b": b"<svg>b</svg>"}
+    assert db.get_submission_flamegraphs(sub) == flamegraphs
+    # kept, failures too, the next /profile doesn't build and profile again
+    assert db.unprofiled_runs(sub) == []
+    assert asyncio.run(lib.profile_submission(submission)) == {}
+    assert profiling == ["build", "a", "b", "c"]
+
+
+def test_profile_build_failure_recorded(
+    db: Database, profiling: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sub = add_submission(db, 1, add_version(db, "1.1700000000"))
+    add_run(db, sub, "a", 100)
+
+    async def build_profiled(*args: Any) -> bool:
+        profiling.append("build")
+        return False
+
+    monkeypatch.setattr(lib, "build_profiled", build_profiled)
+    submission = db.get_submission_by_id(sub)
+    assert submission is not None
+
+    assert asyncio.run(lib.profile_submission(submission)) == {}
+    assert asyncio.run(lib.profile_submission(submission)) == {}
+    assert profiling == ["build"]
+    assert db.get_submission_flamegraphs(sub) == {}
+
+
+def test_profile_on_worker(db: Database) -> None:
+    sub = add_submission(db, 1, add_version(db, "1.1700000000"))
+    add_run(db, sub, "b", 100)
+    submission = db.get_submission_by_id(sub)
+    assert submission is not None
+
+    async def go() -> dict[SessionLabel, bytes]:
+        dispatcher = Dispatcher(60)
+        profiling = asyncio.create_task(lib.profile_submission(submission, dispatcher))
+        claimed = await dispatcher.claim("w", HARDWARE, 5)
+        assert claimed is not None
+        job_id, job = claimed
+
+        # the worker gets the day's inputs, and which of them to profile
+        assert job.profile_inputs == ("b",)
+        assert set(job.inputs) == {"a", "b", "c"}
+        outcome = lib.JobOutcome(built=True, flamegraphs={SessionLabel("b"): b"<svg>b</svg>"})
+        assert dispatcher.report(job_id, "w", outcome.to_wire())
+        return await profiling
+
+    assert asyncio.run(go()) == {"b": b"<svg>b</svg>"}
+    assert db.get_submission_flamegraphs(sub) == {"b": b"<svg>b</svg>"}
+
+
+def criterion(bench_id: str, median: float) -> dict[str, Any]:
+    """A criterion `benchmark-complete` message, without samples."""
+    estimate = {"estimate": median, "lower_bound": median - 1, "upper_bound": median + 1}
+    return {
+        "reason": "benchmark-complete",
+        "id": bench_id,
+        "typical": estimate,
+        "mean": estimate,
+        "median": estimate,
+    }
+
+
+@pytest.mark.parametrize(
+    ("bench_id", "bench_format", "phase"),
+    [
+        ("aoc_sub/run", 2, "run"),
+        ("aoc_sub/parse", 2, "parse"),
+        ("aoc_sub/solve", 3, "solve"),
+        # format 1 harnesses only had the run benchmark, whatever it was called
+        ("aoc_sub/parse", 1, "run"),
+        ("aoc_sub", 1, "run"),
+    ],
+)
+def test_benchmark_phase(bench_id: str, bench_format: int, phase: str) -> None:
+    assert lib.benchmark_phase({"id": bench_id}, bench_format) == phase
+
+
+def test_phases_routed() -> None:
+    blobs = [
+        {"reason": "ferris-answer", "answer": "42"},
+        criterion("aoc_sub/parse", 10),
+        criterion("aoc_sub/solve", 20),
+        criterion("aoc_sub/run", 30),
+    ]
+    result = lib.process_run_result(SessionLabel("a"), {SessionLabel("a"): "42"}, blobs, 2)
+    assert result is not None
+    assert result.verified
+    # ranked by run, the phases are only shown next to it
+    assert result.median == Picoseconds.from_nanos(30)
+    assert (result.parse_time, result.solve_time) == (
+        Picoseconds.from_nanos(10),
+        Picoseconds.from_nanos(20),
+    )
+
+
+def test_format_1_has_no_phases() -> None:
+    blobs = [{"reason": "ferris-answer", "answer": "42"}, criterion("aoc_sub/parse", 30)]
+    result = lib.process_run_result(SessionLabel("a"), {}, blobs, 1)
+    assert result is not None
+    assert result.median == Picoseconds.from_nanos(30)
+    assert (result.parse_time, result.solve_time) == (None, None)
+
+
+@pytest.mark.parametrize("entrypoints", list(Entrypoints))
+def test_entrypoints_opt_in(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, entrypoints: Entrypoints
+) -> None:
+    template = Path(workspace.prepare_template(lib.RUNNER_DIR, str(tmp_path)))
+    monkeypatch.setattr(lib, "workspace_template", lambda: str(template))
+    job = tmp_path / "job"
+    job.mkdir()
+
+    code = b"""\
+pub fn parse(i: &str) -> u32 { 0 }
+pub fn solve(p: u32) -> u32 { p }
+pub fn part1(i: &str) -> u32 { solve(parse(i)) }
+pub fn part2(i: &str) -> u32 { 0 }
+"""
+    lib.populate_tmp_dir(str(job), code, entrypoints)
+
+    # helpers named like entrypoints don't change what is benchmarked unless asked to
+    phases = (job / "src" / "phases.rs").read_text()
+    parts = (job / "src" / "parts.rs").read_text()
+    if entrypoints == Entrypoints.PHASES:
+        assert phases == PHASES_MACRO
+    else:
+        assert phases == (template / "src" / "phases.rs").read_text()
+    if entrypoints == Entrypoints.BOTH_PARTS:
+        assert parts == parts_shim(("part1", "part2"))
+    else:
+        assert parts == (template / "src" / "parts.rs").read_text()
+
+
+def test_no_hold_after_release(db: Database) -> None:
+    ctx = StubContext()
+    # long after the hold, the submission is turned away without waiting
+    assert not asyncio.run(lib.wait_for_inputs(ctx, Year(2023), 1))  # type: ignore[arg-type]
+    assert ctx.replies == []
+
+    add_submission(db, 1, add_version(db, "1.1700000000"))
+    assert asyncio.run(lib.wait_for_inputs(ctx, Year(2023), 1))  # type: ignore[arg-type]
+
+
+def test_workers_stage_inputs_apart(tmp_path: Path) -> None:
+    job = BenchJob(
+        1,
+        "someone",
+        Year(2023),
+        1,
+        (1,),
+        b"",
+        BuildProfile.RELEASE,
+        ContainerTag("3.2"),
+        {SessionLabel("a"): "input a\n"},
+        {1: {}},
+    )
+    old = settings.input_cache.dir
+    settings.set("input_cache.dir", str(tmp_path))
+    try:
+        # workers on one host staging the same day at once
+        with ThreadPoolExecutor(4) as pool:
+            staged = list(pool.map(lambda n: lib.stage_inputs(job, f"host-{n}"), range(8)))
+    finally:
+        settings.set("input_cache.dir", old)
+
+    assert len({path for path, _ in staged}) == 8
+    for path, labels in staged:
+        assert labels == ["a"]
+        assert (Path(path) / "a").read_text() == "input a\n"
+    assert settings.input_cache.dir == old
+
+
+def test_pgo_needs_llvm_tools(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    # only a format 1 image is pulled, it has no llvm-profdata to merge the profile with
+    add_submission(db, 1, add_version(db, "1.1700000000"))
+
+    async def run_job(*args: Any) -> None:
+        raise AssertionError("built on an image without llvm-tools")
+
+    monkeypatch.setattr(lib, "run_job", run_job)
+    ctx = StubContext()
+    asyncio.run(
+        lib.benchmark(ctx, Year(2023), 1, (1,), b"", BuildProfile.PGO)  # type: ignore[arg-type]
+    )
+    assert ctx.replies == [
+        "pgo builds need a newer bencher image than this host has, "
+        + "please submit with another profile for now."
+    ]
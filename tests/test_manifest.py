@@ -0,0 +1,61 @@
+import os
+import tomllib
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.manifest import (
+    HARNESS_CRATES,
+    dependency_names,
+    needs_full_manifest,
+    prune,
+    prune_for,
+    referenced_crates,
+)
+
+RUNNER_DIR = os.path.join(os.path.dirname(__file__), "..", "runner")
+
+with open(os.path.join(RUNNER_DIR, "Cargo.toml")) as fp:
+    FULL = fp.read()
+with open(os.path.join(RUNNER_DIR, "src", "code.rs")) as fp:
+    EXAMPLE = fp.read()
+
+
+def test_referenced_crates() -> None:
+    code = """
+        extern crate rayon;
+        use itertools::Itertools;
+        use ::memchr::memchr;
+        use nom as n;
+        use {regex::Regex, std::fmt};
+        fn f() -> usize { ahash::AHashMap::<u8, u8>::new().len() }
+    """
+    found = referenced_crates(code)
+    assert {"rayon", "itertools", "memchr", "nom", "regex", "ahash", "std"} <= found
+
+
+def test_std_only_keeps_the_harness() -> None:
+    pruned = tomllib.loads(prune_for(FULL, "use std::collections::HashMap;"))
+    assert set(pruned["dependencies"]) == HARNESS_CRATES
+    assert "build_dependencies" not in pruned
+    # everything else is kept as is
+    full = tomllib.loads(FULL)
+    for table in ("package", "lib", "bench", "dev-dependencies"):
+        assert pruned[table] == full[table]
+
+
+def test_example_code() -> None:
+    pruned = tomllib.loads(prune_for(FULL, EXAMPLE))
+    assert set(pruned["dependencies"]) == {"ascii"} | HARNESS_CRATES
+    assert pruned["dependencies"]["ascii"] == tomllib.loads(FULL)["dependencies"]["ascii"]
+
+
+@given(st.sets(st.sampled_from(sorted(dependency_names(FULL)))))
+def test_keeps_what_is_asked(keep: set[str]) -> None:
+    assert set(tomllib.loads(prune(FULL, keep))["dependencies"]) == keep | HARNESS_CRATES
+
+
+def test_needs_full_manifest() -> None:
+    assert needs_full_manifest("error[E0433]: failed to resolve: use of undeclared crate `rayon`")
+    assert needs_full_manifest("error: failed to select a version for the requirement")
+    assert not needs_full_manifest("error[E0308]: mismatched types")
@@ -0,0 +1,30 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.memory import MemoryUsage, format_bytes
+
+
+def test_format_bytes() -> None:
+    assert format_bytes(0) == "0 B"
+    assert format_bytes(1023) == "1023 B"
+    assert format_bytes(1536) == "1.50 KiB"
+    assert format_bytes(3 * 1024**3) == "3.00 GiB"
+    assert format_bytes(5 * 1024**4) == "5120.00 GiB"
+
+
+@given(st.integers(min_value=0, max_value=2**50))
+def test_format_bytes_never_empty(n: int) -> None:
+    assert format_bytes(n).split(" ")[1] in ("B", "KiB", "MiB", "GiB")
+
+
+def test_from_record() -> None:
+    usage = MemoryUsage.from_record(
+        {"reason": "ferris-memory", "peak_bytes": 8292, "total_bytes": 16452, "allocations": 10}
+    )
+    assert usage == MemoryUsage(8292, 16452, 10)
+    assert "8.10 KiB" in usage.describe()
+
+
+def test_malformed_record() -> None:
+    assert MemoryUsage.from_record({"reason": "ferris-memory"}) is None
+    assert MemoryUsage.from_record({"peak_bytes": None, "total_bytes": 1, "allocations": 1}) is None
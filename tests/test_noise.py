@@ -0,0 +1,48 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.noise import NoisePolicy, assess, outlier_ratio, relative_ci_width
+from ferris_elf.picoseconds import Picoseconds
+
+POLICY = NoisePolicy(max_ci_width=0.05, max_outlier_ratio=0.1, max_attempts=3)
+
+
+def test_ci_width() -> None:
+    width = relative_ci_width(
+        Picoseconds.from_picos(1000), Picoseconds.from_picos(950), Picoseconds.from_picos(1100)
+    )
+    assert width == 0.15
+
+
+@given(st.lists(st.integers(min_value=0, max_value=2**40), max_size=200))
+def test_outlier_ratio_range(xs: list[int]) -> None:
+    assert 0.0 <= outlier_ratio(xs) <= 1.0
+
+
+def test_outliers_detected() -> None:
+    samples = [1000 + (i % 7) for i in range(90)] + [50_000] * 10
+    assert outlier_ratio(samples) == 0.1
+
+
+def test_quiet_run_accepted() -> None:
+    samples = [1000 + (i % 7) for i in range(100)]
+    report = assess(
+        Picoseconds.from_picos(1003),
+        Picoseconds.from_picos(1000),
+        Picoseconds.from_picos(1006),
+        samples,
+    )
+    assert not report.is_noisy(POLICY)
+    assert report.variance is not None
+
+
+def test_noisy_run_rejected() -> None:
+    samples = [1000 + (i % 7) for i in range(80)] + [50_000] * 20
+    report = assess(
+        Picoseconds.from_picos(1003),
+        Picoseconds.from_picos(900),
+        Picoseconds.from_picos(1400),
+        samples,
+    )
+    assert report.is_noisy(POLICY)
+    assert report.badness(POLICY) > 1.0
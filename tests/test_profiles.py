@@ -0,0 +1,37 @@
+from ferris_elf.profiles import (
+    BASE_RUSTFLAGS,
+    PGO_PROFILE,
+    BuildProfile,
+    cargo_env,
+    training_command,
+)
+
+
+def test_release_is_cargo_default() -> None:
+    assert cargo_env(BuildProfile.RELEASE) == {}
+
+
+def test_lto_keeps_dockerfile_rustflags() -> None:
+    env = cargo_env(BuildProfile.LTO)
+    assert env["CARGO_PROFILE_RELEASE_LTO"] == "fat"
+    assert env["CARGO_PROFILE_RELEASE_CODEGEN_UNITS"] == "1"
+    assert "RUSTFLAGS" not in env
+
+
+def test_pgo_passes() -> None:
+    training = cargo_env(BuildProfile.PGO, training=True)
+    final = cargo_env(BuildProfile.PGO)
+    assert training["RUSTFLAGS"].startswith(BASE_RUSTFLAGS)
+    assert "-Cprofile-generate=" in training["RUSTFLAGS"]
+    assert final["RUSTFLAGS"] == f"{BASE_RUSTFLAGS} -Cprofile-use={PGO_PROFILE}"
+    # the final build is LTO as well
+    assert cargo_env(BuildProfile.LTO).items() <= final.items()
+
+
+def test_training_command() -> None:
+    cmd = training_command([("/app/inputs/a b", "1"), ("/app/inputs/c", "2")])
+    assert cmd[:2] == ["sh", "-ec"]
+    script = cmd[2]
+    assert "FERRIS_ELF_INPUT_FILE_NAME='/app/inputs/a b' FERRIS_ELF_PART=1 cargo bench" in script
+    assert "FERRIS_ELF_INPUT_FILE_NAME=/app/inputs/c FERRIS_ELF_PART=2 cargo bench" in script
+    assert script.endswith(f"-o {PGO_PROFILE} /app/target/pgo-raw")
@@ -0,0 +1,68 @@
+from typing import Optional
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.picoseconds import Picoseconds
+from ferris_elf.ranking import RankedTime, RankingMode, rank_times
+
+
+def entry(
+    user: int, time: int, low: Optional[int] = None, high: Optional[int] = None
+) -> RankedTime:
+    return RankedTime(
+        user,
+        Picoseconds(time),
+        Picoseconds(low) if low is not None else None,
+        Picoseconds(high) if high is not None else None,
+        user,
+    )
+
+
+def test_median_ranks_strictly() -> None:
+    ranked = rank_times([entry(1, 300), entry(2, 100), entry(3, 200)], RankingMode.MEDIAN)
+    assert [(t.user_id, t.rank) for t in ranked] == [(2, 1), (3, 2), (1, 3)]
+
+
+def test_overlapping_entries_tie() -> None:
+    ranked = rank_times(
+        [
+            entry(1, 100, 90, 110),
+            entry(2, 105, 100, 112),
+            entry(3, 150, 140, 160),
+            entry(4, 155, 150, 170),
+        ],
+        RankingMode.TIES,
+    )
+    assert [(t.user_id, t.rank) for t in ranked] == [(1, 1), (2, 1), (3, 3), (4, 3)]
+
+
+def test_missing_bounds_never_tie() -> None:
+    ranked = rank_times([entry(1, 100), entry(2, 100, 90, 110)], RankingMode.TIES)
+    assert [t.rank for t in ranked] == [1, 2]
+
+
+def test_upper_bound_is_conservative() -> None:
+    ranked = rank_times([entry(1, 100, 50, 400), entry(2, 150, 140, 160)], RankingMode.UPPER_BOUND)
+    assert [(t.user_id, t.time.as_picos()) for t in ranked] == [(2, 160), (1, 400)]
+
+
+@given(
+    st.lists(
+        st.tuples(st.integers(min_value=1, max_value=10**9), st.integers(0, 10**6)),
+        max_size=30,
+    ),
+    st.sampled_from(RankingMode),
+)
+def test_ranks_are_ordered(xs: list[tuple[int, int]], mode: RankingMode) -> None:
+    times = [entry(i, t, t - w // 2, t + w) for i, (t, w) in enumerate(xs)]
+    ranks = [t.rank for t in rank_times(times, mode)]
+    assert ranks == sorted(ranks)
+    assert all(1 <= r <= i for i, r in enumerate(ranks, start=1))
+
+
+def test_cold_time_does_not_rank() -> None:
+    fast_cold = RankedTime(1, Picoseconds(200), None, None, 1, cold=Picoseconds(1000))
+    slow_cold = RankedTime(2, Picoseconds(100), None, None, 2, cold=Picoseconds(9000))
+    ranked = rank_times([fast_cold, slow_cold], RankingMode.MEDIAN)
+    assert [(t.user_id, t.cold) for t in ranked] == [(2, Picoseconds(9000)), (1, Picoseconds(1000))]
@@ -0,0 +1,129 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ferris_elf import lib, rebench
+from ferris_elf.database import ContainerTag, Database, RebenchStatus, SubmissionFilter, Year
+from ferris_elf.profiles import BuildProfile
+
+from .conftest import add_submission, add_version
+
+TAG = ContainerTag("1.1700000000")
+
+
+@pytest.fixture
+def measured(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[int]:
+    """Stands in for building and measuring, which need docker, returns what was measured."""
+    measured: list[int] = []
+
+    async def build(*args: Any) -> bool:
+        return True
+
+    async def measure(job: Any, submission: Any, *args: Any) -> RebenchStatus:
+        assert lib.bench_lock.locked()
+        measured.append(submission.id)
+        return RebenchStatus.DONE
+
+    monkeypatch.setattr(rebench, "_build", build)
+    monkeypatch.setattr(rebench, "_measure", measure)
+    monkeypatch.setattr(
+        lib, "job_tmp_dir", lambda suffix: tempfile.TemporaryDirectory(suffix, dir=tmp_path)
+    )
+    return measured
+
+
+@pytest.mark.parametrize("include_invalid", [False, True])
+def test_backfill_invalid_submissions(
+    db: Database, measured: list[int], include_invalid: bool
+) -> None:
+    version = add_version(db, TAG)
+    valid = add_submission(db, 1, version)
+    invalid = add_submission(db, 2, version)
+    db.mark_submission_invalid(invalid)
+
+    _, queued = rebench.queue_backfill(
+        SubmissionFilter(include_invalid=include_invalid), container_tag=TAG
+    )
+    jobs = db.claim_rebench_jobs(10)
+    statuses = asyncio.run(rebench.run_batch(jobs, lambda: False))
+
+    if include_invalid:
+        assert queued == 2
+        assert measured == [valid, invalid]
+        assert list(statuses.values()) == [RebenchStatus.DONE, RebenchStatus.DONE]
+    else:
+        assert queued == 1
+        assert measured == [valid]
+        assert list(statuses.values()) == [RebenchStatus.DONE]
+
+
+def test_invalidated_before_running_is_skipped(db: Database, measured: list[int]) -> None:
+    version = add_version(db, TAG)
+    sub = add_submission(db, 1, version)
+    rebench.queue_backfill(SubmissionFilter(), container_tag=TAG)
+    db.mark_submission_invalid(sub)
+
+    (job,) = db.claim_rebench_jobs(10)
+    assert asyncio.run(rebench.run_batch([job], lambda: False)) == {job.id: RebenchStatus.SKIPPED}
+    assert measured == []
+
+
+def test_pgo_skipped_on_old_image(db: Database, measured: list[int]) -> None:
+    version = add_version(db, TAG)
+    release = add_submission(db, 1, version)
+    pgo = db.save_submission(1, Year(2023), 2, 1, b"", version, 3, BuildProfile.PGO)
+    rebench.queue_backfill(SubmissionFilter(), container_tag=TAG)
+
+    statuses = asyncio.run(rebench.run_batch(db.claim_rebench_jobs(10), lambda: False))
+    assert sorted(statuses.values()) == [RebenchStatus.DONE, RebenchStatus.SKIPPED]
+    assert measured == [release]
+    assert pgo not in measured
+
+
+def test_live_job_not_held_up_by_builds(
+    db: Database, measured: list[int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sub = add_submission(db, 1, add_version(db, TAG))
+    rebench.queue_backfill(SubmissionFilter(), container_tag=TAG)
+    (job,) = db.claim_rebench_jobs(10)
+
+    async def scenario() -> dict[Any, RebenchStatus]:
+        building, built = asyncio.Event(), asyncio.Event()
+
+        async def build(*args: Any) -> bool:
+            building.set()
+            await built.wait()
+            return True
+
+        monkeypatch.setattr(rebench, "_build", build)
+        batch = asyncio.create_task(rebench.run_batch([job], lambda: False))
+        await building.wait()
+
+        # a live submission arriving mid-build measures without waiting for the build
+        async with asyncio.timeout(1), lib.bench_lock:
+            assert not batch.done()
+
+        built.set()
+        return await batch
+
+    assert asyncio.run(scenario()) == {job.id: RebenchStatus.DONE}
+    assert measured == [sub]
+
+
+def test_backfill_yields_to_live_jobs(db: Database, measured: list[int]) -> None:
+    version = add_version(db, TAG)
+    first, second = add_submission(db, 1, version), add_submission(db, 2, version)
+    rebench.queue_backfill(SubmissionFilter(), container_tag=TAG)
+    jobs = db.claim_rebench_jobs(10)
+
+    # a live submission shows up once the first one is measured
+    statuses = asyncio.run(rebench.run_batch(jobs, lambda: bool(measured)))
+    assert list(statuses.values()) == [RebenchStatus.DONE, RebenchStatus.QUEUED]
+    assert measured == [first]
+
+    for job in jobs:
+        db.finish_rebench_job(job.id, statuses[job.id])
+    assert [job.submission for job in db.claim_rebench_jobs(10)] == [second]
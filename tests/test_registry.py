@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any
+
+import aiohttp
+import hypothesis.strategies as st
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from hypothesis import given
+
+from ferris_elf.registry import bench_format_of, labels_for_tags, list_tags, rustc_version_of
+
+REPO = "proegssilb/ferris-elf-bencher"
+AUTH = {"Authorization": "Bearer t"}
+
+
+def stand_in(tags: list[str], page_size: int, labels: dict[str, dict[str, str]]) -> web.Application:
+    """
+    Serves tags page by page the way OCI registries do, and an image for each tag in labels.
+    Tag `multi` is an index whose linux/amd64 image is the one of tag `3.2`.
+    """
+
+    async def tags_list(request: web.Request) -> web.Response:
+        assert request.headers["Authorization"] == AUTH["Authorization"]
+        last = request.query.get("last")
+        start = tags.index(last) + 1 if last else 0
+        page = tags[start : start + page_size]
+        headers = {}
+        if start + page_size < len(tags):
+            headers["Link"] = f'</v2/{REPO}/tags/list?n={page_size}&last={page[-1]}>; rel="next"'
+        return web.json_response({"name": REPO, "tags": page}, headers=headers)
+
+    async def manifest(request: web.Request) -> web.Response:
+        ref = request.match_info["ref"]
+        body: dict[str, Any]
+        if ref == "multi":
+            body = {
+                "manifests": [
+                    {"digest": "arm", "platform": {"os": "linux", "architecture": "arm64"}},
+                    {"digest": "3.2", "platform": {"os": "linux", "architecture": "amd64"}},
+                ]
+            }
+        elif ref in labels:
+            body = {"config": {"digest": f"config-{ref}"}}
+        else:
+            raise web.HTTPNotFound()
+        return web.json_response(body)
+
+    async def blob(request: web.Request) -> web.Response:
+        ref = request.match_info["digest"].removeprefix("config-")
+        # registries serve blobs as application/octet-stream
+        return web.json_response(
+            {"config": {"Labels": labels[ref]}}, content_type="application/octet-stream"
+        )
+
+    app = web.Application()
+    app.router.add_get(f"/v2/{REPO}/tags/list", tags_list)
+    app.router.add_get(f"/v2/{REPO}/manifests/{{ref}}", manifest)
+    app.router.add_get(f"/v2/{REPO}/blobs/{{digest}}", blob)
+    return app
+
+
+def run_list(tags: list[str], page_size: int) -> list[str]:
+    async def go() -> list[str]:
+        async with (
+            TestServer(stand_in(tags, page_size, {})) as server,
+            aiohttp.ClientSession() as session,
+        ):
+            return await list_tags(session, str(server.make_url(f"/v2/{REPO}")), AUTH)
+
+    return asyncio.run(go())
+
+
+def test_follows_pagination() -> None:
+    tags = [f"3.{i}" for i in range(7)]
+    assert run_list(tags, 3) == tags
+
+
+def test_single_page() -> None:
+    assert run_list(["latest", "3"], 10) == ["latest", "3"]
+
+
+def test_labels_for_tags() -> None:
+    labels = {
+        "3.1": {"bench_format": "3", "rustc_version": "rustc 1.83.0 (90b35a623 2024-11-26)"},
+        "3.2": {"bench_format": "3"},
+    }
+
+    async def go() -> dict[str, dict[str, str] | BaseException]:
+        async with (
+            TestServer(stand_in([], 1, labels)) as server,
+            aiohttp.ClientSession() as session,
+        ):
+            return await labels_for_tags(
+                session,
+                str(server.make_url(f"/v2/{REPO}")),
+                ["3.1", "multi", "gone"],
+                AUTH,
+            )
+
+    res = asyncio.run(go())
+    assert res["3.1"] == labels["3.1"]
+    assert res["multi"] == labels["3.2"]
+    # one missing tag doesn't fail the others
+    assert isinstance(res["gone"], aiohttp.ClientResponseError)
+
+
+def test_label_parsing() -> None:
+    assert rustc_version_of({"rustc_version": "rustc 1.83.0 (90b35a623 2024-11-26)"}) == "1.83.0"
+    # built without the build arg
+    assert rustc_version_of({"rustc_version": ""}) is None
+    assert rustc_version_of({}) is None
+    assert bench_format_of("2.1703023947", {"bench_format": "3"}) == 3
+
+
+@given(st.integers(min_value=1, max_value=99), st.integers(min_value=0))
+def test_bench_format_from_tag(bench_format: int, stamp: int) -> None:
+    assert bench_format_of(f"{bench_format}.{stamp}", {}) == bench_format
@@ -0,0 +1,24 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from ferris_elf.samples import pack_samples, unpack_samples
+
+
+@given(st.lists(st.integers(min_value=0, max_value=2**64 - 1)))
+def test_samples_roundtrip(xs: list[int]) -> None:
+    assert unpack_samples(pack_samples(xs)).tolist() == xs
+
+
+@given(st.lists(st.integers(min_value=0, max_value=2**64 - 1), min_size=1))
+def test_samples_view(xs: list[int]) -> None:
+    view = unpack_samples(pack_samples(xs))
+    assert view.format == "Q"
+    assert view.readonly
+    assert len(view) == len(xs)
+    assert view[-1] == xs[-1]
+
+
+def test_samples_compact() -> None:
+    # 100 samples of roughly 250µs each, the typical shape of a criterion run
+    xs = [250_000_000 + (i * 7919) % 40_000 for i in range(100)]
+    assert len(pack_samples(xs)) < len(xs) * 8
@@ -0,0 +1,38 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+
+from ferris_elf import worker
+from ferris_elf.dispatch import Dispatcher, claim_job, make_app
+
+from .test_dispatch import HARDWARE, TOKEN, job
+
+
+@pytest.mark.parametrize("cancelled", [False, True])
+def test_keep_lease(monkeypatch: pytest.MonkeyPatch, cancelled: bool) -> None:
+    monkeypatch.setattr(worker, "HEARTBEAT_SECONDS", 0.01)
+
+    async def go() -> None:
+        dispatcher = Dispatcher(60)
+        async with TestServer(make_app(dispatcher, TOKEN)) as server:
+            headers = {"Authorization": f"Bearer {TOKEN}"}
+            async with aiohttp.ClientSession(server.make_url(""), headers=headers) as session:
+                run = asyncio.create_task(dispatcher.run(job(1)))
+                claimed = await claim_job(session, "w", HARDWARE, 1)
+                assert claimed is not None
+
+                running = asyncio.create_task(asyncio.sleep(0.1 if not cancelled else 60))
+                if cancelled:
+                    run.cancel()
+                kept = await asyncio.wait_for(
+                    worker.keep_lease(session, "w", claimed[0], running), 5
+                )
+
+                assert kept != cancelled
+                assert running.cancelled() == cancelled
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+
+    asyncio.run(go())
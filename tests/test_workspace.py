@@ -0,0 +1,74 @@
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from ferris_elf.workspace import instantiate, prepare_template, write_file
+
+
+def make_runner(path: pathlib.Path) -> None:
+    (path / "src").mkdir(parents=True)
+    (path / "src" / "code.rs").write_text("// placeholder")
+    (path / "src" / "lib.rs").write_text("pub mod code;")
+    (path / "inputs").mkdir()
+    (path / "inputs" / ".gitkeep").write_text("")
+    (path / "target" / "release").mkdir(parents=True)
+    (path / "target" / "release" / "dep").write_text("artifact")
+
+
+def test_instantiate_links(tmp_path: pathlib.Path) -> None:
+    make_runner(tmp_path / "runner")
+    template = pathlib.Path(prepare_template(str(tmp_path / "runner"), str(tmp_path / "ws")))
+
+    job = tmp_path / "job"
+    job.mkdir()
+    assert instantiate(str(template), str(job))
+
+    assert os.path.samefile(job / "src" / "lib.rs", template / "src" / "lib.rs")
+    # writable dirs are copies, writing to them never reaches the template
+    assert (job / "target" / "release" / "dep").read_text() == "artifact"
+    assert not os.path.samefile(
+        job / "target" / "release" / "dep", template / "target" / "release" / "dep"
+    )
+    assert not os.path.samefile(job / "inputs" / ".gitkeep", template / "inputs" / ".gitkeep")
+
+
+def test_write_file_keeps_template(tmp_path: pathlib.Path) -> None:
+    make_runner(tmp_path / "runner")
+    template = pathlib.Path(prepare_template(str(tmp_path / "runner"), str(tmp_path / "ws")))
+
+    job = tmp_path / "job"
+    job.mkdir()
+    instantiate(str(template), str(job))
+    write_file(str(job / "src" / "code.rs"), b"pub fn run() {}")
+
+    assert (job / "src" / "code.rs").read_bytes() == b"pub fn run() {}"
+    assert (template / "src" / "code.rs").read_text() == "// placeholder"
+
+
+def test_template_per_runner(tmp_path: pathlib.Path) -> None:
+    runner = tmp_path / "runner"
+    make_runner(runner)
+    template = prepare_template(str(runner), str(tmp_path / "ws"))
+    assert prepare_template(str(runner), str(tmp_path / "ws")) == template
+
+    (runner / "src" / "code.rs").write_text("// changed")
+    changed = prepare_template(str(runner), str(tmp_path / "ws"))
+    assert changed != template
+    assert (pathlib.Path(changed) / "src" / "code.rs").read_text() == "// changed"
+    # jobs of processes still on the old runner keep linking from the old template
+    assert (pathlib.Path(template) / "src" / "code.rs").read_text() == "// placeholder"
+
+
+def test_concurrent_prepare(tmp_path: pathlib.Path) -> None:
+    make_runner(tmp_path / "runner")
+    with ThreadPoolExecutor(4) as pool:
+        templates = set(
+            pool.map(
+                lambda _: prepare_template(str(tmp_path / "runner"), str(tmp_path / "ws")), range(8)
+            )
+        )
+
+    (template,) = templates
+    assert (pathlib.Path(template) / "src" / "code.rs").read_text() == "// placeholder"
+    # the copies of the processes that lost the race are gone
+    assert os.listdir(tmp_path / "ws") == [os.path.basename(template)]
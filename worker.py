@@ -0,0 +1,4 @@
+from ferris_elf.worker import main
+
+if __name__ == "__main__":
+    main()